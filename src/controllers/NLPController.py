@@ -1,19 +1,32 @@
 from .BaseController import BaseController
 from src.models.db_schemes import Project, DataChunk
+import asyncio
+import heapq
+import itertools
 import json
+import logging
 from typing import List
-from ..stores.llms.Enums_LLM import DocumentTypeEnum
+from starlette.concurrency import iterate_in_threadpool
+from ..stores.llms.Enums_LLM import DocumentTypeEnum, StreamEventEnum
+from ..stores.vectordb.MetadataFilter import MetadataFilter
+from ..stores.vectordb.VectorDBEnums import SearchModeEnums
 
 class NLPController(BaseController):
 
     def __init__(self, vectordb_client, generation_client,
-                 embedding_client,template_parser):
+                 embedding_client,template_parser, embedding_scheduler=None,
+                 answer_cache=None, response_cache=None):
         super().__init__()
 
         self.vector_db_client = vectordb_client
         self.generation_model_client = generation_client
         self.embedding_model_client = embedding_client
+        self.embedding_scheduler = embedding_scheduler
         self.template_parser = template_parser
+        self.answer_cache = answer_cache
+        self.response_cache = response_cache
+
+        self.logger = logging.getLogger("uvicorn")
 
     def create_collection_name(self, project_id: str):
         return f"collection_{self.vector_db_client.default_vector_size}_{project_id}".strip()
@@ -37,15 +50,21 @@ class NLPController(BaseController):
 
         # step2: manges items
         chunks_as_text=[c.chunk_text for c in chunks]
-        metadata = [c.chunk_metadata for c in chunks]
-        vectors = self.embedding_model_client.embed_text(text=chunks_as_text,
-                                                   document_type=DocumentTypeEnum.DOCUMENT.value)
+        # asset fields are filterable at search time
+        metadata = [
+            {**(c.chunk_metadata or {}), "asset_id": c.chunk_asset_id, "asset_name": c.chunk_asset_name}
+            for c in chunks
+        ]
+        vectors = await self.embed_documents(texts=chunks_as_text)
+        if not vectors:
+            return False
         # step3: create collection if not exists
 
         _=await self.vector_db_client.create_collection(
             collection_name=collection_name,
             embedding_size=self.embedding_model_client.embedding_dimensions_size,
             do_reset=do_reset,
+            options=self.get_collection_options(project=project),
         )
 
 
@@ -61,52 +80,176 @@ class NLPController(BaseController):
         return True
 
 
-    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10):
+    async def embed_documents(self, texts: List[str]):
+        if self.embedding_scheduler is not None:
+            try:
+                vectors, _ = await self.embedding_scheduler.embed_texts(
+                    texts=texts, document_type=DocumentTypeEnum.DOCUMENT.value
+                )
+            except Exception as e:
+                self.logger.error(f"Error while embedding documents: {e}")
+                return None
+            return vectors
+
+        # provider clients are blocking, keep them off the event loop
+        vectors = await asyncio.to_thread(self.embedding_model_client.embed_text, text=texts,
+                                          document_type=DocumentTypeEnum.DOCUMENT.value)
+        # OpenAI returns (vectors, usage_data)
+        if isinstance(vectors, tuple):
+            vectors = vectors[0]
+        return vectors
+
+    async def embed_queries(self, texts: List[str]):
+        """(vectors, usage_data) for search queries, batched as the provider allows."""
+        if self.embedding_scheduler is not None:
+            try:
+                return await self.embedding_scheduler.embed_texts(
+                    texts=texts, document_type=DocumentTypeEnum.QUERY.value
+                )
+            except Exception as e:
+                self.logger.error(f"Error while embedding queries: {e}")
+                return None, None
+
+        vectors = await asyncio.to_thread(self.embedding_model_client.embed_text, text=texts,
+                                          document_type=DocumentTypeEnum.QUERY.value)
+        # OpenAI returns (vectors, usage_data)
+        if isinstance(vectors, tuple):
+            return vectors
+        return vectors, None
+
+    def get_collection_options(self, project: Project) -> dict:
+        project_config = project.project_config or {}
+        return project_config.get("collection_options")
+
+    def get_search_params(self, project: Project, ef_search: int = None, probes: int = None) -> dict:
+        # request values win over the project defaults
+        project_config = project.project_config or {}
+        return {
+            "ef_search": ef_search or project_config.get("ef_search"),
+            "probes": probes or project_config.get("probes"),
+        }
+
+    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10,
+                                          ef_search: int = None, probes: int = None,
+                                          filters: MetadataFilter = None,
+                                          mode: str = SearchModeEnums.VECTOR.value,
+                                          query_vector: list = None, usage_data: dict = None):
 
         # step1: get collection name
-        query_vector = None
         collection_name = self.create_collection_name(project_id=project.project_id)
 
-        # step2: get text embedding vector
-        vectors,usage_data = self.embedding_model_client.embed_text(text=text,
-                                                 document_type=DocumentTypeEnum.QUERY.value)
+        # step2: get text embedding vector, unless the caller already has it
+        if query_vector is None:
+            vectors,usage_data = await asyncio.to_thread(self.embedding_model_client.embed_text, text=text,
+                                                         document_type=DocumentTypeEnum.QUERY.value)
 
 
 
-        if not vectors or len(vectors) == 0:
-            return False
+            if not vectors or len(vectors) == 0:
+                return False
 
-        if isinstance(vectors, list) and len(vectors) > 0:
-            query_vector = vectors[0]
+            if isinstance(vectors, list) and len(vectors) > 0:
+                query_vector = vectors[0]
 
         if not query_vector:
             return False
 
-        # step3: do semantic search
-        results = await self.vector_db_client.search_by_vector(
+        # step3: do semantic (or hybrid lexical + semantic) search
+        search_params = self.get_search_params(project=project, ef_search=ef_search, probes=probes)
+        if mode == SearchModeEnums.HYBRID.value:
+            results = await self.vector_db_client.search_hybrid(
                 collection_name=collection_name,
+                text=text,
                 vector=query_vector,
-                limit=limit
-        )
+                limit=limit,
+                **search_params,
+                filters=filters,
+            )
+        else:
+            results = await self.vector_db_client.search_by_vector(
+                collection_name=collection_name,
+                vector=query_vector,
+                limit=limit,
+                **search_params,
+                filters=filters,
+            )
 
         if not results:
             return False
 
         return results, usage_data
 
-    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
+    async def search_vector_db_collection_batch(self, project: Project, texts: List[str], limit: int = 10,
+                                                ef_search: int = None, probes: int = None,
+                                                filters: MetadataFilter = None):
 
-        answer, full_prompt, chat_history = None, None, None
-        # step1: retrieve related documents
-        retrieved_documents, usage_data = await self.search_vector_db_collection(
-            project=project,
-            text=query,
-            limit=limit
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        # one embedding call for the whole batch, one vector DB round trip for all searches
+        vectors, usage_data = await self.embed_queries(texts=texts)
+        if not vectors or len(vectors) != len(texts):
+            return False
+
+        search_params = self.get_search_params(project=project, ef_search=ef_search, probes=probes)
+        results = await self.vector_db_client.search_by_vectors(
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+            **search_params,
+            filters=filters,
         )
-        if not retrieved_documents or len(retrieved_documents) == 0:
-            return answer, full_prompt, chat_history
 
-        # step2: Construct LLM prompt
+        if results is None:
+            return False
+
+        return results, usage_data
+
+    async def search_vector_db_collections(self, projects: List[Project], text: str, limit: int = 10,
+                                           ef_search: int = None, probes: int = None,
+                                           filters: MetadataFilter = None, concurrency: int = 8):
+        """
+        One query over many projects: embedded once, searched concurrently, merged into
+        one top-k. Returns ([(project_id, document), ...], usage_data) or False.
+        """
+        vectors, usage_data = await self.embed_queries(texts=[text])
+        if not vectors:
+            return False
+        query_vector = vectors[0]
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def search_project(project: Project):
+            async with semaphore:
+                try:
+                    results = await self.vector_db_client.search_by_vector(
+                        collection_name=self.create_collection_name(project_id=project.project_id),
+                        vector=query_vector,
+                        limit=limit,
+                        **self.get_search_params(project=project, ef_search=ef_search, probes=probes),
+                        filters=filters,
+                    )
+                except Exception as e:
+                    # one broken collection must not fail the whole fan-out
+                    self.logger.error(f"Search failed for project {project.project_id}: {e}")
+                    return []
+            return [(project.project_id, document) for document in results or []]
+
+        # latency of the slowest collection, not the sum
+        per_project = await asyncio.gather(*(search_project(project) for project in projects))
+
+        # each list is already sorted best first; every collection holds the same embedding
+        # model and distance, but euclid scores are distances, so merge on "higher is better"
+        if getattr(self.vector_db_client, "score_is_distance", False):
+            merge_key = lambda hit: -hit[1].score
+        else:
+            merge_key = lambda hit: hit[1].score
+        merged = heapq.merge(*per_project, key=merge_key, reverse=True)
+        return list(itertools.islice(merged, limit)), usage_data
+
+    def build_rag_prompt(self, query: str, retrieved_documents: list):
+        """
+        Returns (full_prompt, chat_history) for the generation client.
+        """
         system_prompt=self.template_parser.get_template_from_locales("rag","system_prompt")
 
         documents_prompts="\n".join([
@@ -120,7 +263,6 @@ class NLPController(BaseController):
         footer_prompt = self.template_parser.get_template_from_locales("rag", "footer_prompt", {
             "query": query
         })
-        # step3: Construct Generation Client Prompts
 
         chat_history=[
             self.generation_model_client.construct_prompt(
@@ -131,20 +273,209 @@ class NLPController(BaseController):
 
         full_prompt="\n\n".join([documents_prompts,footer_prompt])
 
-        answer_from_generation_model, total_tokens, cost=self.generation_model_client.generate_text(
+        return full_prompt, chat_history
+
+    def get_index_version(self, project: Project):
+        # bumped on every re-index, see ProjectModel.bump_index_version
+        return (project.project_config or {}).get("index_version")
+
+    def get_answer_cache_scope(self, limit: int, filters: MetadataFilter = None,
+                               mode: str = SearchModeEnums.VECTOR.value) -> str:
+        # answers only carry over between questions retrieved the same way
+        conditions = sorted(filters.conditions, key=lambda c: (c[0], c[1])) if filters else None
+        return json.dumps([limit, mode, conditions], default=str)
+
+    async def lookup_cached_answer(self, project: Project, query: str, scope: str):
+        """
+        (cached_entry, query_vector, usage_data). The query embedding is returned either
+        way so a miss does not embed the question twice.
+        """
+        if self.answer_cache is None:
+            return None, None, None
+
+        vectors, usage_data = await self.embed_queries(texts=[query])
+        if not vectors:
+            return None, None, None
+
+        cached_entry = self.answer_cache.lookup(
+            project_id=project.project_id,
+            vector=vectors[0],
+            scope=scope,
+            index_version=self.get_index_version(project=project),
+        )
+        return cached_entry, vectors[0], usage_data
+
+    def store_cached_answer(self, project: Project, query_vector: list, scope: str,
+                            answer: str, full_prompt: str, chat_history: list):
+        if self.answer_cache is None or query_vector is None or not answer:
+            return
+
+        self.answer_cache.store(
+            project_id=project.project_id,
+            vector=query_vector,
+            scope=scope,
+            entry={"answer": answer, "full_prompt": full_prompt, "chat_history": chat_history},
+            index_version=self.get_index_version(project=project),
+        )
+
+    def get_response_cache_key(self, project: Project, full_prompt: str, chat_history: list) -> str:
+        # the call below uses the provider defaults for temperature / max tokens
+        return self.response_cache.cache_key(
+            project_id=project.project_id,
+            index_version=self.get_index_version(project=project),
+            model_id=self.generation_model_client.generation_model_id,
+            chat_history=chat_history,
             prompt=full_prompt,
-            chat_history=chat_history
+            temperature=getattr(self.generation_model_client, "default_generation_temperature", None),
+            max_output_tokens=getattr(self.generation_model_client, "default_generation_max_output_tokens", None),
+        )
+
+    async def lookup_cached_response(self, project: Project, full_prompt: str, chat_history: list):
+        """(cached_response, cache_key), the key is None when the response cache is off."""
+        if self.response_cache is None:
+            return None, None
+
+        cache_key = self.get_response_cache_key(project=project, full_prompt=full_prompt, chat_history=chat_history)
+        cached_response = await self.response_cache.get(cache_key=cache_key, project_id=project.project_id)
+        return cached_response, cache_key
+
+    async def store_cached_response(self, project: Project, cache_key: str, answer: str):
+        if self.response_cache is None or cache_key is None or not answer:
+            return
+
+        await self.response_cache.set(
+            cache_key=cache_key,
+            project_id=project.project_id,
+            model_id=self.generation_model_client.generation_model_id,
+            response={"answer": answer},
         )
 
-        return answer_from_generation_model, full_prompt, chat_history,total_tokens, cost
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 10,
+                                  ef_search: int = None, probes: int = None,
+                                  filters: MetadataFilter = None,
+                                  mode: str = SearchModeEnums.VECTOR.value):
+
+        # cached: served from the answer or response cache, no generation call was made
+        answer, full_prompt, chat_history, total_tokens, cost, cached = None, None, None, None, None, False
 
+        # step0: a near-duplicate question was answered already
+        scope = self.get_answer_cache_scope(limit=limit, filters=filters, mode=mode)
+        cached_entry, query_vector, usage_data = await self.lookup_cached_answer(
+            project=project, query=query, scope=scope
+        )
+        if cached_entry:
+            return (cached_entry["answer"], cached_entry["full_prompt"], cached_entry["chat_history"],
+                    0, f"{0:.8f}$", True)
 
+        # step1: retrieve related documents
+        search_result = await self.search_vector_db_collection(
+            project=project,
+            text=query,
+            limit=limit,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters,
+            mode=mode,
+            query_vector=query_vector,
+            usage_data=usage_data,
+        )
+        if not search_result:
+            return answer, full_prompt, chat_history, total_tokens, cost, cached
 
+        retrieved_documents, usage_data = search_result
 
+        # step2: Construct LLM prompt
+        full_prompt, chat_history = self.build_rag_prompt(query=query, retrieved_documents=retrieved_documents)
 
+        # step3: the same prompt was answered already (key is taken before generate_text extends chat_history)
+        cached_response, response_cache_key = await self.lookup_cached_response(
+            project=project, full_prompt=full_prompt, chat_history=chat_history
+        )
+        if cached_response:
+            self.store_cached_answer(project=project, query_vector=query_vector, scope=scope,
+                                     answer=cached_response["answer"], full_prompt=full_prompt,
+                                     chat_history=chat_history)
+            return cached_response["answer"], full_prompt, chat_history, 0, f"{0:.8f}$", True
+
+        # step4: Generate the answer
+        answer_from_generation_model, total_tokens, cost=await asyncio.to_thread(
+            self.generation_model_client.generate_text,
+            prompt=full_prompt,
+            chat_history=chat_history
+        )
 
+        await self.store_cached_response(project=project, cache_key=response_cache_key,
+                                         answer=answer_from_generation_model)
+        self.store_cached_answer(project=project, query_vector=query_vector, scope=scope,
+                                 answer=answer_from_generation_model, full_prompt=full_prompt,
+                                 chat_history=chat_history)
+
+        return answer_from_generation_model, full_prompt, chat_history,total_tokens, cost, cached
+
+    async def stream_rag_answer(self, project: Project, query: str, limit: int = 10,
+                                ef_search: int = None, probes: int = None,
+                                filters: MetadataFilter = None,
+                                mode: str = SearchModeEnums.VECTOR.value):
+        """
+        Async generator of (StreamEventEnum, data): the retrieved documents first, then
+        the answer deltas as the model produces them, then the generation usage.
+        A cached answer is sent as a single delta, its usage event has "cached": true.
+        """
+        scope = self.get_answer_cache_scope(limit=limit, filters=filters, mode=mode)
+        cached_entry, query_vector, usage_data = await self.lookup_cached_answer(
+            project=project, query=query, scope=scope
+        )
 
+        search_result = await self.search_vector_db_collection(
+            project=project,
+            text=query,
+            limit=limit,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters,
+            mode=mode,
+            query_vector=query_vector,
+            usage_data=usage_data,
+        )
+        if not search_result:
+            yield StreamEventEnum.ERROR, None
+            return
 
+        retrieved_documents, usage_data = search_result
+        yield StreamEventEnum.RETRIEVAL, {
+            "results": [doc.dict() for doc in retrieved_documents],
+            "usage_data": usage_data,
+        }
 
+        if cached_entry:
+            yield StreamEventEnum.DELTA, cached_entry["answer"]
+            yield StreamEventEnum.USAGE, {"total_tokens": 0, "cost": f"{0:.8f}$", "cached": True}
+            return
 
+        full_prompt, chat_history = self.build_rag_prompt(query=query, retrieved_documents=retrieved_documents)
 
+        cached_response, response_cache_key = await self.lookup_cached_response(
+            project=project, full_prompt=full_prompt, chat_history=chat_history
+        )
+        if cached_response:
+            self.store_cached_answer(project=project, query_vector=query_vector, scope=scope,
+                                     answer=cached_response["answer"], full_prompt=full_prompt,
+                                     chat_history=chat_history)
+            yield StreamEventEnum.DELTA, cached_response["answer"]
+            yield StreamEventEnum.USAGE, {"total_tokens": 0, "cost": f"{0:.8f}$", "cached": True}
+            return
+
+        # provider SDKs stream synchronously, pull each chunk off the event loop
+        answer_parts = []
+        stream = self.generation_model_client.stream_text(prompt=full_prompt, chat_history=chat_history)
+        async for event, data in iterate_in_threadpool(stream):
+            if event == StreamEventEnum.DELTA:
+                answer_parts.append(data)
+            elif event == StreamEventEnum.USAGE:
+                data = {**data, "cached": False}
+            yield event, data
+
+        answer = "".join(answer_parts)
+        await self.store_cached_response(project=project, cache_key=response_cache_key, answer=answer)
+        self.store_cached_answer(project=project, query_vector=query_vector, scope=scope,
+                                 answer=answer, full_prompt=full_prompt, chat_history=chat_history)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 THIS_DIR = Path(__file__).resolve().parent          # …/src/helpers
 ENV_PATH = THIS_DIR.parent / ".env"
@@ -38,11 +38,95 @@ class Settings(BaseSettings):
     GENERATION_DAFAULT_MAX_TOKENS: int = None
     GENERATION_DAFAULT_TEMPERATURE: float = None
 
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000
+    EMBEDDING_BATCH_MAX_INPUTS: int = 96
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_REQUESTS_PER_MINUTE: Optional[int] = None
+    EMBEDDING_TOKENS_PER_MINUTE: Optional[int] = None
+    EMBEDDING_MAX_RETRIES: int = 5
+    INDEXING_PAGE_SIZE: int = 1000
+
+    LOCAL_EMBEDDING_MAX_BATCH_SIZE: int = 32
+    LOCAL_EMBEDDING_NUM_THREADS: int = 4
+    LOCAL_EMBEDDING_WORKER_TORCH_THREADS: int = 1
+    LOCAL_EMBEDDING_DEVICE: str = "cpu"
+    LOCAL_EMBEDDING_QUERY_PREFIX: Optional[str] = None
+    LOCAL_EMBEDDING_DOCUMENT_PREFIX: Optional[str] = None
+
+    FAKE_LATENCY_DISTRIBUTION: str = "constant"
+    FAKE_GENERATION_LATENCY_MS: float = 0.0
+    FAKE_EMBEDDING_LATENCY_MS: float = 0.0
+    FAKE_LATENCY_STDDEV_MS: float = 0.0
+    FAKE_SEED: int = 0
+
     VECTOR_DB_BACKEND_LITERAL: Optional[List[str]] = None
     VECTOR_DB_BACKEND : str
     VECTOR_DB_PATH : str
+    # Qdrant server mode; local path mode (VECTOR_DB_PATH) when unset
+    VECTOR_DB_QDRANT_URL: Optional[str] = None
+    VECTOR_DB_QDRANT_API_KEY: Optional[str] = None
+    VECTOR_DB_QDRANT_PREFER_GRPC: bool = True
+    VECTOR_DB_QDRANT_GRPC_PORT: int = 6334
+    VECTOR_DB_QDRANT_TIMEOUT: Optional[int] = None
+    VECTOR_DB_QDRANT_UPLOAD_BATCH_SIZE: int = 256
+    VECTOR_DB_QDRANT_UPLOAD_PARALLEL: int = 1
+    VECTOR_DB_QDRANT_QUANTIZATION: Optional[str] = None
+    VECTOR_DB_QDRANT_QUANTIZATION_ALWAYS_RAM: bool = True
+    VECTOR_DB_QDRANT_RESCORE: bool = True
+    VECTOR_DB_QDRANT_OVERSAMPLING: float = 2.0
+    VECTOR_DB_QDRANT_ON_DISK: bool = False
+    VECTOR_DB_QDRANT_HNSW_M: int = 16
+    VECTOR_DB_QDRANT_HNSW_EF_CONSTRUCT: int = 100
+    VECTOR_DB_QDRANT_LAYOUT: str = "collection"
+    # metadata key -> payload schema type indexed at push time, e.g. {"asset_id": "integer", "lang": "keyword"}
+    VECTOR_DB_QDRANT_PAYLOAD_INDEXES: Optional[Dict[str, str]] = None
+    # NUMPY backend: exact in-process search over memory-mapped .npy files
+    VECTOR_DB_NUMPY_PATH: str = "numpy_db"
+    VECTOR_DB_NUMPY_INITIAL_CAPACITY: int = 1024
+    # HNSW backend: embedded hnswlib index, snapshotted to disk
+    VECTOR_DB_HNSW_PATH: str = "hnsw_db"
+    VECTOR_DB_HNSW_M: int = 16
+    VECTOR_DB_HNSW_EF_CONSTRUCTION: int = 200
+    VECTOR_DB_HNSW_EF_SEARCH: int = 64
+    VECTOR_DB_HNSW_INITIAL_CAPACITY: int = 10000
+    VECTOR_DB_HNSW_SEARCH_THREADS: int = 4
+    VECTOR_DB_HNSW_BUILD_THREADS: int = 0
     VECTOR_DB_DISTANCE_METHOD: str = None
     VECTOR_DB_PGVEC_INDEX_THRESHOLD: int = 100
+    VECTOR_DB_PGVEC_COPY_THRESHOLD: int = 1000
+    VECTOR_DB_PGVEC_INDEX_TYPE: str = "hnsw"
+    VECTOR_DB_PGVEC_HNSW_M: int = 16
+    VECTOR_DB_PGVEC_HNSW_EF_CONSTRUCTION: int = 64
+    VECTOR_DB_PGVEC_IVFFLAT_LISTS: Optional[int] = None
+    VECTOR_DB_PGVEC_MAINTENANCE_WORK_MEM: Optional[str] = "1GB"
+    VECTOR_DB_PGVEC_MAX_PARALLEL_MAINTENANCE_WORKERS: Optional[int] = None
+    VECTOR_DB_PGVEC_STORAGE_MODE: str = "float32"
+    VECTOR_DB_PGVEC_RERANK_FACTOR: int = 4
+    VECTOR_DB_PGVEC_ITERATIVE_SCAN: str = "relaxed_order"
+    VECTOR_DB_PGVEC_TEXT_SEARCH_CONFIG: str = "simple"
+    VECTOR_DB_PGVEC_RRF_K: int = 60
+    VECTOR_DB_PGVEC_HYBRID_CANDIDATES: int = 50
+    VECTOR_DB_PGVEC_LAYOUT: str = "table"
+    VECTOR_DB_PGVEC_PARTITIONS: int = 16
+    VECTOR_DB_PGVEC_SEARCH_POOL_MIN_SIZE: int = 2
+    VECTOR_DB_PGVEC_SEARCH_POOL_MAX_SIZE: int = 10
+    VECTOR_DB_PGVEC_STATEMENT_CACHE_SIZE: int = 1024
+
+    SEARCH_BATCH_MAX_QUERIES: int = 1000
+    SEARCH_FANOUT_MAX_PROJECTS: int = 100
+    SEARCH_FANOUT_CONCURRENCY: int = 8
+
+    # semantic answer cache: near-duplicate questions reuse an answer until the project is re-indexed.
+    # Off by default, a similar but different question can get a cached answer
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    ANSWER_CACHE_MAX_ENTRIES_PER_PROJECT: int = 512
+    ANSWER_CACHE_MAX_PROJECTS: int = 64
+    # exact response cache: identical prompts skip the generation call
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    # also keep responses in Postgres (response_cache table, run the alembic migration), shared by all workers
+    RESPONSE_CACHE_POSTGRES: bool = False
 
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
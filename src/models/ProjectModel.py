@@ -3,6 +3,7 @@ from .db_schemes import Project
 from .enum.DataBaseEnum import DataBaseEnum
 from sqlalchemy.future import select
 from sqlalchemy import func
+import time
 
 
 class ProjectModel(BaseDataModel):
@@ -72,6 +73,39 @@ class ProjectModel(BaseDataModel):
         #
         # return Project(**record) # convert dic to Project
 
+    async def get_projects_by_ids(self, project_ids: list):
+        # existing projects only, nothing is created
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(Project).where(Project.project_id.in_(project_ids))
+                result = await session.execute(query)
+                return result.scalars().all()
+
+    async def update_project_config(self, project_id: int, config: dict):
+        # merge into the stored config, None values remove a key
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(Project).where(Project.project_id == project_id)
+                result = await session.execute(query)
+                project_record = result.scalar_one_or_none()
+                if project_record is None:
+                    return None
+
+                project_config = dict(project_record.project_config or {})
+                for key, value in config.items():
+                    if value is None:
+                        project_config.pop(key, None)
+                    else:
+                        project_config[key] = value
+
+                project_record.project_config = project_config
+            await session.refresh(project_record)
+        return project_record
+
+    async def bump_index_version(self, project_id: int):
+        # answer caches compare against it, any change means the collection was rebuilt
+        return await self.update_project_config(project_id=project_id, config={"index_version": time.time_ns()})
+
     async def get_all_projects(self, page: int = 1, page_size:int=10):
 
         async with self.db_client() as session:
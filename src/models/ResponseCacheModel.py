@@ -0,0 +1,46 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemes import ResponseCacheEntry
+from sqlalchemy.future import select
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+
+class ResponseCacheModel(BaseDataModel):
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        return instance
+
+    async def get_response(self, cache_key: str):
+        async with self.db_client() as session:
+            result = await session.execute(
+                select(ResponseCacheEntry.cache_response).where(ResponseCacheEntry.cache_key == cache_key)
+            )
+            return result.scalar_one_or_none()
+
+    async def upsert_response(self, cache_key: str, project_id: int, model_id: str, response: dict):
+        # concurrent misses on the same prompt both write, last one wins
+        stmt = insert(ResponseCacheEntry).values(
+            cache_key=cache_key,
+            cache_project_id=project_id,
+            cache_model_id=model_id,
+            cache_response=response,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResponseCacheEntry.cache_key],
+            set_={"cache_response": stmt.excluded.cache_response},
+        )
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(stmt)
+
+    async def delete_project_responses(self, project_id: int):
+        async with self.db_client() as session:
+            stmt = delete(ResponseCacheEntry).where(ResponseCacheEntry.cache_project_id == project_id)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
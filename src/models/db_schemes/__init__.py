@@ -2,4 +2,4 @@
 #from .data_chunk import DataChunk, RetrievedDocument
 #from .asset import Asset
 
-from src.models.db_schemes.rag_qa.schemes import Project,DataChunk,Asset,RetrievedDocument
\ No newline at end of file
+from src.models.db_schemes.rag_qa.schemes import Project,DataChunk,Asset,RetrievedDocument,ResponseCacheEntry
\ No newline at end of file
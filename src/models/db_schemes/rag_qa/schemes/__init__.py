@@ -1,4 +1,5 @@
 from .rag_qa_base import SQLAlchemyBase
 from .asset import Asset
 from .project import Project
-from .datachunk import DataChunk, RetrievedDocument
\ No newline at end of file
+from .datachunk import DataChunk, RetrievedDocument
+from .response_cache import ResponseCacheEntry
\ No newline at end of file
@@ -0,0 +1,18 @@
+from .rag_qa_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, DateTime, func, String, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+
+class ResponseCacheEntry(SQLAlchemyBase):
+    __tablename__ = 'response_cache'
+
+    # sha256 hex of the generation request, see ResponseCache.cache_key
+    cache_key = Column(String(64), primary_key=True)
+    cache_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    cache_model_id = Column(String, nullable=False)
+    cache_response = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_response_cache_project_id', cache_project_id),
+    )
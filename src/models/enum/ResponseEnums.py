@@ -19,3 +19,4 @@ class ResponseSignalEnum(Enum):
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
     RAG_ANSWER_ERROR = "rag_answer_error"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
+    PROJECT_CONFIG_UPDATED = "project_config_updated"
@@ -158,6 +158,11 @@ async def process_endpoint(request:Request,project_id: int, process_request: Pro
         # delete associated vectors collection
         collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
         _ = await container.vectordb_client.delete_collection(collection_name=collection_name)
+        await project_model.bump_index_version(project_id=project.project_id)
+        if container.answer_cache is not None:
+            container.answer_cache.invalidate(project_id=project.project_id)
+        if container.response_cache is not None:
+            await container.response_cache.invalidate(project_id=project.project_id)
 
         _ = await chunk_model.delete_chunks_by_project_id(
             project_id=project.project_id
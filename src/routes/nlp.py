@@ -1,11 +1,17 @@
 from fastapi import FastAPI, APIRouter, status, Request, HTTPException
-from fastapi.responses import JSONResponse
-from .schemes.nlp_scheme import PushRequest, SearchRequest
+from fastapi.responses import JSONResponse, StreamingResponse
+from .schemes.nlp_scheme import PushRequest, SearchRequest, BatchSearchRequest, MultiSearchRequest, ProjectConfigRequest
 from src.models.ProjectModel import ProjectModel
 from src.models.ChunkModel import ChunkModel
 from src.models import ResponseSignalEnum
 from src.controllers import NLPController
+from src.stores.vectordb.MetadataFilter import MetadataFilter
+from src.stores.vectordb.VectorDBEnums import SearchModeEnums
+from src.stores.llms.Enums_LLM import StreamEventEnum
+from src.utils.metrics import ANSWER_TIME_TO_FIRST_TOKEN
 from tqdm.auto import tqdm
+import json
+import time
 
 
 import logging
@@ -48,6 +54,7 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
         vectordb_client=container.vectordb_client,
         generation_client=container.generation_client,
         embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
         template_parser=container.template_parser
     )
 
@@ -63,13 +70,15 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
         collection_name=collection_name,
         embedding_size=container.embedding_client.embedding_dimensions_size,
         do_reset=push_request.do_reset,
+        options=nlp_controller.get_collection_options(project=project),
     )
 
     total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
     pbar = tqdm(total=total_chunks_count, desc="Vector Indexing", position=0)
 
     while has_records:
-        page_chunks=await chunk_model.get_project_chunks(project_id=project.project_id,page_no=page_number)
+        page_chunks=await chunk_model.get_project_chunks(project_id=project.project_id,page_no=page_number,
+                                                         page_size=container.settings.INDEXING_PAGE_SIZE)
         if len(page_chunks):
             page_number+=1
 
@@ -98,6 +107,22 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
         pbar.update(len(page_chunks))
         inserted_items_count+=len(page_chunks)
 
+    # build the ANN index once / wait for pending writes, after the whole load
+    is_finalized = await container.vectordb_client.finalize_collection(collection_name=collection_name)
+    if not is_finalized:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.INSERT_INTO_VECTORDB_ERROR.value
+            }
+        )
+
+    # answers cached before this push were built on the old collection
+    await project_model.bump_index_version(project_id=project.project_id)
+    if container.answer_cache is not None:
+        container.answer_cache.invalidate(project_id=project.project_id)
+    if container.response_cache is not None:
+        await container.response_cache.invalidate(project_id=project.project_id)
 
 
     return JSONResponse(
@@ -125,6 +150,7 @@ async def get_project_index_info(request: Request, project_id: int):
         vectordb_client=container.vectordb_client,
         generation_client=container.generation_client,
         embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
         template_parser=container.template_parser
     )
 
@@ -148,14 +174,39 @@ async def search_index(request: Request, project_id: int, search_request: Search
         vectordb_client=container.vectordb_client,
         generation_client=container.generation_client,
         embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
         template_parser=container.template_parser,
     )
 
+    try:
+        filters = MetadataFilter.from_dict(search_request.filters)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": str(e)
+            }
+        )
+
+    if search_request.mode not in [m.value for m in SearchModeEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": f"Unknown search mode: {search_request.mode}"
+            }
+        )
+
     try:
         results, usage_data =await nlp_controller.search_vector_db_collection(
             project=project,
             text=search_request.text,
-            limit=search_request.limit
+            limit=search_request.limit,
+            ef_search=search_request.ef_search,
+            probes=search_request.probes,
+            filters=filters,
+            mode=search_request.mode,
         )
     except HTTPException as e:
         if e.status_code == status.HTTP_409_CONFLICT:
@@ -191,6 +242,141 @@ async def search_index(request: Request, project_id: int, search_request: Search
         }
     )
 
+#Search many queries in one call: one embedding request, one vector DB round trip
+@nlp_router.post("/index/search-batch/{project_id}")
+async def search_index_batch(request: Request, project_id: int, search_request: BatchSearchRequest):
+    container = request.app.state.container
+
+    if not search_request.texts or len(search_request.texts) > container.settings.SEARCH_BATCH_MAX_QUERIES:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": f"texts must hold 1 to {container.settings.SEARCH_BATCH_MAX_QUERIES} queries"
+            }
+        )
+
+    try:
+        filters = MetadataFilter.from_dict(search_request.filters)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": str(e)
+            }
+        )
+
+    project_model = await ProjectModel.create_instance(db_client=container.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    nlp_controller = NLPController(
+        vectordb_client=container.vectordb_client,
+        generation_client=container.generation_client,
+        embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
+        template_parser=container.template_parser,
+    )
+
+    batch = await nlp_controller.search_vector_db_collection_batch(
+        project=project,
+        texts=search_request.texts,
+        limit=search_request.limit,
+        ef_search=search_request.ef_search,
+        probes=search_request.probes,
+        filters=filters,
+    )
+
+    if not batch:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value
+            }
+        )
+
+    results, usage_data = batch
+    return JSONResponse(
+        content={
+            "signal": ResponseSignalEnum.VECTORDB_SEARCH_SUCCESS.value,
+            "results": [[r.dict() for r in query_results] for query_results in results],
+            "usage_data": usage_data
+        }
+    )
+
+#Search one query over several projects, merged into one ranking
+@nlp_router.post("/index/search-multi")
+async def search_index_multi(request: Request, search_request: MultiSearchRequest):
+    container = request.app.state.container
+    project_ids = list(dict.fromkeys(search_request.project_ids))
+
+    if not project_ids or len(project_ids) > container.settings.SEARCH_FANOUT_MAX_PROJECTS:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": f"project_ids must hold 1 to {container.settings.SEARCH_FANOUT_MAX_PROJECTS} projects"
+            }
+        )
+
+    try:
+        filters = MetadataFilter.from_dict(search_request.filters)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": str(e)
+            }
+        )
+
+    project_model = await ProjectModel.create_instance(db_client=container.db_client)
+    projects = await project_model.get_projects_by_ids(project_ids=project_ids)
+    if not projects:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignalEnum.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    nlp_controller = NLPController(
+        vectordb_client=container.vectordb_client,
+        generation_client=container.generation_client,
+        embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
+        template_parser=container.template_parser,
+    )
+
+    search = await nlp_controller.search_vector_db_collections(
+        projects=projects,
+        text=search_request.text,
+        limit=search_request.limit,
+        ef_search=search_request.ef_search,
+        probes=search_request.probes,
+        filters=filters,
+        concurrency=container.settings.SEARCH_FANOUT_CONCURRENCY,
+    )
+
+    if not search:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value
+            }
+        )
+
+    hits, usage_data = search
+    found_ids = {project.project_id for project in projects}
+    return JSONResponse(
+        content={
+            "signal": ResponseSignalEnum.VECTORDB_SEARCH_SUCCESS.value,
+            "results": [{"project_id": project_id, **document.dict()} for project_id, document in hits],
+            "missing_project_ids": [project_id for project_id in project_ids if project_id not in found_ids],
+            "usage_data": usage_data
+        }
+    )
+
 #Take the similar chunk and send it to the LLM to generate an answer
 @nlp_router.post("/index/answer/{project_id}")
 async def answer_rag_from_user(request: Request, project_id: int, search_request: SearchRequest):
@@ -207,13 +393,40 @@ async def answer_rag_from_user(request: Request, project_id: int, search_request
         vectordb_client=container.vectordb_client,
         generation_client=container.generation_client,
         embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
         template_parser=container.template_parser,
+        answer_cache=container.answer_cache,
+        response_cache=container.response_cache,
     )
 
-    answer_from_generation_model, full_prompt, chat_history, total_tokens, cost= await nlp_controller.answer_rag_question(
+    try:
+        filters = MetadataFilter.from_dict(search_request.filters)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": str(e)
+            }
+        )
+
+    if search_request.mode not in [m.value for m in SearchModeEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": f"Unknown search mode: {search_request.mode}"
+            }
+        )
+
+    answer_from_generation_model, full_prompt, chat_history, total_tokens, cost, cached = await nlp_controller.answer_rag_question(
         project=project,
         query=search_request.text,
         limit=search_request.limit,
+        ef_search=search_request.ef_search,
+        probes=search_request.probes,
+        filters=filters,
+        mode=search_request.mode,
     )
 
     logger.debug("=" * 20)
@@ -235,7 +448,125 @@ async def answer_rag_from_user(request: Request, project_id: int, search_request
             "full_prompt": full_prompt,
             "chat_history": chat_history,
             "total_tokens":total_tokens,
-            "cost": cost
+            "cost": cost,
+            # true when the answer came from a cache instead of the generation model
+            "cached": cached,
         })
 
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+#Same as /index/answer, but streams the retrieved documents, then the answer tokens, over Server-Sent Events
+@nlp_router.post("/index/answer/stream/{project_id}")
+async def stream_rag_answer_from_user(request: Request, project_id: int, search_request: SearchRequest):
+    started_at = time.perf_counter()
+    container = request.app.state.container
+    project_model = await ProjectModel.create_instance(
+        db_client=container.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    nlp_controller = NLPController(
+        vectordb_client=container.vectordb_client,
+        generation_client=container.generation_client,
+        embedding_client=container.embedding_client,
+        embedding_scheduler=container.embedding_scheduler,
+        template_parser=container.template_parser,
+        answer_cache=container.answer_cache,
+        response_cache=container.response_cache,
+    )
+
+    try:
+        filters = MetadataFilter.from_dict(search_request.filters)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": str(e)
+            }
+        )
+
+    if search_request.mode not in [m.value for m in SearchModeEnums]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.VECTORDB_SEARCH_ERROR.value,
+                "message": f"Unknown search mode: {search_request.mode}"
+            }
+        )
+
+    async def event_stream():
+        # headers are already sent, failures are reported as an error event
+        answered = False
+        try:
+            async for event, data in nlp_controller.stream_rag_answer(
+                project=project,
+                query=search_request.text,
+                limit=search_request.limit,
+                ef_search=search_request.ef_search,
+                probes=search_request.probes,
+                filters=filters,
+                mode=search_request.mode,
+            ):
+                if event == StreamEventEnum.ERROR:
+                    break
+                if event == StreamEventEnum.DELTA:
+                    if not answered:
+                        ANSWER_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - started_at)
+                        answered = True
+                    data = {"text": data}
+                yield sse_event(event.value, data)
+        except Exception as e:
+            logger.error(f"Error while streaming the RAG answer: {e}")
+            answered = False
+
+        if not answered:
+            yield sse_event(StreamEventEnum.ERROR.value, {"signal": ResponseSignalEnum.RAG_ANSWER_ERROR.value})
+            return
+
+        yield sse_event(StreamEventEnum.DONE.value, {"signal": ResponseSignalEnum.RAG_ANSWER_SUCCESS.value})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx would otherwise hold the events until the answer is complete
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+#Set project-level search defaults (ef_search / probes) and collection storage options
+@nlp_router.post("/index/config/{project_id}")
+async def update_project_index_config(request: Request, project_id: int, config_request: ProjectConfigRequest):
+    container = request.app.state.container
+    project_model = await ProjectModel.create_instance(
+        db_client=container.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    project = await project_model.update_project_config(
+        project_id=project.project_id,
+        config=config_request.dict(exclude_unset=True),
+    )
+
+    if not project:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignalEnum.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignalEnum.PROJECT_CONFIG_UPDATED.value,
+            "project_config": project.project_config
+        }
+    )
@@ -1,10 +1,46 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
 
+# pgvector's hnsw.ef_search range tops out at 1000, results never need more than that
+MAX_SEARCH_LIMIT = 1000
+MAX_EF_SEARCH = 1000
+# upper bound before the body is even validated, SEARCH_BATCH_MAX_QUERIES can lower it
+MAX_BATCH_QUERIES = 1000
+
 class SearchRequest(BaseModel):
     text: str
-    limit: Optional[int] = 5
\ No newline at end of file
+    limit: Optional[int] = Field(5, ge=1, le=MAX_SEARCH_LIMIT)
+    # ANN recall/latency knobs, fall back to the project config
+    ef_search: Optional[int] = Field(None, ge=1, le=MAX_EF_SEARCH)  # hnsw.ef_search / Qdrant hnsw_ef
+    probes: Optional[int] = Field(None, ge=1)  # ivfflat.probes
+    # metadata filter, e.g. {"asset_id": 3, "page": {"gte": 10}}
+    filters: Optional[dict] = None
+    # "vector" or "hybrid" (full-text + vector, fused with RRF)
+    mode: Optional[str] = "vector"
+
+class BatchSearchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
+    limit: Optional[int] = Field(5, ge=1, le=MAX_SEARCH_LIMIT)
+    ef_search: Optional[int] = Field(None, ge=1, le=MAX_EF_SEARCH)
+    probes: Optional[int] = Field(None, ge=1)
+    # applied to every query of the batch
+    filters: Optional[dict] = None
+
+class MultiSearchRequest(BaseModel):
+    project_ids: List[int]
+    text: str
+    # global top-k over all projects
+    limit: Optional[int] = Field(5, ge=1, le=MAX_SEARCH_LIMIT)
+    ef_search: Optional[int] = Field(None, ge=1, le=MAX_EF_SEARCH)
+    probes: Optional[int] = Field(None, ge=1)
+    filters: Optional[dict] = None
+
+class ProjectConfigRequest(BaseModel):
+    ef_search: Optional[int] = Field(None, ge=1, le=MAX_EF_SEARCH)
+    probes: Optional[int] = Field(None, ge=1)
+    # vector DB storage for new collections, e.g. {"quantization": "binary", "on_disk": true}
+    collection_options: Optional[dict] = None
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Move table-per-project pgvector collections into the shared partitioned layout.
+
+    VECTOR_DB_PGVEC_LAYOUT=partitioned python -m src.scripts.migrate_pgvector_layout [collection_name ...]
+
+Without arguments every collection table is migrated. Each collection is copied and
+its old table dropped in one transaction, so the script can be re-run after a failure.
+"""
+import asyncio
+import sys
+from src.utils.client_deps_container import DependencyContainer
+
+
+async def migrate(collection_names: list):
+    container = await DependencyContainer.create()
+    try:
+        migrated = await container.vectordb_client.migrate_layout(collection_names=collection_names or None)
+        for collection_name, moved_rows in migrated.items():
+            print(f"{collection_name}: {moved_rows} records")
+        print(f"Migrated {len(migrated)} collections")
+    finally:
+        await container.shutdown()
+
+
+def main():
+    asyncio.run(migrate(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
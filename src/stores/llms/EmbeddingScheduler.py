@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import List, Tuple, Union
+
+import httpx
+import openai
+import tiktoken
+
+
+class RateLimitBudget:
+    """
+    Sliding one-minute window over requests and tokens sent to the provider.
+    A limit of None (or 0) disables that side of the budget.
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = 60.0
+
+        self._events = deque()  # (timestamp, tokens)
+        self._window_tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _evict(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window_seconds:
+            _, tokens = self._events.popleft()
+            self._window_tokens -= tokens
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        wait = 0.0
+
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            oldest = self._events[len(self._events) - self.requests_per_minute][0]
+            wait = max(wait, oldest + self.window_seconds - now)
+
+        if self.tokens_per_minute and self._events and tokens > self.tokens_per_minute:
+            # bigger than the whole budget: only goes out alone, once the window is empty
+            wait = max(wait, self._events[-1][0] + self.window_seconds - now)
+
+        elif self.tokens_per_minute and self._events and self._window_tokens + tokens > self.tokens_per_minute:
+            # wait until enough old tokens leave the window
+            freed = 0
+            for ts, event_tokens in self._events:
+                freed += event_tokens
+                if self._window_tokens - freed + tokens <= self.tokens_per_minute:
+                    wait = max(wait, ts + self.window_seconds - now)
+                    break
+
+        return wait
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._evict(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    self._events.append((now, tokens))
+                    self._window_tokens += tokens
+                    return
+                await asyncio.sleep(wait)
+
+
+class EmbeddingScheduler:
+    """
+    Packs texts into provider-sized batches by token count and embeds them
+    concurrently under a shared requests/tokens per minute budget.
+    Failed batches (429, 5xx, network errors) are retried with jittered exponential backoff.
+    """
+
+    RETRYABLE_STATUS_CODES = {408, 409, 429}
+    RETRYABLE_TRANSPORT_ERRORS = (openai.APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError)
+
+    def __init__(self, embedding_client,
+                 max_batch_tokens: int = 100_000,
+                 max_batch_inputs: int = 96,
+                 concurrency: int = 4,
+                 requests_per_minute: int = None,
+                 tokens_per_minute: int = None,
+                 max_retries: int = 5,
+                 backoff_base_seconds: float = 0.5,
+                 backoff_max_seconds: float = 30.0):
+
+        self.embedding_client = embedding_client
+
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self.budget = RateLimitBudget(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+        self.encoding = tiktoken.get_encoding("cl100k_base")
+
+        self.logger = logging.getLogger("uvicorn")
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        # count what the provider will actually receive: only some providers truncate
+        if getattr(self.embedding_client, "TRUNCATES_EMBEDDING_INPUT", False):
+            texts = [self.embedding_client.process_text(t) for t in texts]
+        return [max(1, len(tokens)) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def pack_batches(self, token_counts: List[int]) -> List[Tuple[int, int, int]]:
+        """
+        Greedy packing that keeps input order.
+        Returns (start, end, tokens) ranges over the input list.
+        """
+        # a batch larger than the per-minute budget could never be sent within it
+        max_batch_tokens = self.max_batch_tokens
+        if self.budget.tokens_per_minute:
+            max_batch_tokens = min(max_batch_tokens, self.budget.tokens_per_minute)
+
+        batches = []
+        start, batch_tokens = 0, 0
+
+        for idx, tokens in enumerate(token_counts):
+            batch_size = idx - start
+            if batch_size and (batch_size >= self.max_batch_inputs
+                               or batch_tokens + tokens > max_batch_tokens):
+                batches.append((start, idx, batch_tokens))
+                start, batch_tokens = idx, 0
+            batch_tokens += tokens
+
+        if start < len(token_counts):
+            batches.append((start, len(token_counts), batch_tokens))
+
+        return batches
+
+    def is_retryable(self, exc: Exception) -> bool:
+        # connection reset / timeout (APITimeoutError is an APIConnectionError)
+        if isinstance(exc, self.RETRYABLE_TRANSPORT_ERRORS):
+            return True
+
+        status_code = getattr(exc, "status_code", None)
+        if status_code is None:
+            status_code = getattr(getattr(exc, "response", None), "status_code", None)
+
+        # anything else without an HTTP status is a bug, not a transient failure
+        if not isinstance(status_code, int):
+            return False
+
+        return status_code in self.RETRYABLE_STATUS_CODES or status_code >= 500
+
+    def backoff_seconds(self, attempt: int) -> float:
+        # "full jitter" so concurrent batches don't retry in lockstep
+        cap = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def split_response(response) -> Tuple[list, Union[dict, None]]:
+        # OpenAI-style providers return (vectors, usage_data), Cohere returns vectors only
+        if isinstance(response, tuple):
+            return response[0], response[1]
+        return response, None
+
+    async def embed_batch(self, texts: List[str], tokens: int, document_type: str = None):
+        attempt = 0
+        while True:
+            await self.budget.acquire(tokens)
+
+            try:
+                response = await asyncio.to_thread(
+                    self.embedding_client.embed_text, text=texts, document_type=document_type
+                )
+                vectors, usage_data = self.split_response(response)
+                if vectors is None or len(vectors) != len(texts):
+                    raise RuntimeError("Embedding provider returned no or partial vectors")
+                return vectors, usage_data
+
+            except Exception as exc:
+                if attempt >= self.max_retries or not self.is_retryable(exc):
+                    self.logger.error(f"Embedding batch of {len(texts)} texts failed: {exc}")
+                    raise
+
+                delay = self.backoff_seconds(attempt)
+                attempt += 1
+                self.logger.warning(
+                    f"Embedding batch failed ({exc}), retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def merge_usage(usages: List[dict]) -> Union[dict, None]:
+        usages = [u for u in usages if u]
+        if not usages:
+            return None
+
+        total_cost = sum(float(str(u.get("total_cost", 0)).rstrip("$") or 0) for u in usages)
+        return {
+            "prompt_tokens": sum(u.get("prompt_tokens", 0) for u in usages),
+            "total_tokens": sum(u.get("total_tokens", 0) for u in usages),
+            "total_cost": f"{total_cost:.8f}$",
+        }
+
+    async def embed_texts(self, texts: List[str], document_type: str = None):
+        """
+        Embed all texts, preserving order.
+        Returns (vectors, usage_data); raises if any batch fails after retries.
+        """
+        if not texts:
+            return [], None
+
+        batches = self.pack_batches(self.count_tokens(texts))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(start: int, end: int, tokens: int):
+            async with semaphore:
+                return await self.embed_batch(texts[start:end], tokens, document_type=document_type)
+
+        self.logger.info(
+            f"Embedding {len(texts)} texts in {len(batches)} batches (concurrency={self.concurrency})"
+        )
+
+        results = await asyncio.gather(*[run(*batch) for batch in batches])
+
+        vectors = []
+        for batch_vectors, _ in results:
+            vectors.extend(batch_vectors)
+
+        return vectors, self.merge_usage([usage for _, usage in results])
@@ -3,6 +3,8 @@ from enum import Enum
 class Enums_LLM(Enum):
     OPENAI = "OPENAI"
     COHERE = "COHERE"
+    LOCAL = "LOCAL"
+    FAKE = "FAKE"
 
 class OpenAIEnums(Enum):
     SYSTEM = "system"
@@ -19,4 +21,17 @@ class CoHereEnums(Enum):
 
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
-    QUERY = "query"
\ No newline at end of file
+    QUERY = "query"
+
+class FakeLatencyDistributionEnums(Enum):
+    CONSTANT = "constant"
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+
+class StreamEventEnum(Enum):
+    RETRIEVAL = "retrieval"
+    DELTA = "delta"
+    USAGE = "usage"
+    DONE = "done"
+    ERROR = "error"
@@ -15,6 +15,12 @@ class Interface_LLM(ABC):
                             temperature: float = None):
         pass
 
+    @abstractmethod
+    def stream_text(self, prompt: str, chat_history: list=None, max_output_tokens: int=None,
+                          temperature: float = None):
+        # generator of (StreamEventEnum.DELTA, text) ... then (StreamEventEnum.USAGE, usage dict)
+        pass
+
     @abstractmethod
     def embed_text(self, text: str, document_type: str = None):
         pass
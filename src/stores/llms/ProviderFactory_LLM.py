@@ -1,5 +1,5 @@
 from .Enums_LLM import Enums_LLM
-from .provider import OpenAIProvider, CoHereProvider
+from .provider import OpenAIProvider, CoHereProvider, LocalProvider, FakeProvider
 
 
 class LLMProviderFactory:
@@ -24,5 +24,28 @@ class LLMProviderFactory:
                 default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE
             )
 
+        if provider==Enums_LLM.LOCAL.value:
+            return LocalProvider(
+                default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
+                max_batch_size=self.config.LOCAL_EMBEDDING_MAX_BATCH_SIZE,
+                num_threads=self.config.LOCAL_EMBEDDING_NUM_THREADS,
+                worker_torch_threads=self.config.LOCAL_EMBEDDING_WORKER_TORCH_THREADS,
+                device=self.config.LOCAL_EMBEDDING_DEVICE,
+                query_prefix=self.config.LOCAL_EMBEDDING_QUERY_PREFIX,
+                document_prefix=self.config.LOCAL_EMBEDDING_DOCUMENT_PREFIX,
+            )
+
+        if provider==Enums_LLM.FAKE.value:
+            return FakeProvider(
+                default_input_max_characters=self.config.INPUT_DAFAULT_MAX_CHARACTERS,
+                default_generation_max_output_tokens=self.config.GENERATION_DAFAULT_MAX_TOKENS,
+                default_generation_temperature=self.config.GENERATION_DAFAULT_TEMPERATURE,
+                latency_distribution=self.config.FAKE_LATENCY_DISTRIBUTION,
+                generation_latency_ms=self.config.FAKE_GENERATION_LATENCY_MS,
+                embedding_latency_ms=self.config.FAKE_EMBEDDING_LATENCY_MS,
+                latency_stddev_ms=self.config.FAKE_LATENCY_STDDEV_MS,
+                seed=self.config.FAKE_SEED,
+            )
+
         return None
 
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Exact cache of generation responses, keyed by a hash of everything that reaches the
+    model (model id, chat history, prompt, temperature, max tokens). A bounded in-memory
+    LRU sits in front of an optional persistent tier (ResponseCacheModel, Postgres) that
+    is shared by all workers. Entries are dropped per project on re-index.
+    Cache errors are logged, never raised: a broken cache only costs a model call.
+    """
+
+    def __init__(self, max_entries: int = 10000, store=None):
+        self.max_entries = max_entries
+        self.store = store
+
+        self.entries = OrderedDict()  # cache_key -> (project_id, response)
+
+        self.logger = logging.getLogger("uvicorn")
+
+    @staticmethod
+    def cache_key(project_id: int, index_version, model_id: str, chat_history: list, prompt: str,
+                  temperature: float = None, max_output_tokens: int = None) -> str:
+        # index_version keeps other workers' memory tier from serving pre re-index answers
+        payload = json.dumps(
+            [project_id, index_version, model_id, chat_history, prompt, temperature, max_output_tokens],
+            ensure_ascii=False, sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def remember(self, cache_key: str, project_id: int, response: dict):
+        self.entries[cache_key] = (project_id, response)
+        self.entries.move_to_end(cache_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, cache_key: str, project_id: int) -> dict:
+        entry = self.entries.get(cache_key)
+        if entry is not None:
+            self.entries.move_to_end(cache_key)
+            return entry[1]
+
+        if self.store is None:
+            return None
+
+        try:
+            response = await self.store.get_response(cache_key=cache_key)
+        except Exception as e:
+            self.logger.error(f"Error while reading the response cache: {e}")
+            return None
+
+        if response is not None:
+            self.remember(cache_key=cache_key, project_id=project_id, response=response)
+        return response
+
+    async def set(self, cache_key: str, project_id: int, model_id: str, response: dict):
+        self.remember(cache_key=cache_key, project_id=project_id, response=response)
+
+        if self.store is None:
+            return
+
+        try:
+            await self.store.upsert_response(cache_key=cache_key, project_id=project_id,
+                                             model_id=model_id, response=response)
+        except Exception as e:
+            self.logger.error(f"Error while writing the response cache: {e}")
+
+    async def invalidate(self, project_id: int):
+        stale_keys = [key for key, (entry_project_id, _) in self.entries.items() if entry_project_id == project_id]
+        for key in stale_keys:
+            del self.entries[key]
+
+        if self.store is None:
+            return
+
+        try:
+            await self.store.delete_project_responses(project_id=project_id)
+        except Exception as e:
+            self.logger.error(f"Error while clearing the response cache: {e}")
@@ -0,0 +1,150 @@
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ProjectAnswerCache:
+    """
+    Cached answers of one project at one index_version. Query embeddings are kept
+    L2-normalized in one contiguous matrix so a lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, embedding_size: int, max_entries: int, index_version=None, initial_capacity: int = 16):
+        self.embedding_size = embedding_size
+        self.max_entries = max_entries
+        self.index_version = index_version
+
+        capacity = max(1, min(initial_capacity, max_entries))
+        self.vectors = np.zeros((capacity, embedding_size), dtype=np.float32)
+        # per slot: scope hash, last access tick, cached answer
+        self.scopes = np.zeros(capacity, dtype=np.int64)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def grow(self):
+        capacity = min(self.vectors.shape[0] * 2, self.max_entries)
+        vectors = np.zeros((capacity, self.embedding_size), dtype=np.float32)
+        vectors[:len(self.entries)] = self.vectors[:len(self.entries)]
+        self.vectors = vectors
+        self.scopes = np.resize(self.scopes, capacity)
+        self.last_used = np.resize(self.last_used, capacity)
+
+    def lookup(self, vector: np.ndarray, scope: int, threshold: float, tick: int):
+        count = len(self.entries)
+        if count == 0:
+            return None
+
+        similarities = self.vectors[:count] @ vector
+        similarities[self.scopes[:count] != scope] = -np.inf
+
+        slot = int(np.argmax(similarities))
+        if similarities[slot] < threshold:
+            return None
+
+        self.last_used[slot] = tick
+        return self.entries[slot]
+
+    def store(self, vector: np.ndarray, scope: int, entry: dict, tick: int):
+        count = len(self.entries)
+        if count < self.max_entries:
+            if count == self.vectors.shape[0]:
+                self.grow()
+            slot = count
+            self.entries.append(entry)
+        else:
+            # full: overwrite the least recently used answer
+            slot = int(np.argmin(self.last_used[:count]))
+            self.entries[slot] = entry
+
+        self.vectors[slot] = vector
+        self.scopes[slot] = scope
+        self.last_used[slot] = tick
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by query embedding, per project. A question whose embedding is within
+    `similarity_threshold` (cosine) of a cached question with the same retrieval scope
+    (limit, filters, mode) gets the cached answer, as long as the project has not been
+    re-indexed since. Bounded per project, least recently used entries and projects
+    are evicted first.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92,
+                 max_entries_per_project: int = 512,
+                 max_projects: int = 64):
+
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_project = max_entries_per_project
+        self.max_projects = max_projects
+
+        self.projects = OrderedDict()  # project_id -> ProjectAnswerCache
+        self.tick = 0
+
+        self.logger = logging.getLogger("uvicorn")
+
+    @staticmethod
+    def scope_key(scope: str) -> int:
+        # np.int64 friendly, stable within the process
+        return hash(scope) & 0x7FFFFFFFFFFFFFFF
+
+    @staticmethod
+    def normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def next_tick(self) -> int:
+        self.tick += 1
+        return self.tick
+
+    def lookup(self, project_id: int, vector, scope: str, index_version=None) -> dict:
+        project_cache = self.projects.get(project_id)
+        if project_cache is None:
+            return None
+
+        if project_cache.index_version != index_version:
+            # re-indexed (possibly by another worker) since these answers were cached
+            self.invalidate(project_id=project_id)
+            return None
+
+        vector = self.normalize(vector)
+        if vector.shape[0] != project_cache.embedding_size:
+            return None
+
+        self.projects.move_to_end(project_id)
+        return project_cache.lookup(
+            vector=vector,
+            scope=self.scope_key(scope),
+            threshold=self.similarity_threshold,
+            tick=self.next_tick(),
+        )
+
+    def store(self, project_id: int, vector, scope: str, entry: dict, index_version=None):
+        vector = self.normalize(vector)
+
+        project_cache = self.projects.get(project_id)
+        if (project_cache is None or project_cache.embedding_size != vector.shape[0]
+                or project_cache.index_version != index_version):
+            project_cache = ProjectAnswerCache(embedding_size=vector.shape[0],
+                                               max_entries=self.max_entries_per_project,
+                                               index_version=index_version)
+            self.projects[project_id] = project_cache
+            if len(self.projects) > self.max_projects:
+                self.projects.popitem(last=False)
+
+        self.projects.move_to_end(project_id)
+        project_cache.store(
+            vector=vector,
+            scope=self.scope_key(scope),
+            entry=entry,
+            tick=self.next_tick(),
+        )
+
+    def invalidate(self, project_id: int):
+        if self.projects.pop(project_id, None) is not None:
+            self.logger.info(f"Answer cache cleared for project {project_id}")
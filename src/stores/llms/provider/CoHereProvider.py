@@ -1,5 +1,5 @@
 from ..Interface_LLM import Interface_LLM
-from ..Enums_LLM import CoHereEnums, DocumentTypeEnum
+from ..Enums_LLM import CoHereEnums, DocumentTypeEnum, StreamEventEnum
 import cohere
 import logging
 from typing import List, Union
@@ -7,6 +7,9 @@ from typing import List, Union
 
 class CoHereProvider(Interface_LLM):
 
+    # embed_text sends process_text() output, see EmbeddingScheduler.count_tokens
+    TRUNCATES_EMBEDDING_INPUT = True
+
     def __init__(self, api_key: str,
                  default_input_max_characters: int = 1000,
                  default_generation_max_output_tokens: int = 1000,
@@ -66,6 +69,37 @@ class CoHereProvider(Interface_LLM):
 
         return response.text
 
+    def stream_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                    temperature: float = None):
+
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature else self.default_generation_temperature
+
+        usage = {"total_tokens": None, "cost": None}
+        for event in self.client.chat_stream(
+            model=self.generation_model_id,
+            chat_history=chat_history or [],
+            message=self.process_text(prompt),
+            temperature=temperature,
+            max_tokens=max_output_tokens
+        ):
+            if event.event_type == "text-generation" and event.text:
+                yield StreamEventEnum.DELTA, event.text
+            elif event.event_type == "stream-end":
+                billed_units = event.response.meta.billed_units if event.response.meta else None
+                if billed_units:
+                    usage["total_tokens"] = int((billed_units.input_tokens or 0) + (billed_units.output_tokens or 0))
+
+        yield StreamEventEnum.USAGE, usage
+
 
     def embed_text(self, text: Union[str,List[str]], document_type: str = None):
 
@@ -92,8 +126,9 @@ class CoHereProvider(Interface_LLM):
                 embedding_types=["float"],  # fine to keep
             )
         except Exception as exc:
-            self.logger.exception("Cohere embed failed: %s", exc)
-            return None
+            # raised like OpenAI's, EmbeddingScheduler retries on its status_code (429 / 5xx)
+            self.logger.error("Cohere embed failed: %s", exc)
+            raise
 
         vectors = getattr(resp.embeddings, "float", None)  # list of vectors
 
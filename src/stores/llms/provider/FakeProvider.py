@@ -0,0 +1,200 @@
+from ..Interface_LLM import Interface_LLM
+from ..Enums_LLM import OpenAIEnums, FakeLatencyDistributionEnums, StreamEventEnum
+import hashlib
+import logging
+import math
+import random
+import time
+from typing import List, Union
+
+
+class FakeProvider(Interface_LLM):
+    """
+    Deterministic offline provider for load tests.
+    Embeddings are unit vectors seeded by a hash of the input text, generations are
+    canned answers picked by a hash of the prompt. Latency is simulated per call.
+    """
+
+    # inputs are cut to default_input_max_characters before embedding
+    TRUNCATES_EMBEDDING_INPUT = True
+
+    CANNED_ANSWERS = [
+        "Based on the provided documents, the answer is described in document 1.",
+        "The documents do not contain enough information to answer this question.",
+        "According to the retrieved context, the relevant steps are listed in the first two documents.",
+        "The answer can be found by combining the information from documents 1 and 3.",
+    ]
+
+    # USD per 1M tokens, same shape as OpenAIProvider.calc_cost
+    PRICES = {"input": 0.15, "output": 0.60, "embedding": 0.02}
+
+    def __init__(self, default_input_max_characters: int = 1000,
+                 default_generation_max_output_tokens: int = 1000,
+                 default_generation_temperature: float = 0.1,
+                 latency_distribution: str = FakeLatencyDistributionEnums.CONSTANT.value,
+                 generation_latency_ms: float = 0.0,
+                 embedding_latency_ms: float = 0.0,
+                 latency_stddev_ms: float = 0.0,
+                 seed: int = 0):
+
+        self.default_input_max_characters = default_input_max_characters
+        self.default_generation_max_output_tokens = default_generation_max_output_tokens
+        self.default_generation_temperature = default_generation_temperature
+
+        self.latency_distribution = latency_distribution
+        self.generation_latency_ms = generation_latency_ms
+        self.embedding_latency_ms = embedding_latency_ms
+        self.latency_stddev_ms = latency_stddev_ms
+        self.seed = seed
+
+        self.generation_model_id = None
+        self.embedding_model_id = None
+        self.embedding_dimensions_size = None
+
+        # only drives the latency samples, vectors/answers are hash seeded
+        self.latency_rng = random.Random(seed)
+
+        self.enums = OpenAIEnums
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def set_embedding_model(self, model_id: str, embedding_dimensions_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_dimensions_size = embedding_dimensions_size
+
+    def process_text(self, text: str):
+        return text[:self.default_input_max_characters].strip()
+
+    def sample_latency_ms(self, mean_ms: float) -> float:
+        if mean_ms <= 0:
+            return 0.0
+
+        if self.latency_distribution == FakeLatencyDistributionEnums.UNIFORM.value:
+            spread = self.latency_stddev_ms * math.sqrt(3)
+            return max(0.0, self.latency_rng.uniform(mean_ms - spread, mean_ms + spread))
+
+        if self.latency_distribution == FakeLatencyDistributionEnums.NORMAL.value:
+            return max(0.0, self.latency_rng.gauss(mean_ms, self.latency_stddev_ms))
+
+        if self.latency_distribution == FakeLatencyDistributionEnums.LOGNORMAL.value:
+            # parameters chosen so the samples have the configured mean and stddev
+            variance = self.latency_stddev_ms ** 2
+            sigma = math.sqrt(math.log(1 + variance / mean_ms ** 2))
+            mu = math.log(mean_ms) - sigma ** 2 / 2
+            return self.latency_rng.lognormvariate(mu, sigma)
+
+        return mean_ms
+
+    def simulate_latency(self, mean_ms: float):
+        latency_ms = self.sample_latency_ms(mean_ms)
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+    def hash_seed(self, text: str) -> int:
+        digest = hashlib.sha256(f"{self.seed}:{text}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def count_tokens(self, text: str) -> int:
+        # ~4 characters per token, close enough for cost/usage shapes
+        return max(1, len(text) // 4)
+
+    def generate_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                      temperature: float = None):
+
+        if chat_history is None:
+            chat_history = []
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Fake provider was not set")
+            return None
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
+        )
+
+        self.simulate_latency(self.generation_latency_ms)
+
+        message = self.CANNED_ANSWERS[self.hash_seed(prompt) % len(self.CANNED_ANSWERS)]
+
+        prompt_tokens = sum(self.count_tokens(m.get("content", "")) for m in chat_history)
+        output_tokens = min(self.count_tokens(message), max_output_tokens)
+        total_tokens = prompt_tokens + output_tokens
+
+        total_cost = (prompt_tokens * self.PRICES["input"] + output_tokens * self.PRICES["output"]) / 1_000_000
+
+        return message, total_tokens, f"{total_cost:.8f}$"
+
+    def stream_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                    temperature: float = None):
+
+        if chat_history is None:
+            chat_history = []
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Fake provider was not set")
+            return
+
+        max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
+        )
+
+        message = self.CANNED_ANSWERS[self.hash_seed(prompt) % len(self.CANNED_ANSWERS)]
+
+        # the generation latency is spread over the words, so time-to-first-token
+        # is a fraction of the full answer time like with a real model
+        words = message.split(" ")
+        for idx, word in enumerate(words):
+            self.simulate_latency(self.generation_latency_ms / len(words))
+            yield StreamEventEnum.DELTA, word if idx == 0 else " " + word
+
+        prompt_tokens = sum(self.count_tokens(m.get("content", "")) for m in chat_history)
+        output_tokens = min(self.count_tokens(message), max_output_tokens)
+        total_tokens = prompt_tokens + output_tokens
+
+        total_cost = (prompt_tokens * self.PRICES["input"] + output_tokens * self.PRICES["output"]) / 1_000_000
+
+        yield StreamEventEnum.USAGE, {"total_tokens": total_tokens, "cost": f"{total_cost:.8f}$"}
+
+    def embed_vector(self, text: str) -> List[float]:
+        rng = random.Random(self.hash_seed(text))
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.embedding_dimensions_size)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+
+        if not self.embedding_model_id or not self.embedding_dimensions_size:
+            self.logger.error("Embedding model for Fake provider was not set")
+            return None
+
+        if isinstance(text, str):
+            text = [text]
+
+        texts = [self.process_text(t) for t in text]
+
+        self.simulate_latency(self.embedding_latency_ms)
+
+        embeddings = [self.embed_vector(t) for t in texts]
+
+        total_tokens = sum(self.count_tokens(t) for t in texts)
+        cost = total_tokens * (self.PRICES["embedding"] / 1_000_000)
+        usage_data = {
+            "prompt_tokens": total_tokens,
+            "total_tokens": total_tokens,
+            "total_cost": f"{cost:.8f}$",
+        }
+
+        return embeddings, usage_data
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "content": prompt,
+        }
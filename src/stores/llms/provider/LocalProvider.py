@@ -0,0 +1,134 @@
+from ..Interface_LLM import Interface_LLM
+from ..Enums_LLM import OpenAIEnums, DocumentTypeEnum
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from typing import List, Union
+
+
+class LocalProvider(Interface_LLM):
+    """
+    On-box CPU embeddings with sentence-transformers. No network, no cost.
+    Generation is not supported by this provider.
+    """
+
+    TRUNCATES_EMBEDDING_INPUT = True
+
+    def __init__(self, default_input_max_characters: int = 1000,
+                 max_batch_size: int = 32,
+                 num_threads: int = 4,
+                 worker_torch_threads: int = 1,
+                 device: str = "cpu",
+                 query_prefix: str = None,
+                 document_prefix: str = None):
+
+        self.default_input_max_characters = default_input_max_characters
+        self.max_batch_size = max_batch_size
+        self.num_threads = num_threads
+        self.worker_torch_threads = worker_torch_threads
+        self.device = device
+
+        # e5 / bge style models expect "query: " / "passage: " prefixes
+        self.query_prefix = query_prefix or ""
+        self.document_prefix = document_prefix or ""
+
+        self.generation_model_id = None
+        self.embedding_model_id = None
+        self.embedding_dimensions_size = None
+
+        self.model = None
+        self.executor = ThreadPoolExecutor(max_workers=self.num_threads,
+                                           thread_name_prefix="local-embedding",
+                                           initializer=self.init_worker_thread)
+
+        self.enums = OpenAIEnums
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def set_embedding_model(self, model_id: str, embedding_dimensions_size: int):
+        # imported here so the heavy dependency is only needed when LOCAL is selected
+        from sentence_transformers import SentenceTransformer
+
+        self.embedding_model_id = model_id
+        self.model = SentenceTransformer(model_id, device=self.device)
+
+        model_size = self.model.get_sentence_embedding_dimension()
+        if embedding_dimensions_size and model_size != int(embedding_dimensions_size):
+            self.logger.warning(
+                f"EMBEDDING_MODEL_SIZE={embedding_dimensions_size} does not match "
+                f"{model_id} output size {model_size}, using {model_size}"
+            )
+        self.embedding_dimensions_size = model_size
+
+    def init_worker_thread(self):
+        # parallelism of the pool comes from its threads; limited per worker thread
+        # so inline query encoding keeps torch's default intra-op threads
+        import torch
+        torch.set_num_threads(self.worker_torch_threads)
+
+    def process_text(self, text: str):
+        return text[:self.default_input_max_characters].strip()
+
+    def generate_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                      temperature: float = None):
+        self.logger.error("Local provider does not support text generation")
+        return None
+
+    def stream_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                    temperature: float = None):
+        self.logger.error("Local provider does not support text generation")
+        return iter(())
+
+    def encode_batch(self, texts: List[str]):
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).tolist()
+
+    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+
+        if not self.model:
+            self.logger.error("Embedding model for Local provider was not set")
+            return None
+
+        if isinstance(text, str):
+            text = [text]
+
+        prefix = self.document_prefix
+        if document_type in {DocumentTypeEnum.QUERY, DocumentTypeEnum.QUERY.value}:
+            prefix = self.query_prefix
+
+        texts = [prefix + self.process_text(t) for t in text]
+
+        # single queries skip the pool hop
+        if len(texts) <= self.max_batch_size:
+            embeddings = self.encode_batch(texts)
+        else:
+            batches = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+            embeddings = []
+            for batch_embeddings in self.executor.map(self.encode_batch, batches):
+                embeddings.extend(batch_embeddings)
+
+        if not embeddings:
+            self.logger.error("Error while embedding text with Local provider")
+            return None
+
+        total_tokens = sum(len(ids) for ids in self.model.tokenizer(texts)["input_ids"])
+        usage_data = {
+            "prompt_tokens": total_tokens,
+            "total_tokens": total_tokens,
+            "total_cost": f"{0:.8f}$",
+        }
+
+        return embeddings, usage_data
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "content": prompt,
+        }
@@ -1,5 +1,5 @@
 from ..Interface_LLM import Interface_LLM
-from ..Enums_LLM import OpenAIEnums
+from ..Enums_LLM import OpenAIEnums, StreamEventEnum
 from openai import OpenAI
 import logging
 import httpx
@@ -46,19 +46,8 @@ class OpenAIProvider(Interface_LLM):
     def process_text(self, text: str):
         return text[:self.default_input_max_characters].strip()
 
-    def generate_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
-                      temperature: float = None):
-
-        if chat_history is None:
-            chat_history = []
-
-        if not self.client:
-            self.logger.error("OpenAI client was not set")
-            return None
-
-        if not self.generation_model_id:
-            self.logger.error("Generation model for OpenAI was not set")
-            return None
+    def build_generation_kwargs(self, prompt: str, chat_history: list, max_output_tokens: int = None,
+                                temperature: float = None) -> dict:
 
         max_output_tokens = max_output_tokens or self.default_generation_max_output_tokens
         temperature = temperature or self.default_generation_temperature
@@ -80,6 +69,26 @@ class OpenAIProvider(Interface_LLM):
         if not self.generation_model_id.startswith(restricted_models):
             kwargs["temperature"] = temperature
 
+        return kwargs
+
+    def generate_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                      temperature: float = None):
+
+        if chat_history is None:
+            chat_history = []
+
+        if not self.client:
+            self.logger.error("OpenAI client was not set")
+            return None
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return None
+
+        kwargs = self.build_generation_kwargs(prompt=prompt, chat_history=chat_history,
+                                              max_output_tokens=max_output_tokens,
+                                              temperature=temperature)
+
         # Send request
         response = self.client.chat.completions.create(**kwargs)
 
@@ -108,6 +117,51 @@ class OpenAIProvider(Interface_LLM):
         # return message, tokens, and formatted cost string
         return message, total_tokens, f"{total_cost:.8f}$"
 
+    def stream_text(self, prompt: str, chat_history: list = None, max_output_tokens: int = None,
+                    temperature: float = None):
+
+        if chat_history is None:
+            chat_history = []
+
+        if not self.client:
+            self.logger.error("OpenAI client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI was not set")
+            return
+
+        kwargs = self.build_generation_kwargs(prompt=prompt, chat_history=chat_history,
+                                              max_output_tokens=max_output_tokens,
+                                              temperature=temperature)
+
+        # usage only arrives in a last chunk with empty choices
+        usage = None
+        with self.client.chat.completions.create(**kwargs, stream=True,
+                                                 stream_options={"include_usage": True}) as stream:
+            for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield StreamEventEnum.DELTA, chunk.choices[0].delta.content
+
+        if not usage:
+            yield StreamEventEnum.USAGE, {"total_tokens": None, "cost": None}
+            return
+
+        try:
+            total_cost = self.calc_cost(
+                model_id=self.generation_model_id,
+                prompt_tokens=usage.prompt_tokens,
+                output_tokens=usage.completion_tokens
+            )
+            cost = f"{total_cost:.8f}$"
+        except KeyError:
+            self.logger.warning(f"No price for {self.generation_model_id}, cost not reported")
+            cost = None
+
+        yield StreamEventEnum.USAGE, {"total_tokens": usage.total_tokens, "cost": cost}
+
     def embed_text(self, text: Union[str,List[str]], document_type: str = None):
 
 
@@ -1,2 +1,4 @@
 from .OpenAIProvider import OpenAIProvider
-from .CoHereProvider import CoHereProvider
\ No newline at end of file
+from .CoHereProvider import CoHereProvider
+from .LocalProvider import LocalProvider
+from .FakeProvider import FakeProvider
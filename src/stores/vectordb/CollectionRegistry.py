@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class CollectionMeta:
+    name: str
+    embedding_size: Optional[int] = None
+    index_state: Optional[str] = None
+    extra: dict = field(default_factory=dict)
+
+
+class CollectionRegistry:
+    """
+    In-process cache of the collections a provider knows about.
+    Providers warm it at connect(), add on create and remove on delete, so hot
+    paths (search / insert) can skip the catalog lookup.
+    Only positive entries are cached: a miss always falls back to the database,
+    since another worker may have created the collection.
+    """
+
+    def __init__(self):
+        self.collections: Dict[str, CollectionMeta] = {}
+
+    def __contains__(self, collection_name: str) -> bool:
+        return collection_name in self.collections
+
+    def get(self, collection_name: str) -> Optional[CollectionMeta]:
+        return self.collections.get(collection_name)
+
+    def add(self, collection_name: str, embedding_size: int = None, index_state: str = None, **extra) -> CollectionMeta:
+        meta = self.collections.get(collection_name)
+        if meta is None:
+            meta = CollectionMeta(name=collection_name)
+            self.collections[collection_name] = meta
+
+        if embedding_size is not None:
+            meta.embedding_size = embedding_size
+        if index_state is not None:
+            meta.index_state = index_state
+        meta.extra.update(extra)
+        return meta
+
+    def set_index_state(self, collection_name: str, index_state: str):
+        meta = self.collections.get(collection_name)
+        if meta is not None:
+            meta.index_state = index_state
+
+    def remove(self, collection_name: str):
+        self.collections.pop(collection_name, None)
+
+    def clear(self):
+        self.collections.clear()
+
+    def names(self) -> List[str]:
+        return list(self.collections)
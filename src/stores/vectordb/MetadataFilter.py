@@ -0,0 +1,119 @@
+from .VectorDBEnums import MetadataFilterOperatorEnums
+from typing import List, Optional, Tuple
+import json
+import re
+
+
+class MetadataFilter:
+    """
+    Backend-neutral filter over chunk metadata, e.g.
+
+        {"asset_id": 3, "page": {"gte": 10, "lte": 20}, "language": {"in": ["de", "en"]}}
+
+    A plain value means equality, a dict maps operators to values.
+    All conditions are AND-ed. Providers translate it to SQL or payload filters.
+    """
+
+    KEY_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+    def __init__(self, conditions: List[Tuple[str, str, object]]):
+        self.conditions = conditions
+
+    def __bool__(self):
+        return bool(self.conditions)
+
+    @classmethod
+    def from_dict(cls, filters: dict) -> Optional["MetadataFilter"]:
+        if not filters:
+            return None
+
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+
+        operators = {op.value for op in MetadataFilterOperatorEnums}
+        range_operators = {
+            MetadataFilterOperatorEnums.GT.value, MetadataFilterOperatorEnums.GTE.value,
+            MetadataFilterOperatorEnums.LT.value, MetadataFilterOperatorEnums.LTE.value,
+        }
+
+        conditions = []
+        for key, condition in filters.items():
+            if not cls.KEY_PATTERN.match(key):
+                raise ValueError(f"Invalid filter key: {key}")
+
+            if not isinstance(condition, dict):
+                condition = {MetadataFilterOperatorEnums.EQ.value: condition}
+
+            for op, value in condition.items():
+                if op not in operators:
+                    raise ValueError(f"Unknown filter operator '{op}' for key '{key}'")
+
+                if op == MetadataFilterOperatorEnums.IN.value:
+                    if not isinstance(value, list) or not value:
+                        raise ValueError(f"'in' filter for key '{key}' needs a non-empty list")
+                    if any(isinstance(v, (dict, list)) for v in value):
+                        raise ValueError(f"'in' filter for key '{key}' only takes scalar values")
+                elif op in range_operators:
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        raise ValueError(f"'{op}' filter for key '{key}' needs a number")
+                elif isinstance(value, (dict, list)):
+                    raise ValueError(f"'{op}' filter for key '{key}' only takes a scalar value")
+
+                conditions.append((key, op, value))
+
+        return cls(conditions)
+
+    def to_jsonpath(self) -> str:
+        """
+        One SQL/JSON path predicate for `metadata @@ <jsonpath>`.
+        Keys and values go through json.dumps, so they are quoted/escaped.
+        """
+        comparators = {
+            MetadataFilterOperatorEnums.EQ.value: "==",
+            MetadataFilterOperatorEnums.NE.value: "!=",
+            MetadataFilterOperatorEnums.GT.value: ">",
+            MetadataFilterOperatorEnums.GTE.value: ">=",
+            MetadataFilterOperatorEnums.LT.value: "<",
+            MetadataFilterOperatorEnums.LTE.value: "<=",
+        }
+
+        predicates = []
+        for key, op, value in self.conditions:
+            path = f"$.{json.dumps(key)}"
+            if op == MetadataFilterOperatorEnums.IN.value:
+                predicates.append("(" + " || ".join(f"{path} == {json.dumps(v)}" for v in value) + ")")
+            else:
+                predicates.append(f"{path} {comparators[op]} {json.dumps(value)}")
+
+        return " && ".join(predicates)
+
+    def matches(self, metadata: dict) -> bool:
+        """Evaluate the filter in process, for providers without a query engine."""
+        metadata = metadata or {}
+        for key, op, value in self.conditions:
+            if key not in metadata:
+                # like jsonpath: a missing key fails every comparison, including ne
+                return False
+            field = metadata[key]
+
+            if op == MetadataFilterOperatorEnums.EQ.value:
+                matched = field == value
+            elif op == MetadataFilterOperatorEnums.NE.value:
+                matched = field != value
+            elif op == MetadataFilterOperatorEnums.IN.value:
+                matched = field in value
+            elif isinstance(field, bool) or not isinstance(field, (int, float)):
+                matched = False
+            elif op == MetadataFilterOperatorEnums.GT.value:
+                matched = field > value
+            elif op == MetadataFilterOperatorEnums.GTE.value:
+                matched = field >= value
+            elif op == MetadataFilterOperatorEnums.LT.value:
+                matched = field < value
+            else:
+                matched = field <= value
+
+            if not matched:
+                return False
+
+        return True
@@ -3,6 +3,8 @@ from enum import Enum
 class VectorDBEnum(Enum):
     QDRANT= "QDRANT"
     PGVECTOR = "PGVECTOR"
+    NUMPY = "NUMPY"
+    HNSW = "HNSW"
 
 class DistanceMethodEnums(Enum):
     COSINE = "cosine"
@@ -15,7 +17,11 @@ class PgVectorTableSchemeEnums(Enum):
     VECTOR = 'vector'
     CHUNK_ID = 'chunk_id'
     METADATA = 'metadata'
+    TEXT_SEARCH = 'text_search'
+    COLLECTION = 'collection'
     _PREFIX = 'pgvector'
+    _SHARED_PREFIX = 'pgvector_shared'
+    _CATALOG = 'pgvector_collections'
 
 class PgVectorDistanceMethodEnums(Enum):
     COSINE = "vector_cosine_ops"
@@ -23,4 +29,48 @@ class PgVectorDistanceMethodEnums(Enum):
     
 class PgVectorIndexTypeEnums(Enum):
     HNSW = "hnsw"
-    IVFFLAT = "ivfflat"
\ No newline at end of file
+    IVFFLAT = "ivfflat"
+
+class PgVectorIndexStateEnums(Enum):
+    NOT_BUILT = "not_built"
+    PENDING = "pending"
+    BELOW_THRESHOLD = "below_threshold"
+    BUILDING = "building"
+    READY = "ready"
+    FAILED = "failed"
+
+class PgVectorStorageModeEnums(Enum):
+    FLOAT32 = "float32"
+    HALFVEC = "halfvec"
+    BIT = "bit"
+
+class PgVectorLayoutEnums(Enum):
+    TABLE = "table"  # one table per collection
+    PARTITIONED = "partitioned"  # one hash partitioned table per embedding size
+
+class QdrantQuantizationEnums(Enum):
+    SCALAR = "scalar"  # int8, 4x smaller
+    PRODUCT = "product"  # x16 compression
+    BINARY = "binary"  # 1 bit per dimension, 32x smaller
+
+class QdrantLayoutEnums(Enum):
+    COLLECTION = "collection"  # one collection per project
+    SHARED = "shared"  # one collection per embedding size, projects split by a tenant payload
+
+class QdrantSharedLayoutEnums(Enum):
+    TENANT = 'tenant'
+    _SHARED_PREFIX = 'shared_collection'
+    _CATALOG = 'tenant_catalog'
+
+class SearchModeEnums(Enum):
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+
+class MetadataFilterOperatorEnums(Enum):
+    EQ = "eq"
+    NE = "ne"
+    IN = "in"
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 from src.models.db_schemes import RetrievedDocument
+from .MetadataFilter import MetadataFilter
 
 class VectorDBInterface(ABC):
 
@@ -30,7 +31,8 @@ class VectorDBInterface(ABC):
 
     @abstractmethod
     def create_collection(self, collection_name: str,embedding_size,
-                          do_rest=False):
+                          do_rest=False, options: dict = None):
+        """options: provider specific storage settings overriding the configured defaults."""
         pass
 
     @abstractmethod
@@ -45,7 +47,34 @@ class VectorDBInterface(ABC):
         pass
 
     @abstractmethod
-    def search_by_vector(self,collection_name: str,vector:list,limit: int)->List[RetrievedDocument]:
+    def finalize_collection(self, collection_name: str):
+        """
+        Called once after a bulk load into the collection has finished.
+        Returns False if the load can't be confirmed, the push then fails.
+        """
+        pass
+
+    @abstractmethod
+    def search_by_vector(self,collection_name: str,vector:list,limit: int,
+                         ef_search: int = None, probes: int = None,
+                         filters: MetadataFilter = None)->List[RetrievedDocument]:
+        pass
+
+    @abstractmethod
+    def search_by_vectors(self, collection_name: str, vectors: list, limit: int,
+                          ef_search: int = None, probes: int = None,
+                          filters: MetadataFilter = None) -> List[List[RetrievedDocument]]:
+        """
+        Many queries in one round trip, one result list per vector in input order.
+        Returns None if the collection does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def search_hybrid(self, collection_name: str, text: str, vector: list, limit: int,
+                      ef_search: int = None, probes: int = None,
+                      filters: MetadataFilter = None) -> List[RetrievedDocument]:
+        """Lexical + vector search; providers without full-text search fall back to vectors only."""
         pass
 
 
@@ -1,13 +1,15 @@
-from .providers import QdrantDBProvider, PGVectorProvider
+from .providers import QdrantDBProvider, PGVectorProvider, NumpyDBProvider, HnswDBProvider
 from .VectorDBEnums import VectorDBEnum
 from src.controllers.BaseController import BaseController
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 class VectorDBProviderFactory:
-    def __init__(self,config, db_client: sessionmaker=None):
+    def __init__(self,config, db_client: sessionmaker=None, db_engine: AsyncEngine=None):
         self.config = config
         self.base_controller=BaseController()
         self.db_client=db_client
+        self.db_engine=db_engine
 
     def create(self, provider: str):
         if provider == VectorDBEnum.QDRANT.value:
@@ -18,14 +20,74 @@ class VectorDBProviderFactory:
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                url=self.config.VECTOR_DB_QDRANT_URL,
+                api_key=self.config.VECTOR_DB_QDRANT_API_KEY,
+                prefer_grpc=self.config.VECTOR_DB_QDRANT_PREFER_GRPC,
+                grpc_port=self.config.VECTOR_DB_QDRANT_GRPC_PORT,
+                timeout=self.config.VECTOR_DB_QDRANT_TIMEOUT,
+                upload_batch_size=self.config.VECTOR_DB_QDRANT_UPLOAD_BATCH_SIZE,
+                upload_parallel=self.config.VECTOR_DB_QDRANT_UPLOAD_PARALLEL,
+                quantization=self.config.VECTOR_DB_QDRANT_QUANTIZATION,
+                quantization_always_ram=self.config.VECTOR_DB_QDRANT_QUANTIZATION_ALWAYS_RAM,
+                rescore=self.config.VECTOR_DB_QDRANT_RESCORE,
+                oversampling=self.config.VECTOR_DB_QDRANT_OVERSAMPLING,
+                on_disk=self.config.VECTOR_DB_QDRANT_ON_DISK,
+                hnsw_m=self.config.VECTOR_DB_QDRANT_HNSW_M,
+                hnsw_ef_construct=self.config.VECTOR_DB_QDRANT_HNSW_EF_CONSTRUCT,
+                layout=self.config.VECTOR_DB_QDRANT_LAYOUT,
+                payload_indexes=self.config.VECTOR_DB_QDRANT_PAYLOAD_INDEXES,
             )
 
         if provider == VectorDBEnum.PGVECTOR.value:
             return PGVectorProvider(
                 db_client=self.db_client,
+                db_engine=self.db_engine,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                copy_threshold=self.config.VECTOR_DB_PGVEC_COPY_THRESHOLD,
+                index_type=self.config.VECTOR_DB_PGVEC_INDEX_TYPE,
+                hnsw_m=self.config.VECTOR_DB_PGVEC_HNSW_M,
+                hnsw_ef_construction=self.config.VECTOR_DB_PGVEC_HNSW_EF_CONSTRUCTION,
+                ivfflat_lists=self.config.VECTOR_DB_PGVEC_IVFFLAT_LISTS,
+                maintenance_work_mem=self.config.VECTOR_DB_PGVEC_MAINTENANCE_WORK_MEM,
+                max_parallel_maintenance_workers=self.config.VECTOR_DB_PGVEC_MAX_PARALLEL_MAINTENANCE_WORKERS,
+                storage_mode=self.config.VECTOR_DB_PGVEC_STORAGE_MODE,
+                rerank_factor=self.config.VECTOR_DB_PGVEC_RERANK_FACTOR,
+                iterative_scan=self.config.VECTOR_DB_PGVEC_ITERATIVE_SCAN,
+                text_search_config=self.config.VECTOR_DB_PGVEC_TEXT_SEARCH_CONFIG,
+                rrf_k=self.config.VECTOR_DB_PGVEC_RRF_K,
+                hybrid_candidates=self.config.VECTOR_DB_PGVEC_HYBRID_CANDIDATES,
+                layout=self.config.VECTOR_DB_PGVEC_LAYOUT,
+                partitions=self.config.VECTOR_DB_PGVEC_PARTITIONS,
+                search_pool_min_size=self.config.VECTOR_DB_PGVEC_SEARCH_POOL_MIN_SIZE,
+                search_pool_max_size=self.config.VECTOR_DB_PGVEC_SEARCH_POOL_MAX_SIZE,
+                statement_cache_size=self.config.VECTOR_DB_PGVEC_STATEMENT_CACHE_SIZE,
+            )
+
+        if provider == VectorDBEnum.NUMPY.value:
+            numpy_db_client = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_NUMPY_PATH)
+
+            return NumpyDBProvider(
+                db_client=numpy_db_client,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
+                initial_capacity=self.config.VECTOR_DB_NUMPY_INITIAL_CAPACITY,
+            )
+
+        if provider == VectorDBEnum.HNSW.value:
+            hnsw_db_client = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_HNSW_PATH)
+
+            return HnswDBProvider(
+                db_client=hnsw_db_client,
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
+                m=self.config.VECTOR_DB_HNSW_M,
+                ef_construction=self.config.VECTOR_DB_HNSW_EF_CONSTRUCTION,
+                ef_search=self.config.VECTOR_DB_HNSW_EF_SEARCH,
+                initial_capacity=self.config.VECTOR_DB_HNSW_INITIAL_CAPACITY,
+                search_threads=self.config.VECTOR_DB_HNSW_SEARCH_THREADS,
+                build_threads=self.config.VECTOR_DB_HNSW_BUILD_THREADS,
             )
 
         return None
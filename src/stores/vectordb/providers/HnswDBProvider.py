@@ -0,0 +1,538 @@
+from typing import List
+
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums
+from ..MetadataFilter import MetadataFilter
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hnswlib
+import json
+import logging
+import os
+import shutil
+import threading
+import numpy as np
+from src.models.db_schemes import RetrievedDocument
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. hnswlib allows concurrent add_items/knn_query, not resize/save.
+
+    A reader may pass a mode (the search ef): readers with different modes do not overlap,
+    so index-wide state like ef is only changed while no search with another value runs.
+    Neither starves: once a writer waits no new reader gets in, and once another mode
+    waits no new reader of the current mode does; waiting modes get their turn in order.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writing = False
+        self.waiting_writers = 0
+        self.mode = None
+        self.mode_readers = 0
+        # (ticket, mode) of mode readers waiting for their turn, in arrival order
+        self.pending_modes = []
+        self.next_ticket = 0
+
+    def mode_turn(self, ticket: int, mode) -> bool:
+        if self.mode_readers and self.mode != mode:
+            return False
+        # same-mode waiters ahead of us may go together, a different one goes first
+        return all(pending_mode == mode for pending_ticket, pending_mode in self.pending_modes
+                   if pending_ticket < ticket)
+
+    def acquire_read(self, mode=None):
+        with self.condition:
+            if mode is None:
+                while self.writing or self.waiting_writers:
+                    self.condition.wait()
+                self.readers += 1
+                return
+
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.pending_modes.append((ticket, mode))
+            try:
+                while self.writing or self.waiting_writers or not self.mode_turn(ticket, mode):
+                    self.condition.wait()
+            finally:
+                self.pending_modes.remove((ticket, mode))
+                # same-mode waiters behind us may be next
+                self.condition.notify_all()
+
+            self.readers += 1
+            self.mode = mode
+            self.mode_readers += 1
+
+    def release_read(self, mode=None):
+        with self.condition:
+            self.readers -= 1
+            if mode is not None:
+                self.mode_readers -= 1
+            if self.readers == 0 or (mode is not None and self.mode_readers == 0):
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            try:
+                while self.writing or self.readers:
+                    self.condition.wait()
+            finally:
+                self.waiting_writers -= 1
+            self.writing = True
+
+    def release_write(self):
+        with self.condition:
+            self.writing = False
+            self.condition.notify_all()
+
+
+class HnswCollection:
+    """One loaded hnswlib index, its records (label -> text/metadata) and its pending builds."""
+
+    def __init__(self, index: hnswlib.Index, meta: dict, records: dict, mtime: int = None):
+        self.index = index
+        self.meta = meta
+        self.records = records
+        self.mtime = mtime
+        self.lock = ReadWriteLock()
+        self.pending_builds = []
+        self.dirty = False
+
+
+class HnswDBProvider(VectorDBInterface):
+    """
+    Embedded HNSW index per collection, no database in the search path.
+
+    Collections live in memory and are snapshotted to a directory (index.bin,
+    records.json, meta.json). Snapshots are written by finalize_collection and on
+    disconnect, and restored on first use. Inserts are queued on a single build
+    thread, and finalize_collection is their barrier. Searches run on a thread pool
+    because knn_query releases the GIL.
+    """
+
+    INDEX_FILE = "index.bin"
+    RECORDS_FILE = "records.json"
+    META_FILE = "meta.json"
+
+    def __init__(self, db_client: str, default_vector_size: int = 786,
+                 distance_method: str = None, m: int = 16, ef_construction: int = 200,
+                 ef_search: int = 64, initial_capacity: int = 10000,
+                 search_threads: int = 4, build_threads: int = 0):
+
+        self.db_client = db_client
+        self.default_vector_size = default_vector_size
+        self.distance_method = distance_method or DistanceMethodEnums.COSINE.value
+
+        # hnswlib returns 1 - cos / 1 - ip / squared l2
+        if self.distance_method == DistanceMethodEnums.DOT.value:
+            self.space = "ip"
+        elif self.distance_method == DistanceMethodEnums.EUCLID.value:
+            self.space = "l2"
+        else:
+            self.space = "cosine"
+        # l2 hits are scored by distance, lower is better
+        self.score_is_distance = self.space == "l2"
+
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.initial_capacity = max(1, initial_capacity)
+        self.search_threads = max(1, search_threads)
+        # 0: hnswlib uses every core for a build
+        self.build_threads = build_threads if build_threads > 0 else -1
+
+        self.collections = {}
+        self.search_executor = None
+        self.build_executor = None
+
+        self.logger = logging.getLogger("uvicorn")
+
+    async def connect(self):
+        os.makedirs(self.db_client, exist_ok=True)
+        if self.search_executor is None:
+            self.search_executor = ThreadPoolExecutor(max_workers=self.search_threads,
+                                                      thread_name_prefix="hnsw-search")
+            self.build_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hnsw-build")
+
+    async def disconnect(self):
+        for collection_name in list(self.collections.keys()):
+            if not await self.finalize_collection(collection_name):
+                self.logger.error(f"Could not snapshot collection {collection_name} on shutdown")
+        self.collections = {}
+
+        if self.search_executor is not None:
+            self.search_executor.shutdown(wait=True)
+            self.build_executor.shutdown(wait=True)
+        self.search_executor = None
+        self.build_executor = None
+
+    def collection_path(self, collection_name: str) -> str:
+        # collection names become directory names
+        if not collection_name or os.path.basename(collection_name) != collection_name \
+                or collection_name.startswith("."):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return os.path.join(self.db_client, collection_name)
+
+    def collection_file(self, collection_name: str, file_name: str) -> str:
+        return os.path.join(self.collection_path(collection_name), file_name)
+
+    def meta_mtime(self, collection_name: str):
+        try:
+            return os.stat(self.collection_file(collection_name, self.META_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def restore_collection(self, collection_name: str):
+        """
+        Collection from memory, restored from its snapshot on first use. A newer snapshot
+        written by another worker replaces a clean in-memory copy.
+        """
+        collection = self.collections.get(collection_name)
+        mtime = self.meta_mtime(collection_name)
+        if collection is not None and (collection.dirty or collection.pending_builds
+                                       or mtime is None or mtime == collection.mtime):
+            return collection
+        if mtime is None:
+            return None
+
+        with open(self.collection_file(collection_name, self.META_FILE), "r") as f:
+            meta = json.load(f)
+        with open(self.collection_file(collection_name, self.RECORDS_FILE), "r") as f:
+            records = {int(label): record for label, record in json.load(f).items()}
+
+        index = hnswlib.Index(space=meta["space"], dim=meta["embedding_size"])
+        index_path = self.collection_file(collection_name, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            index.load_index(index_path, max_elements=meta["capacity"])
+        else:
+            index.init_index(max_elements=meta["capacity"], M=meta["m"], ef_construction=meta["ef_construction"])
+        index.set_ef(self.ef_search)
+
+        collection = HnswCollection(index=index, meta=meta, records=records, mtime=mtime)
+        self.collections[collection_name] = collection
+        return collection
+
+    def snapshot_collection(self, collection_name: str, collection: HnswCollection):
+        # tmp + os.replace: readers never see a half written snapshot, meta.json goes last
+        collection.lock.acquire_write()
+        try:
+            collection.meta["count"] = collection.index.get_current_count()
+            collection.meta["capacity"] = collection.index.get_max_elements()
+
+            index_path = self.collection_file(collection_name, self.INDEX_FILE)
+            collection.index.save_index(f"{index_path}.tmp")
+            os.replace(f"{index_path}.tmp", index_path)
+
+            records_path = self.collection_file(collection_name, self.RECORDS_FILE)
+            with open(f"{records_path}.tmp", "w") as f:
+                json.dump(collection.records, f, ensure_ascii=False)
+            os.replace(f"{records_path}.tmp", records_path)
+
+            meta_path = self.collection_file(collection_name, self.META_FILE)
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump(collection.meta, f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+
+            collection.mtime = self.meta_mtime(collection_name)
+            collection.dirty = False
+        finally:
+            collection.lock.release_write()
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return collection_name in self.collections or self.meta_mtime(collection_name) is not None
+
+    async def list_all_collections(self) -> List:
+        names = set(self.collections.keys())
+        if os.path.isdir(self.db_client):
+            names.update(
+                name for name in os.listdir(self.db_client)
+                if os.path.exists(os.path.join(self.db_client, name, self.META_FILE))
+            )
+        return sorted(names)
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        collection = await asyncio.to_thread(self.restore_collection, collection_name)
+        if collection is None:
+            return None
+
+        return {
+            "points_count": collection.index.get_current_count(),
+            "capacity": collection.index.get_max_elements(),
+            "embedding_size": collection.meta["embedding_size"],
+            "space": collection.meta["space"],
+            "m": collection.meta["m"],
+            "ef_construction": collection.meta["ef_construction"],
+            "ef_search": collection.index.ef,
+            "pending_builds": len(collection.pending_builds),
+            "unsaved_changes": collection.dirty,
+            "path": self.collection_path(collection_name),
+        }
+
+    async def delete_collection(self, collection_name: str):
+        collection = self.collections.pop(collection_name, None)
+        collection_path = self.collection_path(collection_name)
+        if collection is None and not os.path.isdir(collection_path):
+            return None
+
+        if collection is not None and collection.pending_builds:
+            await asyncio.gather(*collection.pending_builds, return_exceptions=True)
+
+        self.logger.info(f"Deleting collection: {collection_name}")
+        await asyncio.to_thread(shutil.rmtree, collection_path, True)
+        return True
+
+    async def create_collection(self, collection_name: str, embedding_size: int,
+                                do_reset: bool = False, options: dict = None):
+        if do_reset:
+            _ = await self.delete_collection(collection_name=collection_name)
+
+        if await self.is_collection_existed(collection_name):
+            return False
+
+        # same option names as the Qdrant collection options
+        options = options or {}
+        meta = {
+            "embedding_size": int(embedding_size),
+            "space": self.space,
+            "m": int(options.get("hnsw_m", self.m)),
+            "ef_construction": int(options.get("hnsw_ef_construct", self.ef_construction)),
+            "capacity": self.initial_capacity,
+            "count": 0,
+        }
+
+        self.logger.info(f"Creating new HNSW collection: {collection_name} (M={meta['m']}, "
+                         f"ef_construction={meta['ef_construction']})")
+        index = hnswlib.Index(space=meta["space"], dim=meta["embedding_size"])
+        index.init_index(max_elements=meta["capacity"], M=meta["m"], ef_construction=meta["ef_construction"])
+        index.set_ef(self.ef_search)
+
+        os.makedirs(self.collection_path(collection_name), exist_ok=True)
+        collection = HnswCollection(index=index, meta=meta, records={})
+        self.collections[collection_name] = collection
+        await asyncio.to_thread(self.snapshot_collection, collection_name, collection)
+        return True
+
+    def build(self, collection: HnswCollection, vectors: np.ndarray, labels: np.ndarray, records: dict):
+        index = collection.index
+        needed = index.get_current_count() + len(labels)
+        if needed > index.get_max_elements():
+            collection.lock.acquire_write()
+            try:
+                index.resize_index(max(needed, 2 * index.get_max_elements()))
+            finally:
+                collection.lock.release_write()
+
+        collection.lock.acquire_read()
+        try:
+            # an existing label is replaced, like an upsert
+            index.add_items(vectors, labels, num_threads=self.build_threads)
+            collection.records.update(records)
+        finally:
+            collection.lock.release_read()
+
+    async def insert_one(self, collection_name: str, text: str, vector: list,
+                         metadata: dict = None, record_id: str = None):
+        if record_id is None:
+            self.logger.error(f"Can not insert new record without record_id: {collection_name}")
+            return False
+
+        if not await self.insert_many(collection_name=collection_name, texts=[text], vectors=[vector],
+                                      metadata=[metadata], record_ids=[record_id]):
+            return False
+        return await self.finalize_collection(collection_name)
+
+    async def insert_many(self, collection_name: str, texts: list,
+                          vectors: list, metadata: list = None,
+                          record_ids: list = None, batch_size: int = 50):
+        collection = await asyncio.to_thread(self.restore_collection, collection_name)
+        if collection is None:
+            self.logger.error(f"Can not insert new records to non-existed collection: {collection_name}")
+            return False
+
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if not texts:
+            return True
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts) \
+                or vectors.shape[1] != collection.meta["embedding_size"]:
+            self.logger.error(f"Invalid vectors shape for collection {collection_name}: {vectors.shape}")
+            return False
+
+        try:
+            labels = np.asarray(record_ids, dtype=np.uint64)
+        except (TypeError, ValueError, OverflowError):
+            self.logger.error(f"HNSW collections need non-negative integer record ids: {collection_name}")
+            return False
+
+        records = {
+            int(label): {"text": _text, "metadata": _metadata}
+            for label, _text, _metadata in zip(labels, texts, metadata)
+        }
+
+        # queued on the build thread, finalize_collection waits for it
+        collection.dirty = True
+        build = asyncio.get_running_loop().run_in_executor(
+            self.build_executor, self.build, collection, vectors, labels, records)
+        collection.pending_builds.append(build)
+        return True
+
+    async def finalize_collection(self, collection_name: str):
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            return True
+
+        pending_builds, collection.pending_builds = collection.pending_builds, []
+        results = await asyncio.gather(*pending_builds, return_exceptions=True)
+        failed = [result for result in results if isinstance(result, Exception)]
+        if failed:
+            self.logger.error(f"Index build failed for collection {collection_name}: {failed[0]}")
+            return False
+
+        if not collection.dirty:
+            return True
+
+        try:
+            await asyncio.to_thread(self.snapshot_collection, collection_name, collection)
+        except Exception as e:
+            self.logger.error(f"Snapshot failed for collection {collection_name}: {e}")
+            return False
+
+        return True
+
+    def search(self, collection: HnswCollection, vectors: list, limit: int, ef_search: int = None,
+               filters: MetadataFilter = None) -> List[List[RetrievedDocument]]:
+        index = collection.index
+        queries = np.asarray(vectors, dtype=np.float32).reshape(-1, collection.meta["embedding_size"])
+        limit = min(limit, index.get_current_count())
+        if limit <= 0:
+            return [[] for _ in queries]
+
+        # ef is index wide in hnswlib: searches with another ef wait until this one is done
+        ef = max(ef_search or self.ef_search, limit)
+
+        filter_fn = None
+        if filters:
+            records = collection.records
+            filter_fn = lambda label: filters.matches((records.get(label) or {}).get("metadata"))
+
+        collection.lock.acquire_read(mode=ef)
+        try:
+            if index.ef != ef:
+                index.set_ef(ef)
+            try:
+                # a batch is one call, hnswlib spreads its queries over build_threads
+                num_threads = self.build_threads if len(queries) > 1 else 1
+                labels, distances = index.knn_query(queries, k=limit, num_threads=num_threads, filter=filter_fn)
+            except RuntimeError:
+                # hnswlib raises when fewer than k points are found: fewer passed the filter,
+                # or the filter is selective enough that ef ran out before k matches
+                if not filter_fn:
+                    raise
+                matching = [label for label, record in collection.records.items()
+                            if filters.matches(record.get("metadata"))]
+                if not matching:
+                    return [[] for _ in queries]
+                labels, distances = self.exact_search(index, queries, matching, min(limit, len(matching)))
+        except RuntimeError as e:
+            self.logger.error(f"HNSW search failed: {e}")
+            return [[] for _ in queries]
+        finally:
+            collection.lock.release_read(mode=ef)
+
+        return [
+            self.labels_to_documents(collection, query_labels, query_distances)
+            for query_labels, query_distances in zip(labels, distances)
+        ]
+
+    def exact_search(self, index: hnswlib.Index, queries: np.ndarray, labels: list, k: int):
+        """Brute force over the given labels, same distances as knn_query returns."""
+        labels = np.asarray(labels, dtype=np.int64)
+        # cosine indexes store normalized vectors
+        vectors = np.asarray(index.get_items(labels), dtype=np.float32)
+
+        if self.space == "l2":
+            distances = np.maximum(
+                (queries ** 2).sum(axis=1, keepdims=True)
+                - 2.0 * queries @ vectors.T
+                + (vectors ** 2).sum(axis=1),
+                0.0,
+            )
+        else:
+            if self.space == "cosine":
+                norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                queries = queries / np.where(norms > 0, norms, 1.0)
+            distances = 1.0 - queries @ vectors.T
+
+        top = np.argsort(distances, axis=1)[:, :k]
+        return labels[top], np.take_along_axis(distances, top, axis=1)
+
+    def labels_to_documents(self, collection: HnswCollection, labels, distances) -> List[RetrievedDocument]:
+        docs = []
+        for label, distance in zip(labels, distances):
+            record = collection.records.get(int(label))
+            if record is None:
+                continue
+
+            meta = record["metadata"] or {}
+            asset_name = meta.get("asset_name")
+            if not asset_name:
+                source_path = meta.get("source") or meta.get("file_path") or ""
+                asset_name = os.path.basename(source_path) if source_path else ""
+
+            score = float(np.sqrt(distance)) if self.space == "l2" else 1.0 - float(distance)
+            docs.append(
+                RetrievedDocument(
+                    id=str(int(label)),
+                    asset_name=asset_name,
+                    text=record["text"],
+                    score=score,
+                )
+            )
+
+        return docs
+
+    async def get_search_collection(self, collection_name: str):
+        # cached collections only cost a stat, no thread hop
+        if collection_name in self.collections:
+            return self.restore_collection(collection_name)
+        return await asyncio.to_thread(self.restore_collection, collection_name)
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               ef_search: int = None, probes: int = None,
+                               filters: MetadataFilter = None):
+        collection = await self.get_search_collection(collection_name)
+        if collection is None:
+            return None
+
+        results = await asyncio.get_running_loop().run_in_executor(
+            self.search_executor, self.search, collection, [vector], limit, ef_search, filters)
+        return results[0] or None
+
+    async def search_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                ef_search: int = None, probes: int = None,
+                                filters: MetadataFilter = None):
+        collection = await self.get_search_collection(collection_name)
+        if collection is None:
+            return None
+        if not len(vectors):
+            return []
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.search_executor, self.search, collection, vectors, limit, ef_search, filters)
+
+    async def search_hybrid(self, collection_name: str, text: str, vector: list, limit: int = 5,
+                            ef_search: int = None, probes: int = None,
+                            filters: MetadataFilter = None):
+        # no full-text index, vector search only
+        return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                           ef_search=ef_search, filters=filters)
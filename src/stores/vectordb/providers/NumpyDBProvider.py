@@ -0,0 +1,437 @@
+from typing import List
+
+from ..VectorDBInterface import VectorDBInterface
+from ..VectorDBEnums import DistanceMethodEnums
+from ..MetadataFilter import MetadataFilter
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import numpy as np
+from src.models.db_schemes import RetrievedDocument
+
+
+class NumpyCollection:
+    """In-process view of one collection: memory-mapped matrices plus the record list."""
+
+    def __init__(self, path: str, meta: dict, vectors, ids, records: list, mtime: int):
+        self.path = path
+        self.meta = meta
+        self.vectors = vectors
+        self.ids = ids
+        self.records = records
+        self.mtime = mtime
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+
+class NumpyDBProvider(VectorDBInterface):
+    """
+    Exact search without a database hop. Each collection is a directory holding
+    a float32 (capacity, dim) matrix and an int64 id array as memory-mapped .npy
+    files, the text/metadata of row i on line i of records.jsonl, and meta.json
+    with the row count. meta.json is written last, so it is the commit point of
+    an append; rows past `count` are leftovers of an interrupted write.
+
+    A search is one BLAS matrix-vector product over the first `count` rows (one
+    matrix-matrix product for a batch) and an argpartition for the top k.
+    Capacity grows geometrically, so appends are amortized.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    IDS_FILE = "ids.npy"
+    RECORDS_FILE = "records.jsonl"
+    META_FILE = "meta.json"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, db_client: str, default_vector_size: int = 786,
+                 distance_method: str = None, initial_capacity: int = 1024,
+                 growth_factor: float = 2.0):
+
+        self.db_client = db_client
+        self.default_vector_size = default_vector_size
+        self.distance_method = distance_method or DistanceMethodEnums.COSINE.value
+        # euclid hits are scored by distance, lower is better
+        self.score_is_distance = self.distance_method == DistanceMethodEnums.EUCLID.value
+        self.initial_capacity = max(1, initial_capacity)
+        self.growth_factor = max(1.1, growth_factor)
+
+        # collection_name -> NumpyCollection, refreshed when meta.json changes
+        self.collections = {}
+        # collection_name -> lock over its in-memory meta/records, shared by reloads and appends
+        self.collection_locks = {}
+
+        self.logger = logging.getLogger("uvicorn")
+
+    async def connect(self):
+        os.makedirs(self.db_client, exist_ok=True)
+
+    async def disconnect(self):
+        for collection in self.collections.values():
+            collection.vectors.flush()
+            collection.ids.flush()
+        self.collections = {}
+
+    def collection_path(self, collection_name: str) -> str:
+        # collection names become directory names
+        if not collection_name or os.path.basename(collection_name) != collection_name \
+                or collection_name.startswith("."):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return os.path.join(self.db_client, collection_name)
+
+    def collection_file(self, collection_name: str, file_name: str) -> str:
+        return os.path.join(self.collection_path(collection_name), file_name)
+
+    def read_meta(self, collection_name: str):
+        meta_path = self.collection_file(collection_name, self.META_FILE)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+            with open(meta_path, "r") as f:
+                return json.load(f), mtime
+        except FileNotFoundError:
+            return None, None
+
+    def write_meta(self, collection_name: str, meta: dict):
+        meta_path = self.collection_file(collection_name, self.META_FILE)
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def read_records(self, collection_name: str, start: int, end: int) -> list:
+        if end <= start:
+            return []
+        with open(self.collection_file(collection_name, self.RECORDS_FILE), "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def collection_lock(self, collection_name: str) -> threading.RLock:
+        # reentrant: append reloads the collection while holding it
+        return self.collection_locks.setdefault(collection_name, threading.RLock())
+
+    def load_collection(self, collection_name: str):
+        with self.collection_lock(collection_name):
+            return self.reload_collection(collection_name)
+
+    def reload_collection(self, collection_name: str):
+        """
+        Cached collection, reloaded when another worker wrote meta.json. Appends
+        that kept the capacity only read the new records, the mapping already sees the rows.
+        Callers hold collection_lock.
+        """
+        meta, mtime = self.read_meta(collection_name)
+        collection = self.collections.get(collection_name)
+        if meta is None:
+            self.collections.pop(collection_name, None)
+            return None
+
+        if collection is not None and collection.mtime == mtime:
+            return collection
+
+        if collection is not None and collection.meta["capacity"] == meta["capacity"] \
+                and collection.count <= meta["count"]:
+            # rebuilt up to meta["count"] from the rows our meta covers, never extended twice
+            del collection.records[collection.count:]
+            collection.records.extend(self.read_records(
+                collection_name, collection.meta["records_bytes"], meta["records_bytes"]))
+            if len(collection.records) == meta["count"]:
+                collection.meta, collection.mtime = meta, mtime
+                return collection
+
+        collection = NumpyCollection(
+            path=self.collection_path(collection_name),
+            meta=meta,
+            vectors=np.load(self.collection_file(collection_name, self.VECTORS_FILE), mmap_mode="r+"),
+            ids=np.load(self.collection_file(collection_name, self.IDS_FILE), mmap_mode="r+"),
+            records=self.read_records(collection_name, 0, meta["records_bytes"]),
+            mtime=mtime,
+        )
+        self.collections[collection_name] = collection
+        return collection
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return os.path.exists(self.collection_file(collection_name, self.META_FILE))
+
+    async def list_all_collections(self) -> List:
+        if not os.path.isdir(self.db_client):
+            return []
+        return sorted(
+            name for name in os.listdir(self.db_client)
+            if os.path.exists(os.path.join(self.db_client, name, self.META_FILE))
+        )
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        collection = await asyncio.to_thread(self.load_collection, collection_name)
+        if collection is None:
+            return None
+
+        return {
+            "points_count": collection.count,
+            "embedding_size": collection.meta["embedding_size"],
+            "distance": collection.meta["distance"],
+            "capacity": collection.meta["capacity"],
+            "vectors_bytes": collection.vectors.nbytes,
+            "path": collection.path,
+        }
+
+    async def delete_collection(self, collection_name: str):
+        collection_path = self.collection_path(collection_name)
+        self.collections.pop(collection_name, None)
+        if not os.path.isdir(collection_path):
+            return None
+
+        self.logger.info(f"Deleting collection: {collection_name}")
+        await asyncio.to_thread(shutil.rmtree, collection_path, True)
+        return True
+
+    def write_empty_collection(self, collection_name: str, embedding_size: int):
+        collection_path = self.collection_path(collection_name)
+        os.makedirs(collection_path, exist_ok=True)
+
+        np.lib.format.open_memmap(os.path.join(collection_path, self.VECTORS_FILE), mode="w+",
+                                  dtype=np.float32, shape=(self.initial_capacity, embedding_size)).flush()
+        np.lib.format.open_memmap(os.path.join(collection_path, self.IDS_FILE), mode="w+",
+                                  dtype=np.int64, shape=(self.initial_capacity,)).flush()
+        open(os.path.join(collection_path, self.RECORDS_FILE), "wb").close()
+
+        self.write_meta(collection_name, {
+            "embedding_size": int(embedding_size),
+            "distance": self.distance_method,
+            "count": 0,
+            "capacity": self.initial_capacity,
+            "records_bytes": 0,
+        })
+
+    async def create_collection(self, collection_name: str, embedding_size: int,
+                                do_reset: bool = False, options: dict = None):
+        # in-process matrices have no storage options
+        if do_reset:
+            _ = await self.delete_collection(collection_name=collection_name)
+
+        if await self.is_collection_existed(collection_name):
+            return False
+
+        self.logger.info(f"Creating new NumPy collection: {collection_name}")
+        await asyncio.to_thread(self.write_empty_collection, collection_name, embedding_size)
+        return True
+
+    def grow(self, collection_name: str, collection: NumpyCollection, needed: int):
+        """Copy into files with geometric capacity, swapped in with os.replace."""
+        capacity = max(needed, int(collection.meta["capacity"] * self.growth_factor))
+        count = collection.count
+
+        for file_name, source, shape in (
+            (self.VECTORS_FILE, collection.vectors, (capacity, collection.meta["embedding_size"])),
+            (self.IDS_FILE, collection.ids, (capacity,)),
+        ):
+            file_path = self.collection_file(collection_name, file_name)
+            tmp_path = f"{file_path}.tmp"
+            grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=source.dtype, shape=shape)
+            grown[:count] = source[:count]
+            grown.flush()
+            del grown
+            os.replace(tmp_path, file_path)
+
+        collection.meta["capacity"] = capacity
+        collection.vectors = np.load(self.collection_file(collection_name, self.VECTORS_FILE), mmap_mode="r+")
+        collection.ids = np.load(self.collection_file(collection_name, self.IDS_FILE), mmap_mode="r+")
+
+    def append(self, collection_name: str, vectors: np.ndarray, record_ids: np.ndarray, records: list) -> bool:
+        # one writer per collection across workers
+        with open(self.collection_file(collection_name, self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            # and no reload of it in this worker until records match meta again
+            with self.collection_lock(collection_name):
+                collection = self.load_collection(collection_name)
+                if collection is None:
+                    return False
+
+                if vectors.shape[1] != collection.meta["embedding_size"]:
+                    self.logger.error(f"Vector size {vectors.shape[1]} does not match collection {collection_name} "
+                                      f"({collection.meta['embedding_size']})")
+                    return False
+
+                count = collection.count
+                needed = count + len(vectors)
+                if needed > collection.meta["capacity"]:
+                    self.grow(collection_name, collection, needed)
+
+                collection.vectors[count:needed] = vectors
+                collection.ids[count:needed] = record_ids
+                collection.vectors.flush()
+                collection.ids.flush()
+
+                records_path = self.collection_file(collection_name, self.RECORDS_FILE)
+                # drop lines of an interrupted append before adding ours
+                os.truncate(records_path, collection.meta["records_bytes"])
+                with open(records_path, "ab") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                    records_bytes = f.tell()
+
+                meta = {**collection.meta, "count": needed, "records_bytes": records_bytes}
+                self.write_meta(collection_name, meta)
+
+                del collection.records[count:]
+                collection.records.extend(records)
+                collection.meta = meta
+                collection.mtime = os.stat(self.collection_file(collection_name, self.META_FILE)).st_mtime_ns
+
+        return True
+
+    def prepare_vectors(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+
+        if self.distance_method == DistanceMethodEnums.COSINE.value:
+            # stored normalized, cosine becomes a dot product
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    async def insert_one(self, collection_name: str, text: str, vector: list,
+                         metadata: dict = None, record_id: str = None):
+        if record_id is None:
+            self.logger.error(f"Can not insert new record without record_id: {collection_name}")
+            return False
+
+        return await self.insert_many(collection_name=collection_name, texts=[text], vectors=[vector],
+                                      metadata=[metadata], record_ids=[record_id])
+
+    async def insert_many(self, collection_name: str, texts: list,
+                          vectors: list, metadata: list = None,
+                          record_ids: list = None, batch_size: int = 50):
+        if not await self.is_collection_existed(collection_name):
+            self.logger.error(f"Can not insert new records to non-existed collection: {collection_name}")
+            return False
+
+        if metadata is None:
+            metadata = [None] * len(texts)
+
+        if record_ids is None:
+            record_ids = list(range(0, len(texts)))
+
+        if not texts:
+            return True
+
+        vectors = self.prepare_vectors(vectors)
+        if len(vectors) != len(texts):
+            self.logger.error(f"Invalid vectors shape for collection {collection_name}: {vectors.shape}")
+            return False
+
+        try:
+            record_ids = np.asarray(record_ids, dtype=np.int64)
+        except (TypeError, ValueError):
+            self.logger.error(f"NumPy collections need integer record ids: {collection_name}")
+            return False
+
+        records = [{"text": _text, "metadata": _metadata} for _text, _metadata in zip(texts, metadata)]
+
+        try:
+            return await asyncio.to_thread(self.append, collection_name, vectors, record_ids, records)
+        except Exception as e:
+            self.logger.error(f"Error while inserting records into {collection_name}: {e}")
+            return False
+
+    async def finalize_collection(self, collection_name: str):
+        # every append is flushed and committed before insert_many returns
+        return True
+
+    def search(self, collection_name: str, vectors: list, limit: int,
+               filters: MetadataFilter = None) -> List[List[RetrievedDocument]]:
+        """
+        One (count, dim) x (dim, queries) product for the whole batch, then a top k per query.
+        Returns None for a missing or empty collection.
+        """
+        collection = self.load_collection(collection_name)
+        if collection is None or collection.count == 0:
+            return None
+
+        count = collection.count
+        matrix = collection.vectors[:count]
+        queries = self.prepare_vectors(vectors)
+
+        # (count, queries), higher is better for every ranking below
+        if self.distance_method == DistanceMethodEnums.EUCLID.value:
+            # |x - q|^2 = |x|^2 - 2 x.q + |q|^2
+            squared = (np.einsum("ij,ij->i", matrix, matrix)[:, None] - 2 * (matrix @ queries.T)
+                       + np.einsum("ij,ij->i", queries, queries)[None, :])
+            distances = np.sqrt(np.maximum(squared, 0))
+            ranking, scores = -distances, distances
+        else:
+            ranking = scores = matrix @ queries.T
+
+        if filters:
+            records = collection.records
+            mask = np.fromiter((filters.matches(records[i]["metadata"]) for i in range(count)),
+                               dtype=bool, count=count)
+            ranking = np.where(mask[:, None], ranking, -np.inf)
+            limit = min(limit, int(mask.sum()))
+
+        limit = min(limit, count)
+        if limit <= 0:
+            return [[] for _ in queries]
+
+        top = np.argpartition(-ranking, limit - 1, axis=0)[:limit]
+        results = []
+        for query_index in range(len(queries)):
+            query_top = top[:, query_index]
+            query_top = query_top[np.argsort(-ranking[query_top, query_index])]
+            results.append([
+                self.record_to_document(collection, i, float(scores[i, query_index]))
+                for i in query_top
+            ])
+
+        return results
+
+    def record_to_document(self, collection: NumpyCollection, i: int, score: float) -> RetrievedDocument:
+        record = collection.records[i]
+        meta = record["metadata"] or {}
+        asset_name = meta.get("asset_name")
+        if not asset_name:
+            source_path = meta.get("source") or meta.get("file_path") or ""
+            asset_name = os.path.basename(source_path) if source_path else ""
+
+        return RetrievedDocument(
+            id=str(int(collection.ids[i])),
+            asset_name=asset_name,
+            text=record["text"],
+            score=score,
+        )
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               ef_search: int = None, probes: int = None,
+                               filters: MetadataFilter = None):
+        # exact search, ef_search / probes do not apply
+        results = await asyncio.to_thread(self.search, collection_name, [vector], limit, filters)
+        if not results or not results[0]:
+            return None
+        return results[0]
+
+    async def search_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                ef_search: int = None, probes: int = None,
+                                filters: MetadataFilter = None):
+        if not len(vectors):
+            return [] if await self.is_collection_existed(collection_name) else None
+
+        results = await asyncio.to_thread(self.search, collection_name, vectors, limit, filters)
+        if results is None and await self.is_collection_existed(collection_name):
+            # empty collection
+            return [[] for _ in vectors]
+        return results
+
+    async def search_hybrid(self, collection_name: str, text: str, vector: list, limit: int = 5,
+                            ef_search: int = None, probes: int = None,
+                            filters: MetadataFilter = None):
+        # no full-text index, vector search only
+        return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                           filters=filters)
@@ -0,0 +1,359 @@
+from ..VectorDBEnums import (PgVectorTableSchemeEnums, PgVectorIndexTypeEnums, PgVectorIndexStateEnums,
+                             PgVectorStorageModeEnums)
+import asyncio
+import logging
+import math
+import time
+from sqlalchemy.sql import text as sql_text
+
+
+class PGVectorIndexManager:
+    """
+    Owns the ANN index of each pgvector collection.
+    Builds are deferred until a bulk load is finalized, run in the background with
+    CREATE INDEX CONCURRENTLY (so searches and inserts keep working), and their
+    state is reported from memory plus pg_index / pg_stat_progress_create_index.
+    Partitioned tables get an index ON ONLY the parent, built partition by partition.
+    """
+
+    def __init__(self, db_client, db_engine=None, registry=None,
+                 distance_method: str = None,
+                 index_threshold: int = 100,
+                 index_type: str = PgVectorIndexTypeEnums.HNSW.value,
+                 storage_mode: str = PgVectorStorageModeEnums.FLOAT32.value,
+                 hnsw_m: int = 16,
+                 hnsw_ef_construction: int = 64,
+                 ivfflat_lists: int = None,
+                 maintenance_work_mem: str = None,
+                 max_parallel_maintenance_workers: int = None):
+
+        self.db_client = db_client
+        self.db_engine = db_engine
+        self.registry = registry
+        self.distance_method = distance_method
+        self.index_threshold = index_threshold
+
+        self.index_type = index_type
+        self.storage_mode = storage_mode
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.ivfflat_lists = ivfflat_lists
+        self.maintenance_work_mem = maintenance_work_mem
+        self.max_parallel_maintenance_workers = max_parallel_maintenance_workers
+
+        # collection_name -> {"state", "started_at", "finished_at", "error"}
+        self.builds = {}
+        self.tasks = {}
+
+        self.logger = logging.getLogger("uvicorn")
+
+    @staticmethod
+    def index_name(collection_name: str) -> str:
+        return f"{collection_name}_vector_idx"
+
+    def set_state(self, collection_name: str, state: str, **kwargs):
+        build = self.builds.setdefault(collection_name, {})
+        build["state"] = state
+        build.update(kwargs)
+        if self.registry is not None:
+            self.registry.set_index_state(collection_name, state)
+
+    def ivfflat_lists_for(self, records_count: int) -> int:
+        if self.ivfflat_lists:
+            return self.ivfflat_lists
+        # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) above
+        if records_count <= 1_000_000:
+            return max(1, records_count // 1000)
+        return int(math.sqrt(records_count))
+
+    def index_options(self, records_count: int) -> str:
+        if self.index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            return f"WITH (lists = {self.ivfflat_lists_for(records_count)})"
+        return f"WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})"
+
+    def index_expression(self, collection_name: str) -> str:
+        # quantized modes index an expression, the column keeps full precision for rescoring
+        column = PgVectorTableSchemeEnums.VECTOR.value
+        if self.storage_mode == PgVectorStorageModeEnums.FLOAT32.value:
+            return f'{column} {self.distance_method}'
+
+        meta = self.registry.get(collection_name) if self.registry is not None else None
+        if meta is None or not meta.embedding_size:
+            raise ValueError(f"Unknown embedding size for collection {collection_name}")
+
+        if self.storage_mode == PgVectorStorageModeEnums.HALFVEC.value:
+            ops = self.distance_method.replace("vector_", "halfvec_", 1)
+            return f'({column}::halfvec({meta.embedding_size})) {ops}'
+
+        if self.storage_mode == PgVectorStorageModeEnums.BIT.value:
+            return f'(binary_quantize({column})::bit({meta.embedding_size})) bit_hamming_ops'
+
+        raise ValueError(f"Unknown storage mode: {self.storage_mode}")
+
+    def create_metadata_index_sql(self, collection_name: str, concurrently: bool = True) -> str:
+        return (
+            f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS '
+            f'{collection_name}_metadata_idx ON {collection_name} '
+            f'USING gin ({PgVectorTableSchemeEnums.METADATA.value} jsonb_path_ops)'
+        )
+
+    def create_text_search_index_sql(self, collection_name: str, concurrently: bool = True) -> str:
+        return (
+            f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS '
+            f'{collection_name}_text_search_idx ON {collection_name} '
+            f'USING gin ({PgVectorTableSchemeEnums.TEXT_SEARCH.value})'
+        )
+
+    def create_index_sql(self, collection_name: str, records_count: int, concurrently: bool = True,
+                         table_name: str = None, only: bool = False) -> str:
+        # table_name: a partition of collection_name, which still defines the index expression
+        table_name = table_name or collection_name
+        return (
+            f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}IF NOT EXISTS '
+            f'{self.index_name(table_name)} ON {"ONLY " if only else ""}{table_name} '
+            f'USING {self.index_type} ({self.index_expression(collection_name)}) '
+            f'{self.index_options(records_count)}'
+        )
+
+    async def is_index_existed(self, collection_name: str) -> bool:
+        async with self.db_client() as session:
+            async with session.begin():
+                check_sql = sql_text("""
+                    SELECT 1
+                    FROM pg_indexes
+                    WHERE tablename = :collection_name
+                    AND indexname = :index_name
+                """)
+                results = await session.execute(check_sql, {
+                    "collection_name": collection_name,
+                    "index_name": self.index_name(collection_name),
+                })
+                return results.scalar_one_or_none() is not None
+
+    async def get_index_status(self, collection_name: str) -> dict:
+        async with self.db_client() as session:
+            async with session.begin():
+                index_sql = sql_text("""
+                    SELECT i.indisvalid, i.indisready, am.amname
+                    FROM pg_class c
+                    JOIN pg_index i ON i.indexrelid = c.oid
+                    JOIN pg_am am ON am.oid = c.relam
+                    WHERE c.relname = :index_name
+                """)
+                progress_sql = sql_text("""
+                    SELECT p.phase, p.blocks_done, p.blocks_total, p.tuples_done, p.tuples_total
+                    FROM pg_stat_progress_create_index p
+                    JOIN pg_class c ON c.oid = p.relid
+                    WHERE c.relname = :collection_name
+                    OR c.oid IN (
+                        SELECT inh.inhrelid FROM pg_inherits inh
+                        JOIN pg_class pc ON pc.oid = inh.inhparent
+                        WHERE pc.relname = :collection_name
+                    )
+                """)
+                index_row = (await session.execute(
+                    index_sql, {"index_name": self.index_name(collection_name)}
+                )).fetchone()
+                progress_row = (await session.execute(
+                    progress_sql, {"collection_name": collection_name}
+                )).fetchone()
+
+        progress = None
+        if progress_row:
+            progress = {
+                "phase": progress_row.phase,
+                "blocks_done": progress_row.blocks_done,
+                "blocks_total": progress_row.blocks_total,
+                "tuples_done": progress_row.tuples_done,
+                "tuples_total": progress_row.tuples_total,
+            }
+
+        return {
+            "exists": index_row is not None,
+            "is_valid": bool(index_row and index_row.indisvalid),
+            "index_type": index_row.amname if index_row else None,
+            "progress": progress,
+        }
+
+    async def get_index_info(self, collection_name: str) -> dict:
+        status = await self.get_index_status(collection_name=collection_name)
+        build = dict(self.builds.get(collection_name, {}))
+
+        # the catalog wins over memory: another worker may own the build
+        if status["is_valid"]:
+            state = PgVectorIndexStateEnums.READY.value
+        elif status["progress"] is not None:
+            state = PgVectorIndexStateEnums.BUILDING.value
+        elif status["exists"]:
+            # an invalid index without a running build is a failed CONCURRENTLY build
+            state = PgVectorIndexStateEnums.FAILED.value
+        else:
+            state = build.get("state", PgVectorIndexStateEnums.NOT_BUILT.value)
+            if state == PgVectorIndexStateEnums.READY.value or (
+                    state == PgVectorIndexStateEnums.BUILDING.value and collection_name not in self.tasks):
+                state = PgVectorIndexStateEnums.NOT_BUILT.value
+
+        build.update({
+            "state": state,
+            "index_name": self.index_name(collection_name),
+            "index_type": status["index_type"] or self.index_type,
+            "progress": status["progress"],
+        })
+        return build
+
+    def schedule_build(self, collection_name: str) -> bool:
+        """Start a background build unless one is already running for this collection."""
+        task = self.tasks.get(collection_name)
+        if task is not None and not task.done():
+            return False
+
+        self.set_state(collection_name, PgVectorIndexStateEnums.PENDING.value, error=None)
+        task = asyncio.create_task(self.build(collection_name=collection_name))
+        self.tasks[collection_name] = task
+        task.add_done_callback(
+            lambda t: self.tasks.pop(collection_name, None) if self.tasks.get(collection_name) is t else None
+        )
+        return True
+
+    async def count_records(self, collection_name: str) -> int:
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(f'SELECT COUNT(*) FROM {collection_name}'))
+                return result.scalar_one()
+
+    async def list_partitions(self, collection_name: str) -> list:
+        async with self.db_client() as session:
+            async with session.begin():
+                results = await session.execute(sql_text("""
+                    SELECT c.relname
+                    FROM pg_inherits inh
+                    JOIN pg_class c ON c.oid = inh.inhrelid
+                    JOIN pg_class pc ON pc.oid = inh.inhparent
+                    WHERE pc.relname = :collection_name
+                    ORDER BY c.relname
+                """), {"collection_name": collection_name})
+                return results.scalars().all()
+
+    async def build(self, collection_name: str) -> bool:
+        try:
+            partitions = await self.list_partitions(collection_name=collection_name)
+            if not partitions:
+                # collections created before filtered search have no metadata index yet
+                await self.execute_maintenance(self.create_metadata_index_sql(collection_name))
+
+            status = await self.get_index_status(collection_name=collection_name)
+            if status["is_valid"]:
+                self.set_state(collection_name, PgVectorIndexStateEnums.READY.value)
+                return False
+
+            records_count = await self.count_records(collection_name=collection_name)
+            if records_count < self.index_threshold:
+                self.set_state(collection_name, PgVectorIndexStateEnums.BELOW_THRESHOLD.value,
+                               records_count=records_count)
+                return False
+
+            if status["exists"] and status["progress"] is None:
+                # leftover of a failed concurrent build, IF NOT EXISTS would keep it
+                await self.drop(collection_name=collection_name)
+
+            self.set_state(collection_name, PgVectorIndexStateEnums.BUILDING.value,
+                           records_count=records_count, started_at=time.time(), finished_at=None)
+            self.logger.info(f"START: Creating vector index for collection: {collection_name}")
+
+            if partitions:
+                await self.build_partitioned(collection_name=collection_name, partitions=partitions,
+                                             records_count=records_count)
+            else:
+                await self.execute_maintenance(self.create_index_sql(collection_name, records_count))
+
+            self.set_state(collection_name, PgVectorIndexStateEnums.READY.value, finished_at=time.time())
+            self.logger.info(f"END: Created vector index for collection: {collection_name}")
+            return True
+
+        except asyncio.CancelledError:
+            self.set_state(collection_name, PgVectorIndexStateEnums.FAILED.value, error="cancelled")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error while creating vector index for collection {collection_name}: {e}")
+            self.set_state(collection_name, PgVectorIndexStateEnums.FAILED.value,
+                           error=str(e), finished_at=time.time())
+            return False
+
+    async def build_partitioned(self, collection_name: str, partitions: list, records_count: int):
+        # CONCURRENTLY isn't supported on a partitioned table: create the parent index
+        # ON ONLY (invalid, no data), build each partition concurrently, then attach it.
+        # The parent index turns valid once every partition is attached.
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(
+                    self.create_index_sql(collection_name, records_count, concurrently=False, only=True)
+                ))
+
+        partition_records = max(1, records_count // len(partitions))
+        for partition in partitions:
+            status = await self.get_index_status(collection_name=partition)
+            if status["exists"] and not status["is_valid"] and status["progress"] is None:
+                await self.drop(collection_name=partition)
+
+            await self.execute_maintenance(self.create_index_sql(
+                collection_name, partition_records, table_name=partition
+            ))
+            async with self.db_client() as session:
+                async with session.begin():
+                    # a no-op if the partition index is already attached
+                    await session.execute(sql_text(
+                        f'ALTER INDEX {self.index_name(collection_name)} '
+                        f'ATTACH PARTITION {self.index_name(partition)}'
+                    ))
+
+    async def execute_maintenance(self, create_index_sql: str):
+        if self.db_engine is None:
+            # no engine for an autocommit connection: plain, blocking build
+            async with self.db_client() as session:
+                async with session.begin():
+                    await session.execute(sql_text(create_index_sql.replace("CONCURRENTLY ", "", 1)))
+            return
+
+        # CONCURRENTLY can't run inside a transaction block
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            if self.maintenance_work_mem:
+                await connection.execute(sql_text(f"SET maintenance_work_mem = '{self.maintenance_work_mem}'"))
+            if self.max_parallel_maintenance_workers is not None:
+                await connection.execute(sql_text(
+                    f"SET max_parallel_maintenance_workers = {int(self.max_parallel_maintenance_workers)}"
+                ))
+            try:
+                await connection.execute(sql_text(create_index_sql))
+            finally:
+                # session settings must not leak into the pool
+                await connection.execute(sql_text("RESET ALL"))
+
+    async def drop(self, collection_name: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(f'DROP INDEX IF EXISTS {self.index_name(collection_name)}'))
+        self.builds.pop(collection_name, None)
+
+    async def rebuild(self, collection_name: str) -> bool:
+        await self.cancel(collection_name=collection_name)
+        await self.drop(collection_name=collection_name)
+        return await self.build(collection_name=collection_name)
+
+    async def cancel(self, collection_name: str):
+        task = self.tasks.pop(collection_name, None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def forget(self, collection_name: str):
+        """Called when the collection is dropped."""
+        await self.cancel(collection_name=collection_name)
+        self.builds.pop(collection_name, None)
+
+    async def shutdown(self):
+        for collection_name in list(self.tasks):
+            await self.cancel(collection_name=collection_name)
@@ -0,0 +1,176 @@
+from ..VectorDBEnums import PgVectorTableSchemeEnums
+import logging
+from sqlalchemy.sql import text as sql_text
+
+
+class PGVectorPartitionedLayout:
+    """
+    Stores every collection of the same embedding size in one shared table,
+    hash partitioned by collection name, instead of one table (and one ANN index)
+    per collection. A small catalog table maps collection -> shared table, so the
+    number of relations stays fixed no matter how many projects exist.
+    """
+
+    def __init__(self, db_client, registry, partitions: int = 16, text_search_config: str = "simple"):
+        self.db_client = db_client
+        self.registry = registry
+        self.partitions = max(1, partitions)
+        self.text_search_config = text_search_config
+
+        self.catalog_table = PgVectorTableSchemeEnums._CATALOG.value
+        self.shared_table_prefix = PgVectorTableSchemeEnums._SHARED_PREFIX.value
+
+        self.logger = logging.getLogger("uvicorn")
+
+    def shared_table_name(self, embedding_size: int) -> str:
+        return f"{self.shared_table_prefix}_{int(embedding_size)}"
+
+    def partition_name(self, table_name: str, remainder: int) -> str:
+        return f"{table_name}_p{remainder}"
+
+    async def ensure_catalog(self):
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(
+                    f'CREATE TABLE IF NOT EXISTS {self.catalog_table} ('
+                    f'collection_name text PRIMARY KEY, '
+                    f'table_name text NOT NULL, '
+                    f'embedding_size integer NOT NULL, '
+                    f'created_at timestamptz NOT NULL DEFAULT now()'
+                    f')'
+                ))
+
+    async def ensure_shared_table(self, embedding_size: int) -> str:
+        table_name = self.shared_table_name(embedding_size)
+        if table_name in self.registry:
+            return table_name
+
+        id_col = PgVectorTableSchemeEnums.ID.value
+        collection_col = PgVectorTableSchemeEnums.COLLECTION.value
+        text_col = PgVectorTableSchemeEnums.TEXT.value
+        metadata_col = PgVectorTableSchemeEnums.METADATA.value
+        chunk_id_col = PgVectorTableSchemeEnums.CHUNK_ID.value
+        text_search_col = PgVectorTableSchemeEnums.TEXT_SEARCH.value
+
+        async with self.db_client() as session:
+            async with session.begin():
+                # serialize concurrent workers creating the same table
+                await session.execute(sql_text("SELECT pg_advisory_xact_lock(hashtext(:table_name))"),
+                                      {"table_name": table_name})
+                exists = await session.execute(sql_text("SELECT to_regclass(:table_name) IS NOT NULL"),
+                                               {"table_name": table_name})
+                if not exists.scalar_one():
+                    self.logger.info(f"Creating shared partitioned table: {table_name}")
+                    # the partition key has to be part of the primary key
+                    await session.execute(sql_text(
+                        f'CREATE TABLE {table_name} ('
+                        f'{id_col} bigserial, '
+                        f'{collection_col} text NOT NULL, '
+                        f'{text_col} text, '
+                        f'{PgVectorTableSchemeEnums.VECTOR.value} vector({int(embedding_size)}), '
+                        f'{metadata_col} jsonb DEFAULT \'{{}}\', '
+                        f'{chunk_id_col} integer, '
+                        f'{text_search_col} tsvector GENERATED ALWAYS AS '
+                        f'(to_tsvector(\'{self.text_search_config}\'::regconfig, coalesce({text_col}, \'\'))) STORED, '
+                        f'PRIMARY KEY ({collection_col}, {id_col}), '
+                        f'FOREIGN KEY ({chunk_id_col}) REFERENCES chunks(chunk_id)'
+                        f') PARTITION BY HASH ({collection_col})'
+                    ))
+                    for remainder in range(self.partitions):
+                        await session.execute(sql_text(
+                            f'CREATE TABLE {self.partition_name(table_name, remainder)} '
+                            f'PARTITION OF {table_name} '
+                            f'FOR VALUES WITH (MODULUS {self.partitions}, REMAINDER {remainder})'
+                        ))
+                    # indexes on the parent cascade to every partition; the table is still empty
+                    await session.execute(sql_text(
+                        f'CREATE INDEX {table_name}_metadata_idx ON {table_name} '
+                        f'USING gin ({metadata_col} jsonb_path_ops)'
+                    ))
+                    await session.execute(sql_text(
+                        f'CREATE INDEX {table_name}_text_search_idx ON {table_name} '
+                        f'USING gin ({text_search_col})'
+                    ))
+
+        self.registry.add(table_name, embedding_size=embedding_size)
+        return table_name
+
+    async def load_collections_meta(self, collection_name: str = None) -> list:
+        meta_sql = f'''
+            SELECT cat.collection_name, cat.embedding_size, cat.table_name,
+                   EXISTS (
+                       SELECT 1 FROM pg_class ic
+                       JOIN pg_index i ON i.indexrelid = ic.oid
+                       WHERE ic.relname = cat.table_name || '_vector_idx' AND i.indisvalid
+                   ) AS has_vector_index
+            FROM {self.catalog_table} cat
+        '''
+        params = {}
+        if collection_name is not None:
+            meta_sql += ' WHERE cat.collection_name = :collection_name'
+            params["collection_name"] = collection_name
+
+        async with self.db_client() as session:
+            async with session.begin():
+                results = await session.execute(sql_text(meta_sql), params)
+                return results.fetchall()
+
+    async def list_collections(self) -> list:
+        async with self.db_client() as session:
+            async with session.begin():
+                results = await session.execute(sql_text(
+                    f'SELECT collection_name FROM {self.catalog_table} ORDER BY collection_name'
+                ))
+                return results.scalars().all()
+
+    async def add_collection(self, collection_name: str, embedding_size: int) -> str:
+        table_name = await self.ensure_shared_table(embedding_size=embedding_size)
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(
+                    f'INSERT INTO {self.catalog_table} (collection_name, table_name, embedding_size) '
+                    f'VALUES (:collection_name, :table_name, :embedding_size) '
+                    f'ON CONFLICT (collection_name) DO NOTHING'
+                ), {"collection_name": collection_name, "table_name": table_name,
+                    "embedding_size": embedding_size})
+        return table_name
+
+    async def delete_collection(self, collection_name: str, table_name: str = None):
+        async with self.db_client() as session:
+            async with session.begin():
+                if table_name is not None:
+                    await session.execute(sql_text(
+                        f'DELETE FROM {table_name} WHERE {PgVectorTableSchemeEnums.COLLECTION.value} = :collection_name'
+                    ), {"collection_name": collection_name})
+                await session.execute(sql_text(
+                    f'DELETE FROM {self.catalog_table} WHERE collection_name = :collection_name'
+                ), {"collection_name": collection_name})
+
+    async def migrate_collection(self, collection_name: str, embedding_size: int) -> int:
+        """
+        Copy a table-per-collection table into its shared table and drop it, in one transaction.
+        Row ids are re-assigned by the shared sequence, chunk ids are kept.
+        """
+        table_name = await self.ensure_shared_table(embedding_size=embedding_size)
+        columns = ", ".join([
+            PgVectorTableSchemeEnums.TEXT.value,
+            PgVectorTableSchemeEnums.VECTOR.value,
+            PgVectorTableSchemeEnums.METADATA.value,
+            PgVectorTableSchemeEnums.CHUNK_ID.value,
+        ])
+
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(sql_text(
+                    f'INSERT INTO {self.catalog_table} (collection_name, table_name, embedding_size) '
+                    f'VALUES (:collection_name, :table_name, :embedding_size) '
+                    f'ON CONFLICT (collection_name) DO NOTHING'
+                ), {"collection_name": collection_name, "table_name": table_name,
+                    "embedding_size": embedding_size})
+                result = await session.execute(sql_text(
+                    f'INSERT INTO {table_name} ({PgVectorTableSchemeEnums.COLLECTION.value}, {columns}) '
+                    f'SELECT :collection_name, {columns} FROM {collection_name}'
+                ), {"collection_name": collection_name})
+                await session.execute(sql_text(f'DROP TABLE {collection_name}'))
+
+        return result.rowcount
@@ -4,20 +4,96 @@ from ..VectorDBEnums import (DistanceMethodEnums, PgVectorTableSchemeEnums,PgVec
 import logging
 from typing import List
 import json
+from sqlalchemy import event
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.sql import text as sql_text
+from pgvector import Vector
+from pgvector.asyncpg import register_vector
+import asyncpg
+import numpy as np
 import os
+from .PGVectorIndexManager import PGVectorIndexManager
+from .PGVectorPartitionedLayout import PGVectorPartitionedLayout
+from ..CollectionRegistry import CollectionRegistry
+from ..MetadataFilter import MetadataFilter
+from ..VectorDBEnums import PgVectorIndexStateEnums, PgVectorStorageModeEnums, PgVectorLayoutEnums
+import re
+
+
+class SearchConnection(asyncpg.Connection):
+    # search GUCs currently set on this session, they survive pool releases
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.search_settings = {}
 
 
 class PGVectorProvider(VectorDBInterface):
 
+    # pgvector accepts hnsw.ef_search in 1..1000
+    HNSW_MAX_EF_SEARCH = 1000
+
+    # pgvector defaults, what a pooled search connection goes back to when a search doesn't set them
+    SEARCH_SETTING_DEFAULTS = {
+        "hnsw.ef_search": "40",
+        "ivfflat.probes": "1",
+        "hnsw.iterative_scan": "off",
+        "ivfflat.iterative_scan": "off",
+    }
+
     def __init__(self, db_client, default_vector_size: int = 786,
-                 distance_method: str = None, index_threshold: int = 100):
+                 distance_method: str = None, index_threshold: int = 100,
+                 db_engine=None, copy_threshold: int = 1000,
+                 index_type: str = PgVectorIndexTypeEnums.HNSW.value,
+                 hnsw_m: int = 16, hnsw_ef_construction: int = 64,
+                 ivfflat_lists: int = None, maintenance_work_mem: str = None,
+                 max_parallel_maintenance_workers: int = None,
+                 storage_mode: str = PgVectorStorageModeEnums.FLOAT32.value,
+                 rerank_factor: int = 4,
+                 iterative_scan: str = "relaxed_order",
+                 text_search_config: str = "simple",
+                 rrf_k: int = 60,
+                 hybrid_candidates: int = 50,
+                 layout: str = PgVectorLayoutEnums.TABLE.value,
+                 partitions: int = 16,
+                 search_pool_min_size: int = 2,
+                 search_pool_max_size: int = 10,
+                 statement_cache_size: int = 1024):
 
         self.db_client = db_client
+        self.db_engine = db_engine
+        # True once the pgvector binary asyncpg codec is registered on the pool
+        self.binary_vectors = False
         self.default_vector_size = default_vector_size
 
         self.index_threshold = index_threshold
 
+        # halfvec / bit index a quantized expression and rescore
+        # limit * rerank_factor candidates against the float32 column
+        self.storage_mode = storage_mode
+        self.rerank_factor = max(1, rerank_factor)
+
+        # pgvector >= 0.8 keeps scanning the ANN index until `limit` rows pass a filter
+        self.iterative_scan = iterative_scan
+
+        # hybrid search: tsvector column generated with this text search configuration,
+        # each branch contributes `hybrid_candidates` rows to reciprocal rank fusion
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_.]*$", text_search_config):
+            raise ValueError(f"Invalid text search configuration: {text_search_config}")
+        self.text_search_config = text_search_config
+        self.rrf_k = rrf_k
+        self.hybrid_candidates = hybrid_candidates
+
+        # dedicated asyncpg pool for searches (0 = use the shared SQLAlchemy sessions)
+        self.search_pool = None
+        self.search_pool_min_size = search_pool_min_size
+        self.search_pool_max_size = search_pool_max_size
+        self.statement_cache_size = statement_cache_size
+        # collection_name -> {statement key: (named_sql, positional_sql, param_names)}
+        self.search_statements = {}
+
+        # insert_many switches to COPY at or above this many rows
+        self.copy_threshold = copy_threshold
+
         if distance_method == DistanceMethodEnums.COSINE.value:
             distance_method = PgVectorDistanceMethodEnums.COSINE.value
         elif distance_method == DistanceMethodEnums.DOT.value:
@@ -25,9 +101,39 @@ class PGVectorProvider(VectorDBInterface):
 
         self.pgvector_table_prefix = PgVectorTableSchemeEnums._PREFIX.value
         self.distance_method = distance_method
+        # every search scores 1 - cosine distance (or RRF), higher is better
+        self.score_is_distance = False
 
         self.logger = logging.getLogger("uvicorn")
-        self.default_index_name=lambda collection_name:f"{collection_name}_vector_idx"
+
+        # known collections, so hot paths skip the pg_tables round trip
+        self.registry = CollectionRegistry()
+
+        self.index_manager = PGVectorIndexManager(
+            db_client=db_client,
+            db_engine=db_engine,
+            registry=self.registry,
+            distance_method=distance_method,
+            index_threshold=index_threshold,
+            index_type=index_type,
+            storage_mode=storage_mode,
+            hnsw_m=hnsw_m,
+            hnsw_ef_construction=hnsw_ef_construction,
+            ivfflat_lists=ivfflat_lists,
+            maintenance_work_mem=maintenance_work_mem,
+            max_parallel_maintenance_workers=max_parallel_maintenance_workers,
+        )
+
+        # partitioned: all collections of one embedding size share a hash partitioned table
+        self.layout = layout
+        self.partitioned_layout = None
+        if layout == PgVectorLayoutEnums.PARTITIONED.value:
+            self.partitioned_layout = PGVectorPartitionedLayout(
+                db_client=db_client,
+                registry=self.registry,
+                partitions=partitions,
+                text_search_config=text_search_config,
+            )
 
 
     async def connect(self):
@@ -48,19 +154,177 @@ class PGVectorProvider(VectorDBInterface):
                 self.logger.warning(f"Vector extension setup: {str(e)}")
                 await session.rollback()
 
+        await self.register_vector_codec()
+        await self.create_search_pool()
+        if self.partitioned_layout is not None:
+            await self.partitioned_layout.ensure_catalog()
+        await self.warm_registry()
+
+    async def register_vector_codec(self):
+        # The codec can only be registered once the extension exists, so pooled
+        # connections opened before that are dropped and re-opened with the codec.
+        if self.db_engine is None or self.binary_vectors:
+            return
+
+        async with self.db_client() as session:
+            result = await session.execute(sql_text(
+                "SELECT 1 FROM pg_extension WHERE extname = 'vector'"
+            ))
+            if not result.scalar_one_or_none():
+                self.logger.warning("Vector extension is missing, sending vectors as text literals")
+                return
+
+        @event.listens_for(self.db_engine.sync_engine, "connect")
+        def _register_vector(dbapi_connection, connection_record):
+            dbapi_connection.run_async(register_vector)
+
+        await self.db_engine.dispose()
+        self.binary_vectors = True
+
+    async def create_search_pool(self):
+        # needs the extension for the codec, which is what binary_vectors tells us
+        if self.db_engine is None or not self.search_pool_max_size or not self.binary_vectors:
+            return
+        if self.search_pool is not None:
+            return
+
+        dsn = self.db_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self.search_pool = await asyncpg.create_pool(
+            dsn=dsn,
+            min_size=min(self.search_pool_min_size, self.search_pool_max_size),
+            max_size=self.search_pool_max_size,
+            statement_cache_size=self.statement_cache_size,
+            init=register_vector,
+            reset=self.reset_search_connection,
+            connection_class=SearchConnection,
+            # searches are small and latency bound, JIT compilation only adds to them
+            server_settings={"jit": "off", "application_name": "vector-search"},
+        )
+        self.logger.info(f"Search pool ready (max_size={self.search_pool_max_size})")
+
+    async def reset_search_connection(self, connection):
+        # unlike the default reset there is no RESET ALL, so the search GUCs stay set
+        # and the next search with the same values needs no set_config round trip
+        if connection.is_in_transaction():
+            await connection.execute("ROLLBACK")
+
+    async def apply_search_settings(self, connection, settings: dict = None):
+        # only GUCs this connection changed go back to their default, pgvector < 0.8 has no iterative_scan
+        desired = {name: value for name, value in self.SEARCH_SETTING_DEFAULTS.items()
+                   if name in connection.search_settings}
+        desired.update(settings or {})
+        changed = {name: value for name, value in desired.items() if connection.search_settings.get(name) != value}
+        if not changed:
+            return
+
+        await connection.execute(
+            "SELECT " + ", ".join(f"set_config('{name}', ${i + 1}, false)" for i, name in enumerate(changed)),
+            *changed.values(),
+        )
+        connection.search_settings.update(changed)
+
+    def to_db_vector(self, vector):
+        if self.binary_vectors:
+            return np.asarray(vector, dtype=np.float32)
+        return "[" + ",".join(str(v) for v in vector) + "]"
+
     async def disconnect(self):
-        pass
+        await self.index_manager.shutdown()
+        if self.search_pool is not None:
+            await self.search_pool.close()
+            self.search_pool = None
+
+    async def load_collections_meta(self, collection_name: str = None) -> list:
+        if self.partitioned_layout is not None:
+            return await self.partitioned_layout.load_collections_meta(collection_name=collection_name)
+        return await self.load_table_collections_meta(collection_name=collection_name)
+
+    async def load_table_collections_meta(self, collection_name: str = None) -> list:
+        # every plain table with a pgvector "vector" column; its typmod is the dimension
+        meta_sql = f'''
+            SELECT c.relname AS collection_name,
+                   a.atttypmod AS embedding_size,
+                   EXISTS (
+                       SELECT 1 FROM pg_index i
+                       JOIN pg_class ic ON ic.oid = i.indexrelid
+                       WHERE i.indrelid = c.oid AND i.indisvalid
+                       AND ic.relname = c.relname || '_vector_idx'
+                   ) AS has_vector_index,
+                   EXISTS (
+                       SELECT 1 FROM pg_attribute ts
+                       WHERE ts.attrelid = c.oid AND NOT ts.attisdropped
+                       AND ts.attname = '{PgVectorTableSchemeEnums.TEXT_SEARCH.value}'
+                   ) AS has_text_search
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attname = '{PgVectorTableSchemeEnums.VECTOR.value}'
+            JOIN pg_type t ON t.oid = a.atttypid AND t.typname = 'vector'
+            WHERE c.relkind = 'r' AND NOT c.relispartition
+            AND n.nspname = current_schema()
+        '''
+        params = {}
+        if collection_name is not None:
+            meta_sql += ' AND c.relname = :collection_name'
+            params["collection_name"] = collection_name
 
-    async def is_collection_existed(self, collection_name: str) -> bool:
-        record = None
         async with self.db_client() as session:
             async with session.begin():
-                list_tbl = sql_text(f'SELECT * FROM pg_tables WHERE tablename = :collection_name')
-                results = await session.execute(list_tbl, {"collection_name": collection_name})
-                record = results.scalar_one_or_none()
-        return record
+                results = await session.execute(sql_text(meta_sql), params)
+                return results.fetchall()
+
+    def register_collection_meta(self, record):
+        index_state = PgVectorIndexStateEnums.READY.value if record.has_vector_index else None
+        embedding_size = record.embedding_size if record.embedding_size > 0 else None
+
+        # partitioned layout: catalog rows point at the shared table holding the collection
+        table_name = getattr(record, "table_name", None)
+        if table_name is not None:
+            self.registry.add(table_name, embedding_size=embedding_size, index_state=index_state)
+            self.registry.add(record.collection_name, embedding_size=embedding_size,
+                              has_text_search=True, table=table_name)
+            return
+
+        self.registry.add(record.collection_name,
+                          embedding_size=embedding_size,
+                          index_state=index_state,
+                          has_text_search=record.has_text_search)
+
+    def collection_scope(self, collection_name: str):
+        """
+        (table, predicate) holding the rows of a known collection.
+        The predicate (bound to :collection) is None for table-per-collection.
+        """
+        meta = self.registry.get(collection_name)
+        if self.partitioned_layout is None or meta is None or "table" not in meta.extra:
+            return collection_name, None
+        return meta.extra["table"], f'{PgVectorTableSchemeEnums.COLLECTION.value} = :collection'
+
+    async def warm_registry(self):
+        try:
+            records = await self.load_collections_meta()
+        except Exception as e:
+            self.logger.warning(f"Could not warm collection registry: {e}")
+            return
+
+        self.registry.clear()
+        self.search_statements.clear()
+        for record in records:
+            self.register_collection_meta(record)
+        self.logger.info(f"Collection registry warmed with {len(records)} collections")
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        if collection_name in self.registry:
+            return True
+
+        records = await self.load_collections_meta(collection_name=collection_name)
+        for record in records:
+            self.register_collection_meta(record)
+        return len(records) > 0
 
     async def list_all_collections(self) -> List:
+        if self.partitioned_layout is not None:
+            return await self.partitioned_layout.list_collections()
+
         records = []
         async with self.db_client() as session:
             async with session.begin():
@@ -70,6 +334,12 @@ class PGVectorProvider(VectorDBInterface):
         return records
 
     async def get_collection_info(self, collection_name: str) -> dict:
+        table_name, scope = collection_name, None
+        if self.partitioned_layout is not None:
+            if not await self.is_collection_existed(collection_name=collection_name):
+                return None
+            table_name, scope = self.collection_scope(collection_name)
+
         async with self.db_client() as session:
             async with session.begin():
                 table_info_sql = sql_text(f'''
@@ -78,15 +348,15 @@ class PGVectorProvider(VectorDBInterface):
                     WHERE tablename = :collection_name
                 ''')
 
-                count_sql = sql_text(f'SELECT COUNT(*) FROM {collection_name}')
-                table_info = await session.execute(table_info_sql, {"collection_name": collection_name})
-                record_count = await session.execute(count_sql)
+                count_sql = sql_text(f'SELECT COUNT(*) FROM {table_name}' + (f' WHERE {scope}' if scope else ''))
+                table_info = await session.execute(table_info_sql, {"collection_name": table_name})
+                record_count = await session.execute(count_sql, {"collection": collection_name} if scope else {})
 
                 table_data = table_info.fetchone()
                 if not table_data:
                     return None
 
-                return{
+                info = {
                     "table_info": {
                         "schemaname": table_data[0],
                         "tablename": table_data[1],
@@ -94,11 +364,31 @@ class PGVectorProvider(VectorDBInterface):
                         "tablespace": table_data[3],
                         "hasindexes": table_data[4],
                     },
-                    "record_count": record_count.scalar_one(),}
+                    "record_count": record_count.scalar_one(),
+                    "layout": self.layout,}
+
+        # partitioned layout: the index belongs to the shared table
+        info["vector_index"] = await self.index_manager.get_index_info(collection_name=table_name)
+        return info
 
     async def delete_collection(self, collection_name: str):
         is_deleted=False
 
+        if self.partitioned_layout is not None:
+            # rows go, the shared table and its index stay
+            table_name = None
+            if await self.is_collection_existed(collection_name=collection_name):
+                table_name, _ = self.collection_scope(collection_name)
+            self.logger.info(f"Deleting collection: {collection_name}")
+            await self.partitioned_layout.delete_collection(collection_name=collection_name, table_name=table_name)
+            self.registry.remove(collection_name)
+            self.forget_statements(collection_name)
+            return True
+
+        await self.index_manager.forget(collection_name=collection_name)
+        self.registry.remove(collection_name)
+        self.forget_statements(collection_name)
+
         async with self.db_client() as session:
             async with session.begin():
                 self.logger.info(f"Deleting collection: {collection_name}")
@@ -109,12 +399,21 @@ class PGVectorProvider(VectorDBInterface):
 
         return is_deleted
 
-    async def create_collection(self, collection_name: str, embedding_size, do_reset=False):
+    async def create_collection(self, collection_name: str, embedding_size, do_reset=False, options: dict = None):
+        # storage is configured provider wide (VECTOR_DB_PGVEC_STORAGE_MODE), options are unused
 
         if do_reset:
             _ = await self.delete_collection(collection_name=collection_name)
 
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed and self.partitioned_layout is not None:
+            self.logger.info(f"Creating collection: {collection_name} (partitioned layout)")
+            table_name = await self.partitioned_layout.add_collection(collection_name=collection_name,
+                                                                      embedding_size=embedding_size)
+            self.registry.add(collection_name, embedding_size=embedding_size,
+                              has_text_search=True, table=table_name)
+            return True
+
         if not is_collection_existed:
             self.logger.info(f"Creating collection: {collection_name}")
             async with self.db_client() as session:
@@ -126,11 +425,23 @@ class PGVectorProvider(VectorDBInterface):
                             f'{PgVectorTableSchemeEnums.VECTOR.value} vector({embedding_size}), '
                             f'{PgVectorTableSchemeEnums.METADATA.value} jsonb DEFAULT \'{{}}\', '
                             f'{PgVectorTableSchemeEnums.CHUNK_ID.value} integer, '
+                            f'{PgVectorTableSchemeEnums.TEXT_SEARCH.value} tsvector GENERATED ALWAYS AS '
+                            f'(to_tsvector(\'{self.text_search_config}\'::regconfig, '
+                            f'coalesce({PgVectorTableSchemeEnums.TEXT.value}, \'\'))) STORED, '
                             f'FOREIGN KEY ({PgVectorTableSchemeEnums.CHUNK_ID.value}) REFERENCES chunks(chunk_id)'
                         ')'
                     )
                     await session.execute(create_sql)
+                    await session.execute(sql_text(self.index_manager.create_metadata_index_sql(
+                        collection_name, concurrently=False
+                    )))
+                    await session.execute(sql_text(self.index_manager.create_text_search_index_sql(
+                        collection_name, concurrently=False
+                    )))
                     await session.commit()
+            self.registry.add(collection_name, embedding_size=embedding_size,
+                              index_state=PgVectorIndexStateEnums.NOT_BUILT.value,
+                              has_text_search=True)
             return True
 
         return False
@@ -147,22 +458,28 @@ class PGVectorProvider(VectorDBInterface):
             self.logger.error(f"Can not insert new record without chunk_id: {collection_name}")
             return False
 
+        table_name, scope = self.collection_scope(collection_name)
+        collection_col = f'{PgVectorTableSchemeEnums.COLLECTION.value}, ' if scope else ''
+        collection_val = ':collection, ' if scope else ''
+
         async with self.db_client() as session:
             async with session.begin():
-                insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                      f'({PgVectorTableSchemeEnums.TEXT.value}, {PgVectorTableSchemeEnums.VECTOR.value}, {PgVectorTableSchemeEnums.METADATA.value}, {PgVectorTableSchemeEnums.CHUNK_ID.value}) '
-                                      'VALUES (:text, :vector, :metadata, :chunk_id)'
+                insert_sql = sql_text(f'INSERT INTO {table_name} '
+                                      f'({collection_col}{PgVectorTableSchemeEnums.TEXT.value}, {PgVectorTableSchemeEnums.VECTOR.value}, {PgVectorTableSchemeEnums.METADATA.value}, {PgVectorTableSchemeEnums.CHUNK_ID.value}) '
+                                      f'VALUES ({collection_val}:text, CAST(:vector AS vector), :metadata, :chunk_id)'
                                       )
 
                 metadata_json = json.dumps(metadata, ensure_ascii=False) if metadata is not None else "{}" #convert dic to json
-                await session.execute(insert_sql, {
+                values = {
                     'text': text,
-                    'vector': "["+",".join([str(v)for v in vector])+"]", # List to string
+                    'vector': self.to_db_vector(vector),
                     'metadata': metadata_json,
                     'chunk_id': record_id
-                })
+                }
+                if scope:
+                    values['collection'] = collection_name
+                await session.execute(insert_sql, values)
                 await session.commit()
-                await self.create_vector_index(collection_name=collection_name)
         return True
 
 
@@ -212,6 +529,13 @@ class PGVectorProvider(VectorDBInterface):
             )
             return False
 
+        # one C-level conversion instead of per-float str() calls
+        if self.binary_vectors:
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if vectors.ndim != 2:
+                self.logger.error(f"Invalid vectors shape for collection {collection_name}: {vectors.shape}")
+                return False
+
         self.logger.info(f"Inserting {n} records into collection {collection_name} (batch_size={batch_size})")
 
         # 4) Simple validation / sanitization of collection name (example)
@@ -220,15 +544,30 @@ class PGVectorProvider(VectorDBInterface):
             self.logger.error(f"Invalid collection_name: {collection_name}")
             return False
 
+        if self.binary_vectors and self.copy_threshold and n >= self.copy_threshold:
+            _ = await self.copy_many(
+                collection_name=collection_name,
+                texts=texts,
+                vectors=vectors,
+                metadata=metadata,
+                record_ids=record_ids,
+            )
+            return True
+
+        table_name, scope = self.collection_scope(collection_name)
+        collection_col = f'{PgVectorTableSchemeEnums.COLLECTION.value},' if scope else ''
+        collection_val = ':collection, ' if scope else ''
+
         insert_sql = sql_text(
             f"""
-                INSERT INTO {collection_name} (
+                INSERT INTO {table_name} (
+                    {collection_col}
                     {PgVectorTableSchemeEnums.TEXT.value},
                     {PgVectorTableSchemeEnums.VECTOR.value},
                     {PgVectorTableSchemeEnums.METADATA.value},
                     {PgVectorTableSchemeEnums.CHUNK_ID.value}
                 )
-                VALUES (:text, :vector, :metadata, :chunk_id)
+                VALUES ({collection_val}:text, CAST(:vector AS vector), :metadata, :chunk_id)
                 """
         )
 
@@ -250,134 +589,470 @@ class PGVectorProvider(VectorDBInterface):
                             else "{}"
                         )
 
-                        vector_str = "[" + ",".join(str(v) for v in _vector) + "]"
-
                         values.append(
                             {
                                 "text": _text,
-                                "vector": vector_str,  # string, not list
+                                "vector": _vector if self.binary_vectors else self.to_db_vector(_vector),
                                 "metadata": metadata_json,
                                 "chunk_id": _record_id,
                             }
                         )
+                        if scope:
+                            values[-1]["collection"] = collection_name
 
                     # EXECUTE ONCE PER BATCH
                     await session.execute(insert_sql, values)
 
-        # 5) Create index (ideally idempotent or done at collection creation time)
-        await self.create_vector_index(collection_name=collection_name)
-
+        # the ANN index is built once by finalize_collection after the whole load
         return True
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int) -> List[RetrievedDocument]:
+    async def copy_many(self, collection_name: str, texts: list, vectors: np.ndarray,
+                        metadata: list, record_ids: list) -> int:
+        """
+        Bulk load with binary COPY ... FROM STDIN straight into the collection table.
+        Needs the binary vector codec, since COPY (FORMAT binary) can't take text literals.
+        """
+        self.logger.info(f"Bulk loading {len(texts)} records into collection {collection_name} with COPY")
+
+        table_name, scope = self.collection_scope(collection_name)
+        # COPY into the partitioned parent routes each row to its partition
+        collection_prefix = (collection_name,) if scope else ()
+        collection_columns = [PgVectorTableSchemeEnums.COLLECTION.value] if scope else []
+
+        records = (
+            collection_prefix + (
+                _text,
+                _vector,
+                json.dumps(_metadata, ensure_ascii=False) if _metadata is not None else "{}",
+                _record_id,
+            )
+            for _text, _vector, _metadata, _record_id in zip(texts, vectors, metadata, record_ids)
+        )
 
+        async with self.db_client() as session:
+            async with session.begin():
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                result = await raw_connection.driver_connection.copy_records_to_table(
+                    table_name,
+                    records=records,
+                    columns=collection_columns + [
+                        PgVectorTableSchemeEnums.TEXT.value,
+                        PgVectorTableSchemeEnums.VECTOR.value,
+                        PgVectorTableSchemeEnums.METADATA.value,
+                        PgVectorTableSchemeEnums.CHUNK_ID.value,
+                    ],
+                )
+
+        # asyncpg returns the command tag, e.g. "COPY 5000"
+        return int(result.split()[-1])
 
+    async def finalize_collection(self, collection_name: str):
+        # build in the background so the push request doesn't wait for it
+        table_name, _ = self.collection_scope(collection_name)
+        # False only means a build is already running, the load itself is committed
+        _ = self.index_manager.schedule_build(collection_name=table_name)
+        return True
+
+    def search_settings(self, ef_search: int = None, probes: int = None, iterative_scan: str = None) -> dict:
+        settings = {}
+        if iterative_scan and iterative_scan != "off":
+            settings["hnsw.iterative_scan"] = iterative_scan
+            settings["ivfflat.iterative_scan"] = iterative_scan
+        if ef_search:
+            # rerank candidates (limit * rerank_factor) can exceed pgvector's range, set_config would fail
+            settings["hnsw.ef_search"] = str(min(int(ef_search), self.HNSW_MAX_EF_SEARCH))
+        if probes:
+            settings["ivfflat.probes"] = str(int(probes))
+        return settings
+
+    async def set_search_params(self, session, settings: dict):
+        # set_config(..., true) is SET LOCAL: it only lives for the search transaction
+        if not settings:
+            return
+        await session.execute(sql_text(
+            "SELECT " + ", ".join(f"set_config('{name}', :setting_{i}, true)" for i, name in enumerate(settings))
+        ), {f"setting_{i}": value for i, value in enumerate(settings.values())})
+
+    def search_statement(self, collection_name: str, key: tuple, build_sql) -> tuple:
+        """
+        (named_sql, positional_sql, param_names) of a search, built once per collection.
+        The text only depends on the collection and the statement shape, limit and
+        vectors are bound, so asyncpg's statement cache can reuse the prepared plan.
+        """
+        statements = self.search_statements.setdefault(collection_name, {})
+        statement = statements.get(key)
+        if statement is None:
+            named_sql = build_sql()
+            param_names = []
+
+            def to_positional(match):
+                name = match.group(1)
+                if name not in param_names:
+                    param_names.append(name)
+                return f"${param_names.index(name) + 1}"
+
+            # skip "::type" casts
+            positional_sql = re.sub(r"(?<!:):([A-Za-z_][A-Za-z0-9_]*)", to_positional, named_sql)
+            statement = (named_sql, positional_sql, param_names)
+            statements[key] = statement
+        return statement
+
+    def forget_statements(self, collection_name: str):
+        self.search_statements.pop(collection_name, None)
+
+    def to_search_vector(self, vector):
+        # the search pool always has the binary codec
+        if self.search_pool is not None:
+            return np.asarray(vector, dtype=np.float32)
+        return self.to_db_vector(vector)
+
+    def to_search_vectors(self, vectors: list) -> list:
+        if self.search_pool is not None or self.binary_vectors:
+            # binary codec per element; Vector, not ndarray, or asyncpg takes each one for a sub-array
+            return [Vector(np.asarray(vector, dtype=np.float32)) for vector in vectors]
+        # no codec: asyncpg sends vector[] elements in their text form
+        return [self.to_db_vector(vector) for vector in vectors]
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                               ef_search: int = None, probes: int = None,
+                               filters: MetadataFilter = None) -> List[RetrievedDocument]:
+
+        # served from the registry for known collections, no round trip
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
             self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
             return False
 
-        vector = "[" + ",".join([str(v) for v in vector]) + "]"
-        async with self.db_client() as session:
-            async with session.begin():
-                search_sql = sql_text(
-                    f'SELECT {PgVectorTableSchemeEnums.ID.value} as id, {PgVectorTableSchemeEnums.TEXT.value} as text,{PgVectorTableSchemeEnums.METADATA.value} as metadata, 1 - ({PgVectorTableSchemeEnums.VECTOR.value} <=> :vector) as score'
-                    f' FROM {collection_name}'
-                    ' ORDER BY score DESC '
-                    f'LIMIT {limit}'
-                    )
-                result = await session.execute(search_sql, {"vector": vector})
-
-                records = result.fetchall()
-                docs: list[RetrievedDocument] = []
-
-                for record in records:
-                    meta = record.metadata
-
-                    # If JSONB is returned as text, parse it
-                    if isinstance(meta, str):
-                        try:
-                            meta = json.loads(meta)
-                        except json.JSONDecodeError:
-                            meta = {}
-
-                    if not isinstance(meta, dict):
-                        meta = {}
-
-                    # get "source" field and extract just the file name
-                    source_path = meta.get("source") or meta.get("file_path") or ""
-                    file_name = os.path.basename(source_path) if source_path else ""
-
-                    docs.append(
-                        RetrievedDocument(
-                            id=str(record.id),
-                            asset_name=file_name,
-                            text=record.text,
-                            score=record.score,
-                        )
-                    )
+        filtered = bool(filters)
+        statement = self.search_statement(
+            collection_name, ("vector", filtered),
+            lambda: self.build_search_sql(collection_name=collection_name, filtered=filtered),
+        )
+        params = self.filter_params(collection_name=collection_name, filters=filters)
+        # any WHERE clause needs iterative scans to still return `limit` rows
+        iterative_scan = self.iterative_scan if params else None
+        if self.storage_mode != PgVectorStorageModeEnums.FLOAT32.value:
+            # HNSW returns at most ef_search rows, keep room for all rerank candidates
+            ef_search = max(ef_search or 0, limit * self.rerank_factor)
+
+        params["vector"] = self.to_search_vector(vector)
+        params["limit"] = int(limit)
+        records = await self.run_search(collection_name=collection_name, statement=statement, params=params,
+                                        settings=self.search_settings(ef_search, probes, iterative_scan))
+        if records is None:
+            return False
 
-                return docs
+        return self.records_to_documents(records)
 
+    async def search_by_vectors(self, collection_name: str, vectors: list, limit: int,
+                                ef_search: int = None, probes: int = None,
+                                filters: MetadataFilter = None) -> List[List[RetrievedDocument]]:
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
+            return None
 
+        if not len(vectors):
+            return []
 
+        filtered = bool(filters)
+        statement = self.search_statement(
+            collection_name, ("vector_batch", filtered),
+            lambda: self.build_batch_search_sql(collection_name=collection_name, filtered=filtered),
+        )
+        params = self.filter_params(collection_name=collection_name, filters=filters)
+        iterative_scan = self.iterative_scan if params else None
+        if self.storage_mode != PgVectorStorageModeEnums.FLOAT32.value:
+            ef_search = max(ef_search or 0, limit * self.rerank_factor)
+
+        # one vector[] parameter whatever the batch size, so the statement stays cached
+        params["vectors"] = self.to_search_vectors(vectors)
+        params["limit"] = int(limit)
+        records = await self.run_search(collection_name=collection_name, statement=statement, params=params,
+                                        settings=self.search_settings(ef_search, probes, iterative_scan))
+        if records is None:
+            return None
+
+        results = [[] for _ in vectors]
+        for query_index, document in zip((record["query_index"] for record in records),
+                                         self.records_to_documents(records)):
+            results[query_index - 1].append(document)
+        return results
+
+    def filter_params(self, collection_name: str, filters: MetadataFilter = None) -> dict:
+        params = {}
+        _, scope = self.collection_scope(collection_name)
+        if scope:
+            params["collection"] = collection_name
+        if filters:
+            params["filter"] = filters.to_jsonpath()
+        return params
+
+    async def search_hybrid(self, collection_name: str, text: str, vector: list, limit: int,
+                            ef_search: int = None, probes: int = None,
+                            filters: MetadataFilter = None) -> List[RetrievedDocument]:
+        """
+        Full-text and vector candidates fused with reciprocal rank fusion in one statement.
+        Scores are RRF scores (sum of 1 / (k + rank)), not cosine similarities.
+        """
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
+            return False
 
+        meta = self.registry.get(collection_name)
+        if not meta.extra.get("has_text_search"):
+            # collections created before hybrid search have no tsvector column
+            self.logger.warning(f"Collection {collection_name} has no text search column, "
+                                f"falling back to vector search")
+            return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                               ef_search=ef_search, probes=probes, filters=filters)
+
+        candidates = max(int(limit), self.hybrid_candidates)
+        filtered = bool(filters)
+        statement = self.search_statement(
+            collection_name, ("hybrid", filtered),
+            lambda: self.build_hybrid_search_sql(collection_name=collection_name, filtered=filtered),
+        )
+        params = self.filter_params(collection_name=collection_name, filters=filters)
+        iterative_scan = self.iterative_scan if params else None
+        params.update({
+            "vector": self.to_search_vector(vector),
+            "query": text,
+            "text_search_config": self.text_search_config,
+            "limit": int(limit),
+            "candidates": candidates,
+        })
+
+        # HNSW returns at most ef_search rows, keep room for all vector candidates
+        rerank_factor = 1 if self.storage_mode == PgVectorStorageModeEnums.FLOAT32.value else self.rerank_factor
+        ef_search = max(ef_search or 0, candidates * rerank_factor)
+
+        records = await self.run_search(collection_name=collection_name, statement=statement, params=params,
+                                        settings=self.search_settings(ef_search, probes, iterative_scan))
+        if records is None:
+            return False
 
+        return self.records_to_documents(records)
 
+    async def run_search(self, collection_name: str, statement: tuple, params: dict, settings: dict = None):
+        named_sql, positional_sql, param_names = statement
 
-    async def is_index_existed(self, collection_name: str) -> bool:
+        if self.search_pool is not None:
+            try:
+                async with self.search_pool.acquire() as connection:
+                    # session level and only when they differ from the connection's current values,
+                    # so repeated searches with the same settings are a single round trip
+                    await self.apply_search_settings(connection, settings)
+                    return await connection.fetch(positional_sql, *[params[name] for name in param_names])
+            except asyncpg.exceptions.UndefinedTableError:
+                return self.forget_missing_collection(collection_name)
+
+        try:
+            async with self.db_client() as session:
+                async with session.begin():
+                    await self.set_search_params(session, settings)
+                    result = await session.execute(sql_text(named_sql), params)
+                    return result.mappings().all()
+        except ProgrammingError as e:
+            # the registry can be stale if another worker dropped the table
+            if getattr(e.orig, "sqlstate", None) != "42P01":  # undefined_table
+                raise
+            return self.forget_missing_collection(collection_name)
+
+    def forget_missing_collection(self, collection_name: str):
+        self.registry.remove(collection_name)
+        self.forget_statements(collection_name)
+        self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
+        return None
+
+    def build_hybrid_search_sql(self, collection_name: str, filtered: bool = False) -> str:
+        id_col = PgVectorTableSchemeEnums.ID.value
+        text_col = PgVectorTableSchemeEnums.TEXT.value
+        metadata_col = PgVectorTableSchemeEnums.METADATA.value
+        text_search_col = PgVectorTableSchemeEnums.TEXT_SEARCH.value
+        table_name, scope = self.collection_scope(collection_name)
+        and_filter = f'AND {metadata_col} @@ CAST(:filter AS jsonpath) ' if filtered else ''
+        and_scope = f'AND {scope} ' if scope else ''
+        join_scope = f'AND docs.{scope} ' if scope else ''
+
+        # same ANN query as search_by_vector, only ranked
+        vector_sql = self.build_search_sql(collection_name=collection_name, filtered=filtered,
+                                           limit_param="candidates")
+
+        # websearch_to_tsquery never raises on user input; GIN index serves the @@
+        return (
+            f'WITH vector_hits AS ('
+            f'SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank FROM ({vector_sql}) v'
+            f'), lexical_hits AS ('
+            f'SELECT {id_col} AS id, '
+            f'ROW_NUMBER() OVER (ORDER BY ts_rank_cd({text_search_col}, query) DESC) AS rank '
+            f'FROM {table_name}, '
+            f'websearch_to_tsquery(CAST(:text_search_config AS regconfig), :query) query '
+            f'WHERE {text_search_col} @@ query '
+            f'{and_scope}'
+            f'{and_filter}'
+            f'ORDER BY rank '
+            f'LIMIT :candidates'
+            f'), fused AS ('
+            f'SELECT COALESCE(v.id, l.id) AS id, '
+            f'CAST(COALESCE(1.0 / ({int(self.rrf_k)} + v.rank), 0) '
+            f'+ COALESCE(1.0 / ({int(self.rrf_k)} + l.rank), 0) AS double precision) AS score '
+            f'FROM vector_hits v FULL OUTER JOIN lexical_hits l ON l.id = v.id'
+            f') '
+            f'SELECT docs.{id_col} as id, docs.{text_col} as text, docs.{metadata_col} as metadata, fused.score '
+            f'FROM fused JOIN {table_name} docs ON docs.{id_col} = fused.id {join_scope}'
+            f'ORDER BY fused.score DESC '
+            f'LIMIT :limit'
+        )
 
-        index_name = self.default_index_name(collection_name)
-        async with self.db_client() as session:
-            async with session.begin():
-                check_sql = sql_text(f""" 
-                SELECT 1 
-                FROM pg_indexes 
-                WHERE tablename = :collection_name
-                AND indexname = :index_name
-                """)
-                results = await session.execute(check_sql,
-                                                {"index_name": index_name, "collection_name": collection_name})
-
-                return bool(results.scalar_one_or_none)
-        return False
+    def build_batch_search_sql(self, collection_name: str, filtered: bool = False) -> str:
+        # the single-query ANN statement, run once per query vector through LATERAL
+        search_sql = self.build_search_sql(collection_name=collection_name, filtered=filtered,
+                                           query_vector='queries.query_vector')
+        return (
+            f'SELECT queries.query_index, hits.id, hits.text, hits.metadata, hits.score '
+            f'FROM ('
+            f'SELECT query_vector, query_index '
+            f'FROM unnest(CAST(:vectors AS vector[])) WITH ORDINALITY AS q(query_vector, query_index)'
+            f') queries '
+            f'CROSS JOIN LATERAL ({search_sql}) hits '
+            f'ORDER BY queries.query_index, hits.score DESC'
+        )
 
-    async def create_vector_index(self, collection_name: str,
-                                  index_type_alg: str = PgVectorIndexTypeEnums.HNSW.value):
+    def build_search_sql(self, collection_name: str, filtered: bool = False, limit_param: str = "limit",
+                         query_vector: str = 'CAST(:vector AS vector)') -> str:
+        id_col = PgVectorTableSchemeEnums.ID.value
+        text_col = PgVectorTableSchemeEnums.TEXT.value
+        metadata_col = PgVectorTableSchemeEnums.METADATA.value
+        vector_col = PgVectorTableSchemeEnums.VECTOR.value
+        table_name, scope = self.collection_scope(collection_name)
+        predicates = [scope] if scope else []
+        if filtered:
+            # jsonb_path_ops GIN index serves the @@ predicate
+            predicates.append(f'{metadata_col} @@ CAST(:filter AS jsonpath)')
+        where = f'WHERE {" AND ".join(predicates)} ' if predicates else ''
+
+        if self.storage_mode == PgVectorStorageModeEnums.FLOAT32.value:
+            # order by the distance operator itself, otherwise the ANN index is never used
+            search_sql = (
+                f'SELECT {id_col} as id, {text_col} as text, {metadata_col} as metadata, '
+                f'1 - ({vector_col} <=> {query_vector}) as score '
+                f'FROM {table_name} '
+                f'{where}'
+                f'ORDER BY {vector_col} <=> {query_vector} '
+                f'LIMIT :{limit_param}'
+            )
+            if predicates:
+                # relaxed_order iterative scans may return rows slightly out of order
+                search_sql = f'SELECT * FROM ({search_sql}) relaxed ORDER BY score DESC'
+            return search_sql
+
+        embedding_size = self.registry.get(collection_name).embedding_size
+        if self.storage_mode == PgVectorStorageModeEnums.HALFVEC.value:
+            candidates_order = (f'{vector_col}::halfvec({embedding_size}) '
+                                f'<=> {query_vector}::halfvec({embedding_size})')
+        else:
+            candidates_order = (f'binary_quantize({vector_col})::bit({embedding_size}) '
+                                f'<~> binary_quantize({query_vector})')
+
+        # ANN over the quantized index, then exact rescoring on the float32 column
+        return (
+            f'SELECT id, text, metadata, 1 - ({vector_col} <=> {query_vector}) as score '
+            f'FROM ('
+            f'SELECT {id_col} as id, {text_col} as text, {metadata_col} as metadata, {vector_col} '
+            f'FROM {table_name} '
+            f'{where}'
+            f'ORDER BY {candidates_order} '
+            # explicit cast: the same parameter is also the outer LIMIT (bigint)
+            f'LIMIT CAST(:{limit_param} AS bigint) * {int(self.rerank_factor)}'
+            f') candidates '
+            f'ORDER BY {vector_col} <=> {query_vector} '
+            f'LIMIT :{limit_param}'
+        )
 
-        is_index_existed = await self.is_index_existed(collection_name=collection_name)
-        if is_index_existed:
-            return False
+    def records_to_documents(self, records) -> List[RetrievedDocument]:
+        docs: list[RetrievedDocument] = []
 
-        async with self.db_client() as session:
-            async with session.begin():
-                count_sql = sql_text(f'SELECT COUNT(*) FROM {collection_name}')
-                result = await session.execute(count_sql)
-                records_count = result.scalar_one()
+        for record in records:
+            meta = record["metadata"]
 
-                if records_count < self.index_threshold:
-                    return False
+            # If JSONB is returned as text, parse it
+            if isinstance(meta, str):
+                try:
+                    meta = json.loads(meta)
+                except json.JSONDecodeError:
+                    meta = {}
 
-                self.logger.info(f"START: Creating vector index for collection: {collection_name}")
+            if not isinstance(meta, dict):
+                meta = {}
 
-                index_name = self.default_index_name(collection_name)
+            # get "source" field and extract just the file name
+            source_path = meta.get("source") or meta.get("file_path") or ""
+            file_name = os.path.basename(source_path) if source_path else ""
 
-                create_idx_sql = sql_text(
-                    f'CREATE INDEX {index_name} ON {collection_name} '
-                    f'USING {index_type_alg} ({PgVectorTableSchemeEnums.VECTOR.value} {self.distance_method})'
+            docs.append(
+                RetrievedDocument(
+                    id=str(record["id"]),
+                    asset_name=file_name,
+                    text=record["text"],
+                    score=record["score"],
                 )
+            )
 
-                await session.execute(create_idx_sql)
+        return docs
 
-                self.logger.info(f"END: Created vector index for collection: {collection_name}")
+    async def resolve_table(self, collection_name: str) -> str:
+        if self.partitioned_layout is not None:
+            await self.is_collection_existed(collection_name=collection_name)
+        table_name, _ = self.collection_scope(collection_name)
+        return table_name
 
-    async def reset_vector_index(self, collection_name: str,
-                                 index_type_alg: str = PgVectorIndexTypeEnums.HNSW.value) -> bool:
+    async def is_index_existed(self, collection_name: str) -> bool:
+        table_name = await self.resolve_table(collection_name)
+        return await self.index_manager.is_index_existed(collection_name=table_name)
+
+    async def create_vector_index(self, collection_name: str) -> bool:
+        """Build the ANN index now, waiting for it to finish."""
+        table_name = await self.resolve_table(collection_name)
+        return await self.index_manager.build(collection_name=table_name)
+
+    async def reset_vector_index(self, collection_name: str) -> bool:
+        table_name = await self.resolve_table(collection_name)
+        return await self.index_manager.rebuild(collection_name=table_name)
+
+    async def migrate_layout(self, collection_names: list = None) -> dict:
+        """
+        Move table-per-collection tables into the partitioned layout, then build the
+        shared indexes once. Returns {collection_name: moved_rows}.
+        """
+        if self.partitioned_layout is None:
+            raise ValueError("migrate_layout needs VECTOR_DB_PGVEC_LAYOUT=partitioned")
+
+        await self.partitioned_layout.ensure_catalog()
+
+        records = await self.load_table_collections_meta()
+        if collection_names:
+            records = [r for r in records if r.collection_name in collection_names]
+
+        migrated = {}
+        shared_tables = set()
+        for record in records:
+            if record.embedding_size <= 0:
+                self.logger.warning(f"Skipping {record.collection_name}: unknown embedding size")
+                continue
+
+            await self.index_manager.forget(collection_name=record.collection_name)
+            self.logger.info(f"Migrating collection {record.collection_name} to the partitioned layout")
+            migrated[record.collection_name] = await self.partitioned_layout.migrate_collection(
+                collection_name=record.collection_name,
+                embedding_size=record.embedding_size,
+            )
+            shared_tables.add(self.partitioned_layout.shared_table_name(record.embedding_size))
 
-        index_name = self.default_index_name(collection_name)
-        async with self.db_client() as session:
-            async with session.begin():
-                drop_sql = sql_text(f'DROP INDEX IF EXISTS {index_name}')
-                await session.execute(drop_sql)
+        await self.warm_registry()
+        for table_name in shared_tables:
+            await self.index_manager.build(collection_name=table_name)
 
-        return await self.create_vector_index(collection_name=collection_name, index_type_alg=index_type_alg)
\ No newline at end of file
+        return migrated
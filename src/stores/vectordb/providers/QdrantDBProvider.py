@@ -1,17 +1,86 @@
 from typing import List
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMethodEnums
+from ..VectorDBEnums import (DistanceMethodEnums, MetadataFilterOperatorEnums, QdrantQuantizationEnums,
+                             QdrantLayoutEnums)
+from ..MetadataFilter import MetadataFilter
+from .QdrantSharedLayout import QdrantSharedLayout
+import asyncio
 import logging
+import os
+import numpy as np
 from src.models.db_schemes import RetrievedDocument
 
 class QdrantDBProvider(VectorDBInterface):
+    # upload processes only start when every one of them gets at least this many batches
+    UPLOAD_PARALLEL_MIN_BATCHES = 16
+    # payload key no point has, target of the finalize_collection barrier write
+    BARRIER_KEY = "__barrier__"
+
+    # metadata fields indexed at push time unless configured otherwise, the common search filters
+    DEFAULT_PAYLOAD_INDEXES = {
+        "asset_id": models.PayloadSchemaType.INTEGER,
+        "asset_name": models.PayloadSchemaType.KEYWORD,
+        "page": models.PayloadSchemaType.INTEGER,
+    }
+
     def __init__(self,db_client:str,default_vector_size: int = 786,
-                 distance_method: str = None, index_threshold: int = 100):
+                 distance_method: str = None, index_threshold: int = 100,
+                 url: str = None, api_key: str = None, prefer_grpc: bool = True,
+                 grpc_port: int = 6334, timeout: int = None,
+                 upload_batch_size: int = 256, upload_parallel: int = 1,
+                 upload_max_retries: int = 3,
+                 quantization: str = None, quantization_always_ram: bool = True,
+                 rescore: bool = True, oversampling: float = 2.0,
+                 on_disk: bool = False, hnsw_m: int = 16, hnsw_ef_construct: int = 100,
+                 layout: str = QdrantLayoutEnums.COLLECTION.value,
+                 payload_indexes: dict = None):
 
         self.client=None
+        # local (path) mode is single process and file locked, tests only
         self.db_client = db_client
+        # server mode: one AsyncQdrantClient (one gRPC channel) shared by all requests
+        self.url = url
+        self.api_key = api_key
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.timeout = timeout
+
+        # bulk uploads: batches are queued, not awaited one by one. `upload_parallel` > 1 forks
+        # that many upload processes per insert_many call, which only pays off for calls with
+        # many batches (see UPLOAD_PARALLEL_MIN_BATCHES), e.g. bulk loads with a large page size
+        self.upload_batch_size = upload_batch_size
+        self.upload_parallel = max(1, upload_parallel)
+        self.upload_max_retries = upload_max_retries
+        # collection_name -> qdrant collection with uploads queued by wait=False
+        self.pending_uploads = {}
+
+        # collection defaults, a project can override them through create_collection(options=...)
+        self.collection_defaults = {
+            "quantization": quantization,
+            "quantization_always_ram": quantization_always_ram,
+            "on_disk": on_disk,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construct": hnsw_ef_construct,
+        }
+        # quantized search: oversample candidates, rescore them with the original vectors
+        self.rescore = rescore
+        self.oversampling = oversampling
+        # allowlist of indexed metadata keys (key -> payload schema type). Filters on other
+        # keys still work, they are just checked against the payload of each candidate
+        self.payload_index_fields = self.DEFAULT_PAYLOAD_INDEXES
+        if payload_indexes is not None:
+            self.payload_index_fields = {
+                key: models.PayloadSchemaType(field_schema) for key, field_schema in payload_indexes.items()
+            }
+        # collection_name -> indexed payload fields, loaded from the payload schema on first use
+        self.payload_indexes = {}
+
+        self.layout = layout
+        self.shared_layout = None
+        if layout == QdrantLayoutEnums.SHARED.value:
+            self.shared_layout = QdrantSharedLayout()
         self.distance_method = None
 
         self.default_vector_size = default_vector_size
@@ -25,6 +94,9 @@ class QdrantDBProvider(VectorDBInterface):
         elif distance_method == DistanceMethodEnums.EUCLID.value:
             self.distance_method=models.Distance.EUCLID
 
+        # qdrant scores euclid hits by distance, lower is better
+        self.score_is_distance = self.distance_method == models.Distance.EUCLID
+
         self.logger = logging.getLogger("uvicorn")
 
     def _ensure_client(self):
@@ -35,75 +107,262 @@ class QdrantDBProvider(VectorDBInterface):
             )
 
     async def connect(self):
-        if self.client is None:
-            self.client = QdrantClient(path=self.db_client)
+        if self.client is not None:
+            return
+
+        if self.url:
+            self.client = AsyncQdrantClient(
+                url=self.url,
+                api_key=self.api_key,
+                prefer_grpc=self.prefer_grpc,
+                grpc_port=self.grpc_port,
+                timeout=self.timeout,
+            )
+            self.logger.info(f"Connected to Qdrant server: {self.url} (grpc={self.prefer_grpc})")
+        else:
+            self.logger.warning("Qdrant runs in local mode, use VECTOR_DB_QDRANT_URL with more than one worker")
+            self.client = AsyncQdrantClient(path=self.db_client)
+
+        if self.shared_layout is not None:
+            self.shared_layout.bind(self.client)
+            await self.shared_layout.ensure_catalog()
 
     async def disconnect(self):
+        if self.client is not None:
+            await self.client.close()
         self.client=None
 
+    async def collection_scope(self, collection_name: str):
+        """
+        (qdrant_collection, tenant_condition) holding the points of a collection.
+        The condition is None for collection-per-project, qdrant_collection is None
+        for an unknown tenant of the shared layout.
+        """
+        if self.shared_layout is None:
+            return collection_name, None
+
+        tenant = await self.shared_layout.get_tenant(collection_name)
+        if tenant is None:
+            return None, None
+        return tenant["shared_collection"], self.shared_layout.tenant_condition(collection_name)
+
     async def is_collection_existed(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name=collection_name)
+        self._ensure_client()
+        if self.shared_layout is not None:
+            return await self.shared_layout.get_tenant(collection_name) is not None
+        return await self.client.collection_exists(collection_name=collection_name)
 
     async def list_all_collections(self) -> List:
-        return self.client.get_collections()
+        self._ensure_client()
+        if self.shared_layout is not None:
+            return models.CollectionsResponse(collections=[
+                models.CollectionDescription(name=collection_name)
+                for collection_name in await self.shared_layout.list_tenants()
+            ])
+        return await self.client.get_collections()
 
     async def get_collection_info(self, collection_name: str) -> dict:
         self._ensure_client()
-        return self.client.get_collection(collection_name=collection_name)
+        qdrant_collection, tenant_condition = await self.collection_scope(collection_name)
+        if qdrant_collection is None:
+            return None
+
+        info = await self.describe_collection(qdrant_collection)
+        info["layout"] = self.layout
+        if tenant_condition is not None:
+            # collection-wide counters cover every tenant
+            info["shared_collection"] = qdrant_collection
+            info["points_count"] = await self.shared_layout.count_tenant_points(
+                collection_name=collection_name, shared_collection=qdrant_collection)
+        return info
+
+    async def describe_collection(self, qdrant_collection: str) -> dict:
+        collection_info = await self.client.get_collection(collection_name=qdrant_collection)
+
+        info = collection_info.model_dump(mode="json")
+        vectors_params = collection_info.config.params.vectors
+        quantization_config = collection_info.config.quantization_config
+        quantization, always_ram = None, None
+        if quantization_config is not None:
+            # ScalarQuantization(scalar=...) / ProductQuantization(product=...) / BinaryQuantization(binary=...)
+            quantization = next(iter(type(quantization_config).model_fields))
+            always_ram = getattr(getattr(quantization_config, quantization), "always_ram", None)
+
+        info["storage"] = {
+            "quantization": quantization,
+            "quantization_always_ram": always_ram,
+            "on_disk": getattr(vectors_params, "on_disk", None),
+            "hnsw_m": collection_info.config.hnsw_config.m,
+            "hnsw_ef_construct": collection_info.config.hnsw_config.ef_construct,
+        }
+        return info
 
     async def delete_collection(self, collection_name: str):
         self._ensure_client()
-        if self.is_collection_existed(collection_name):
+        if self.shared_layout is not None:
+            qdrant_collection, _ = await self.collection_scope(collection_name)
+            if qdrant_collection is None:
+                return None
+            self.logger.info(f"Deleting tenant {collection_name} from {qdrant_collection}")
+            self.pending_uploads.pop(collection_name, None)
+            await self.shared_layout.delete_tenant(collection_name=collection_name,
+                                                   shared_collection=qdrant_collection)
+            return True
+
+        if await self.is_collection_existed(collection_name):
             self.logger.info(f"Deleting collection: {collection_name}")
-            return self.client.delete_collection(collection_name=collection_name)
+            self.payload_indexes.pop(collection_name, None)
+            self.pending_uploads.pop(collection_name, None)
+            return await self.client.delete_collection(collection_name=collection_name)
+
+    async def ensure_payload_indexes(self, collection_name: str, fields: dict):
+        """
+        Create the missing payload indexes, `fields` maps a metadata key to its PayloadSchemaType.
+        Without an index a filtered search has to check the payload of every candidate.
+        """
+        indexed = self.payload_indexes.get(collection_name)
+        if indexed is None:
+            collection_info = await self.client.get_collection(collection_name=collection_name)
+            indexed = set((collection_info.payload_schema or {}).keys())
+            self.payload_indexes[collection_name] = indexed
+
+        for key, field_schema in fields.items():
+            field_name = f"metadata.{key}"
+            if field_name in indexed:
+                continue
+
+            self.logger.info(f"Creating {field_schema.value} payload index {field_name} on {collection_name}")
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
+            )
+            indexed.add(field_name)
+
+    def quantization_config(self, quantization: str, always_ram: bool):
+        if not quantization:
+            return None
+
+        if quantization == QdrantQuantizationEnums.SCALAR.value:
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=always_ram,
+                )
+            )
+        if quantization == QdrantQuantizationEnums.PRODUCT.value:
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio.X16,
+                    always_ram=always_ram,
+                )
+            )
+        if quantization == QdrantQuantizationEnums.BINARY.value:
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+            )
+
+        raise ValueError(f"Unknown Qdrant quantization: {quantization}")
 
     async def create_collection(self, collection_name: str,
                                 embedding_size: int,
-                                do_reset: bool = False):
+                                do_reset: bool = False,
+                                options: dict = None):
         self._ensure_client()
         if do_reset:
-            _ = self.delete_collection(collection_name=collection_name)
+            _ = await self.delete_collection(collection_name=collection_name)
 
-        if not self.is_collection_existed(collection_name):
-            self.logger.info(f"Creating new Qdrant collection: {collection_name}")
-            _ = self.client.create_collection(
-                collection_name=collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_size,
-                    distance=self.distance_method
-                )
-            )
+        if await self.is_collection_existed(collection_name):
+            return False
+
+        options = {**self.collection_defaults, **(options or {})}
 
+        if self.shared_layout is not None:
+            # the first tenant's options shape the shared collection, later ones only join it
+            shared_collection, created = await self.shared_layout.ensure_shared_collection(
+                embedding_size=embedding_size,
+                collection_config=self.collection_config(embedding_size=embedding_size,
+                                                         options=options, shared=True),
+            )
+            if created:
+                await self.ensure_payload_indexes(collection_name=shared_collection,
+                                                  fields=self.payload_index_fields)
+            self.logger.info(f"Creating tenant {collection_name} in shared Qdrant collection {shared_collection}")
+            await self.shared_layout.add_tenant(collection_name=collection_name, embedding_size=embedding_size,
+                                                shared_collection=shared_collection)
             return True
 
-        return False
+        self.logger.info(f"Creating new Qdrant collection: {collection_name} "
+                         f"(quantization={options['quantization']}, on_disk={options['on_disk']})")
+        _ = await self.client.create_collection(
+            collection_name=collection_name,
+            **self.collection_config(embedding_size=embedding_size, options=options),
+        )
+        await self.ensure_payload_indexes(collection_name=collection_name,
+                                          fields=self.payload_index_fields)
+
+        return True
+
+    def collection_config(self, embedding_size: int, options: dict, shared: bool = False) -> dict:
+        if shared:
+            # no global graph: searches are always tenant scoped, so Qdrant builds
+            # one HNSW graph per tenant from the is_tenant payload index
+            hnsw_config = models.HnswConfigDiff(m=0, payload_m=options["hnsw_m"],
+                                                ef_construct=options["hnsw_ef_construct"])
+        else:
+            hnsw_config = models.HnswConfigDiff(m=options["hnsw_m"],
+                                                ef_construct=options["hnsw_ef_construct"])
+
+        return {
+            "vectors_config": models.VectorParams(
+                size=embedding_size,
+                distance=self.distance_method,
+                # originals memory-mapped, searched through the quantized copy in RAM
+                on_disk=options["on_disk"],
+            ),
+            "hnsw_config": hnsw_config,
+            "quantization_config": self.quantization_config(
+                quantization=options["quantization"],
+                always_ram=options["quantization_always_ram"],
+            ),
+        }
+
+    def point_payload(self, collection_name: str, text: str, metadata: dict) -> dict:
+        payload = {"text": text, "metadata": metadata}
+        if self.shared_layout is not None:
+            payload[self.shared_layout.tenant_key] = collection_name
+        return payload
 
     async def insert_one(self, collection_name: str, text: str, vector: list,
                          metadata: dict = None,
                          record_id: str = None):
+        self._ensure_client()
 
-
-        if not self.is_collection_existed(collection_name):
+        qdrant_collection, _ = await self.collection_scope(collection_name)
+        if qdrant_collection is None or not await self.is_collection_existed(collection_name):
             self.logger.error(f"Can not insert new record to non-existed collection: {collection_name}")
             return False
 
-        try:
-
-            _=self.client.upload_record(collection_name=collection_name,
-                                        records=[
-                                            models.Record(
-                                                id=[record_id],
-                                                vector=vector,
-                                                payload={
-                                                    "text": text,
-                                                    "metadata": metadata
-                                                }
-                                            )
-                                        ])
-
+        if record_id is None:
+            self.logger.error(f"Can not insert new record without record_id: {collection_name}")
+            return False
 
+        try:
+            _ = await self.client.upsert(
+                collection_name=qdrant_collection,
+                points=[
+                    models.PointStruct(
+                        id=record_id,
+                        vector=vector,
+                        payload=self.point_payload(collection_name=collection_name,
+                                                   text=text, metadata=metadata),
+                    )
+                ],
+            )
         except Exception as e:
-            self.logger.error(f"Error while inserting batch: {e}")
+            self.logger.error(f"Error while inserting record: {e}")
             return False
 
         return True
@@ -119,72 +378,204 @@ class QdrantDBProvider(VectorDBInterface):
         if record_ids is None:
             record_ids = list(range(0, len(texts)))
 
-        for i in range(0, len(texts), batch_size):
-            batch_end=i+batch_size
-            batch_texts=texts[i:batch_end]
-            batch_vectors=vectors[i:batch_end]
-            batch_metadata=metadata[i:batch_end]
-            batch_record_ids=record_ids[i:batch_end]
-
-            batch_records = [
-                models.Record(
-                    id=batch_record_ids[x],
-                    vector=batch_vectors[x],
-                    payload={
-                        "text": batch_texts[x], "metadata": batch_metadata[x]
-                    }
-                )
-                for x in range(0, len(batch_texts))
-
-            ]
-
-            try:
-                _ = self.client.upload_records(
-                    collection_name=collection_name,
-                    records=batch_records,
-                )
-            except Exception as e:
-                self.logger.error(f"Error while inserting batch: {e}")
-                return False
-
-        return True
+        if not texts:
+            return True
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
-        self._ensure_client()
+        # shared layout: point ids are chunk ids, unique across projects
+        qdrant_collection, _ = await self.collection_scope(collection_name)
+        if qdrant_collection is None:
+            self.logger.error(f"Can not insert records to non-existed collection: {collection_name}")
+            return False
 
-        logging.debug("serach by vector using Qdrant")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            self.logger.error(f"Invalid vectors shape for collection {collection_name}: {vectors.shape}")
+            return False
 
-        results = self.client.search(
-            collection_name=collection_name,
-            query_vector=vector,
-            limit=limit
+        payload = (
+            self.point_payload(collection_name=collection_name, text=_text, metadata=_metadata)
+            for _text, _metadata in zip(texts, metadata)
         )
 
-        if not results or len(results) == 0:
-            return None
-
-        return [
-            RetrievedDocument(**{
-                "score": result.score,
-                "text": result.payload["text"],
-            })
-            for result in results
-        ]
-
-
+        try:
+            # upload_collection is blocking (it may fork `parallel` upload processes),
+            # wait=False only queues the batches, finalize_collection is the barrier
+            upload_batch_size = max(batch_size, self.upload_batch_size)
+            parallel = self.upload_parallel
+            if -(-len(texts) // upload_batch_size) < parallel * self.UPLOAD_PARALLEL_MIN_BATCHES:
+                # starting the worker processes costs more than uploading a page this small
+                parallel = 1
+
+            await asyncio.to_thread(
+                self.client.upload_collection,
+                collection_name=qdrant_collection,
+                vectors=vectors,
+                payload=payload,
+                ids=record_ids,
+                batch_size=upload_batch_size,
+                parallel=parallel,
+                max_retries=self.upload_max_retries,
+                wait=False,
+            )
+        except Exception as e:
+            self.logger.error(f"Error while uploading points: {e}")
+            return False
 
+        self.pending_uploads[collection_name] = qdrant_collection
+        return True
 
+    async def finalize_collection(self, collection_name: str):
+        # Qdrant builds its HNSW graph on its own while points are indexed
+        qdrant_collection = self.pending_uploads.pop(collection_name, None)
+        if qdrant_collection is None:
+            return True
 
+        try:
+            # keys added to the allowlist after the collection was created
+            await self.ensure_payload_indexes(collection_name=qdrant_collection,
+                                              fields=self.payload_index_fields)
+        except Exception as e:
+            self.logger.error(f"Creating payload indexes failed for collection {collection_name}: {e}")
+            return False
 
+        try:
+            # updates are applied in order per shard. A write selected by filter goes to
+            # every shard, so once it completes with wait=True, every batch queued before
+            # it is applied and searchable on all shards. The filter matches no point,
+            # deleting a payload key from nothing changes nothing.
+            await self.client.delete_payload(
+                collection_name=qdrant_collection,
+                keys=[self.BARRIER_KEY],
+                points=models.FilterSelector(filter=models.Filter(must=[
+                    models.FieldCondition(key=self.BARRIER_KEY, match=models.MatchValue(value=True))
+                ])),
+                wait=True,
+            )
+        except Exception as e:
+            self.logger.error(f"Consistency barrier failed for collection {collection_name}: {e}")
+            return False
 
+        return True
 
+    def to_qdrant_filter(self, filters: MetadataFilter) -> models.Filter:
+        must, must_not = [], []
+        ranges = {}
+        for key, op, value in filters.conditions:
+            field = f"metadata.{key}"
+            if op == MetadataFilterOperatorEnums.EQ.value:
+                must.append(models.FieldCondition(key=field, match=models.MatchValue(value=value)))
+            elif op == MetadataFilterOperatorEnums.NE.value:
+                must_not.append(models.FieldCondition(key=field, match=models.MatchValue(value=value)))
+            elif op == MetadataFilterOperatorEnums.IN.value:
+                must.append(models.FieldCondition(key=field, match=models.MatchAny(any=value)))
+            else:
+                # gt / gte / lt / lte on the same key share one Range
+                ranges.setdefault(field, {})[op] = value
+
+        for field, bounds in ranges.items():
+            must.append(models.FieldCondition(key=field, range=models.Range(**bounds)))
+
+        return models.Filter(must=must or None, must_not=must_not or None)
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               ef_search: int = None, probes: int = None,
+                               filters: MetadataFilter = None):
+        self._ensure_client()
 
+        logging.debug("serach by vector using Qdrant")
 
+        qdrant_collection, tenant_condition = await self.collection_scope(collection_name)
+        if qdrant_collection is None:
+            return None
 
+        query_filter = await self.query_filter(qdrant_collection, tenant_condition, filters)
+        results = await self.client.search(
+            collection_name=qdrant_collection,
+            query_vector=vector,
+            limit=limit,
+            search_params=self.search_params(ef_search),
+            query_filter=query_filter,
+        )
 
+        if not results or len(results) == 0:
+            return None
 
+        return self.points_to_documents(results)
+
+    def search_params(self, ef_search: int = None) -> models.SearchParams:
+        # probes is IVFFlat only, Qdrant always searches its HNSW graph.
+        # Quantization params are ignored by collections without quantization.
+        return models.SearchParams(
+            hnsw_ef=ef_search,
+            quantization=models.QuantizationSearchParams(
+                rescore=self.rescore,
+                oversampling=self.oversampling,
+            ),
+        )
 
+    async def query_filter(self, qdrant_collection: str, tenant_condition, filters: MetadataFilter = None):
+        query_filter = None
+        if filters:
+            # indexes only come from the push-time allowlist, never from a search request
+            query_filter = self.to_qdrant_filter(filters)
+        if tenant_condition is not None:
+            query_filter = query_filter or models.Filter()
+            query_filter.must = [tenant_condition, *(query_filter.must or [])]
+        return query_filter
+
+    async def search_by_vectors(self, collection_name: str, vectors: list, limit: int = 5,
+                                ef_search: int = None, probes: int = None,
+                                filters: MetadataFilter = None):
+        self._ensure_client()
 
+        qdrant_collection, tenant_condition = await self.collection_scope(collection_name)
+        if qdrant_collection is None or not await self.is_collection_existed(collection_name):
+            return None
+        if not len(vectors):
+            return []
+
+        query_filter = await self.query_filter(qdrant_collection, tenant_condition, filters)
+        search_params = self.search_params(ef_search)
+        # one request, Qdrant runs the searches together and shares the filter work
+        batch_results = await self.client.search_batch(
+            collection_name=qdrant_collection,
+            requests=[
+                models.SearchRequest(
+                    vector=list(map(float, vector)),
+                    limit=limit,
+                    filter=query_filter,
+                    params=search_params,
+                    with_payload=True,
+                )
+                for vector in vectors
+            ],
+        )
 
+        return [self.points_to_documents(results) for results in batch_results]
+
+    def points_to_documents(self, points) -> List[RetrievedDocument]:
+        docs = []
+        for point in points:
+            meta = point.payload.get("metadata") or {}
+            asset_name = meta.get("asset_name")
+            if not asset_name:
+                source_path = meta.get("source") or meta.get("file_path") or ""
+                asset_name = os.path.basename(source_path) if source_path else ""
+
+            docs.append(
+                RetrievedDocument(
+                    id=str(point.id),
+                    asset_name=asset_name,
+                    text=point.payload["text"],
+                    score=point.score,
+                )
+            )
 
+        return docs
 
+    async def search_hybrid(self, collection_name: str, text: str, vector: list, limit: int = 5,
+                            ef_search: int = None, probes: int = None,
+                            filters: MetadataFilter = None):
+        # no full-text index on the Qdrant side, vector search only
+        return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                           ef_search=ef_search, probes=probes, filters=filters)
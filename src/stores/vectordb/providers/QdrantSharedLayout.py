@@ -0,0 +1,147 @@
+from qdrant_client import models
+from ..VectorDBEnums import QdrantSharedLayoutEnums
+import logging
+import uuid
+
+
+class QdrantSharedLayout:
+    """
+    Stores every collection of the same embedding size in one shared Qdrant collection,
+    each point tagged with its tenant (the logical collection name) in an `is_tenant`
+    keyword index. Qdrant co-locates a tenant's points and builds one small HNSW graph
+    per tenant instead of one collection, segment set and graph per project.
+    A catalog collection (payload only, no vectors) maps tenant -> shared collection.
+    """
+
+    def __init__(self):
+        self.client = None
+
+        self.tenant_key = QdrantSharedLayoutEnums.TENANT.value
+        self.catalog_collection = QdrantSharedLayoutEnums._CATALOG.value
+        self.shared_collection_prefix = QdrantSharedLayoutEnums._SHARED_PREFIX.value
+
+        # tenant -> catalog payload, shared collections known to exist
+        self.tenants = {}
+        self.shared_collections = set()
+
+        self.logger = logging.getLogger("uvicorn")
+
+    def bind(self, client):
+        self.client = client
+        self.tenants = {}
+        self.shared_collections = set()
+
+    def shared_collection_name(self, embedding_size: int) -> str:
+        return f"{self.shared_collection_prefix}_{int(embedding_size)}"
+
+    def tenant_point_id(self, collection_name: str) -> str:
+        # catalog point ids must be uint or uuid
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, collection_name))
+
+    def tenant_condition(self, collection_name: str) -> models.FieldCondition:
+        return models.FieldCondition(key=self.tenant_key, match=models.MatchValue(value=collection_name))
+
+    async def ensure_catalog(self):
+        if not await self.client.collection_exists(collection_name=self.catalog_collection):
+            try:
+                await self.client.create_collection(collection_name=self.catalog_collection, vectors_config={})
+            except Exception:
+                # another worker created it first
+                if not await self.client.collection_exists(collection_name=self.catalog_collection):
+                    raise
+
+    async def ensure_shared_collection(self, embedding_size: int, collection_config: dict) -> tuple:
+        """
+        Returns (shared_collection_name, created). collection_config holds the
+        create_collection arguments used when the shared collection does not exist yet.
+        """
+        shared_collection = self.shared_collection_name(embedding_size)
+        if shared_collection in self.shared_collections:
+            return shared_collection, False
+
+        created = False
+        if not await self.client.collection_exists(collection_name=shared_collection):
+            self.logger.info(f"Creating shared Qdrant collection: {shared_collection}")
+            try:
+                await self.client.create_collection(collection_name=shared_collection, **collection_config)
+                created = True
+            except Exception:
+                if not await self.client.collection_exists(collection_name=shared_collection):
+                    raise
+
+        if created:
+            await self.client.create_payload_index(
+                collection_name=shared_collection,
+                field_name=self.tenant_key,
+                field_schema=models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True),
+                wait=True,
+            )
+
+        self.shared_collections.add(shared_collection)
+        return shared_collection, created
+
+    async def get_tenant(self, collection_name: str) -> dict:
+        tenant = self.tenants.get(collection_name)
+        if tenant is not None:
+            return tenant
+
+        records = await self.client.retrieve(
+            collection_name=self.catalog_collection,
+            ids=[self.tenant_point_id(collection_name)],
+        )
+        if not records:
+            return None
+
+        self.tenants[collection_name] = records[0].payload
+        return records[0].payload
+
+    async def list_tenants(self) -> list:
+        collection_names, offset = [], None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=self.catalog_collection,
+                limit=256,
+                offset=offset,
+                with_payload=True,
+            )
+            collection_names.extend(record.payload["collection_name"] for record in records)
+            if offset is None:
+                return sorted(collection_names)
+
+    async def add_tenant(self, collection_name: str, embedding_size: int, shared_collection: str) -> dict:
+        tenant = {
+            "collection_name": collection_name,
+            "shared_collection": shared_collection,
+            "embedding_size": int(embedding_size),
+        }
+        await self.client.upsert(
+            collection_name=self.catalog_collection,
+            points=[models.PointStruct(id=self.tenant_point_id(collection_name), vector={}, payload=tenant)],
+            wait=True,
+        )
+        self.tenants[collection_name] = tenant
+        return tenant
+
+    async def count_tenant_points(self, collection_name: str, shared_collection: str) -> int:
+        result = await self.client.count(
+            collection_name=shared_collection,
+            count_filter=models.Filter(must=[self.tenant_condition(collection_name)]),
+            exact=True,
+        )
+        return result.count
+
+    async def delete_tenant(self, collection_name: str, shared_collection: str):
+        # points go, the shared collection stays
+        await self.client.delete(
+            collection_name=shared_collection,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(must=[self.tenant_condition(collection_name)])
+            ),
+            wait=True,
+        )
+        await self.client.delete(
+            collection_name=self.catalog_collection,
+            points_selector=models.PointIdsList(points=[self.tenant_point_id(collection_name)]),
+            wait=True,
+        )
+        self.tenants.pop(collection_name, None)
@@ -1,2 +1,4 @@
 from .QdrantDBProvider import QdrantDBProvider
-from .PGVectorProvider import PGVectorProvider
\ No newline at end of file
+from .PGVectorProvider import PGVectorProvider
+from .NumpyDBProvider import NumpyDBProvider
+from .HnswDBProvider import HnswDBProvider
\ No newline at end of file
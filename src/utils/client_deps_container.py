@@ -1,13 +1,18 @@
 # src/deps/container.py
 from dataclasses import dataclass
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from src.helpers.config import get_settings
 from src.stores.llms.ProviderFactory_LLM import LLMProviderFactory
+from src.stores.llms.EmbeddingScheduler import EmbeddingScheduler
+from src.stores.llms.SemanticAnswerCache import SemanticAnswerCache
+from src.stores.llms.ResponseCache import ResponseCache
 from src.stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from src.stores.llms.templates.template_parser import TemplateParser
+from src.models.ResponseCacheModel import ResponseCacheModel
 
 
 @dataclass
@@ -18,7 +23,10 @@ class DependencyContainer:
     vectordb_client: any
     generation_client: any
     embedding_client: any
+    embedding_scheduler: EmbeddingScheduler
     template_parser: TemplateParser
+    answer_cache: Optional[SemanticAnswerCache] = None
+    response_cache: Optional[ResponseCache] = None
 
     @classmethod
     async def create(cls) -> "DependencyContainer":
@@ -47,6 +55,7 @@ class DependencyContainer:
         vectordb_provider_factory = VectorDBProviderFactory(
             config=settings,
             db_client=db_client,
+            db_engine=db_engine,
         )
 
         # generation client
@@ -64,6 +73,36 @@ class DependencyContainer:
             embedding_dimensions_size=settings.EMBEDDING_MODEL_SIZE,
         )
 
+        # shared across requests so the rate-limit budget is global
+        embedding_scheduler = EmbeddingScheduler(
+            embedding_client=embedding_client,
+            max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            max_batch_inputs=settings.EMBEDDING_BATCH_MAX_INPUTS,
+            concurrency=settings.EMBEDDING_CONCURRENCY,
+            requests_per_minute=settings.EMBEDDING_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.EMBEDDING_TOKENS_PER_MINUTE,
+            max_retries=settings.EMBEDDING_MAX_RETRIES,
+        )
+
+        # per process, entries are checked against the project's index_version
+        answer_cache = None
+        if settings.ANSWER_CACHE_ENABLED:
+            answer_cache = SemanticAnswerCache(
+                similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                max_entries_per_project=settings.ANSWER_CACHE_MAX_ENTRIES_PER_PROJECT,
+                max_projects=settings.ANSWER_CACHE_MAX_PROJECTS,
+            )
+
+        response_cache = None
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_cache_store = None
+            if settings.RESPONSE_CACHE_POSTGRES:
+                response_cache_store = await ResponseCacheModel.create_instance(db_client=db_client)
+            response_cache = ResponseCache(
+                max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                store=response_cache_store,
+            )
+
         # vector DB
         vectordb_client = vectordb_provider_factory.create(
             provider=settings.VECTOR_DB_BACKEND
@@ -83,7 +122,10 @@ class DependencyContainer:
             vectordb_client=vectordb_client,
             generation_client=generation_client,
             embedding_client=embedding_client,
+            embedding_scheduler=embedding_scheduler,
             template_parser=template_parser,
+            answer_cache=answer_cache,
+            response_cache=response_cache,
         )
 
     async def shutdown(self):
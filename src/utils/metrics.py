@@ -6,6 +6,7 @@ import time
 # Define metrics
 REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP Requests', ['method', 'endpoint', 'status'])
 REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP Request Latency', ['method', 'endpoint'])
+ANSWER_TIME_TO_FIRST_TOKEN = Histogram('rag_answer_time_to_first_token_seconds', 'Time from request to first streamed answer token')
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from src.stores.vectordb.providers.HnswDBProvider import ReadWriteLock
+
+
+def overlapping_readers(lock: ReadWriteLock, mode, stop: threading.Event, threads: int = 4):
+    """Keep the lock read-held at all times: each reader re-enters while the others still hold it."""
+
+    def read():
+        while not stop.is_set():
+            lock.acquire_read(mode=mode)
+            time.sleep(0.005)
+            lock.release_read(mode=mode)
+
+    readers = [threading.Thread(target=read) for _ in range(threads)]
+    for reader in readers:
+        reader.start()
+    return readers
+
+
+def wait_for(acquire, timeout: float = 2.0) -> bool:
+    acquired = threading.Event()
+
+    def run():
+        acquire()
+        acquired.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return acquired.wait(timeout)
+
+
+def test_writer_is_not_starved_by_overlapping_readers():
+    lock, stop = ReadWriteLock(), threading.Event()
+    readers = overlapping_readers(lock, mode=64, stop=stop)
+    try:
+        time.sleep(0.05)
+        assert wait_for(lock.acquire_write)
+        assert lock.readers == 0
+        lock.release_write()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+
+def test_other_mode_is_not_starved_by_overlapping_readers():
+    lock, stop = ReadWriteLock(), threading.Event()
+    readers = overlapping_readers(lock, mode=64, stop=stop)
+    try:
+        time.sleep(0.05)
+        assert wait_for(lambda: lock.acquire_read(mode=128))
+        assert lock.mode == 128 and lock.mode_readers == 1
+        lock.release_read(mode=128)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+
+def test_same_mode_readers_overlap():
+    lock = ReadWriteLock()
+    lock.acquire_read(mode=64)
+    assert wait_for(lambda: lock.acquire_read(mode=64))
+    assert lock.mode_readers == 2
@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+
+from src.stores.vectordb.providers.NumpyDBProvider import NumpyDBProvider
+
+EMBEDDING_SIZE = 4
+
+
+def make_provider(path) -> NumpyDBProvider:
+    provider = NumpyDBProvider(db_client=str(path), default_vector_size=EMBEDDING_SIZE,
+                               distance_method="cosine", initial_capacity=16)
+    provider.write_empty_collection("collection", EMBEDDING_SIZE)
+    return provider
+
+
+def append_text(provider: NumpyDBProvider, text: str, label: int):
+    vector = np.zeros((1, EMBEDDING_SIZE), dtype=np.float32)
+    vector[0, label] = 1.0
+    assert provider.append("collection", provider.prepare_vectors(vector),
+                           np.asarray([label], dtype=np.int64), [{"text": text, "metadata": None}])
+
+
+def test_reload_during_append_does_not_duplicate_records(tmp_path):
+    provider = make_provider(tmp_path)
+    append_text(provider, "a", 0)
+    append_text(provider, "b", 1)
+
+    # a search thread reloads right after append committed meta.json, before the in-memory update
+    write_meta = provider.write_meta
+    searches = []
+
+    def write_meta_then_search(collection_name, meta):
+        write_meta(collection_name, meta)
+        search = threading.Thread(target=provider.load_collection, args=(collection_name,))
+        search.start()
+        search.join(timeout=0.2)
+        searches.append(search)
+
+    provider.write_meta = write_meta_then_search
+    append_text(provider, "c", 2)
+    provider.write_meta = write_meta
+    for search in searches:
+        search.join()
+
+    append_text(provider, "d", 3)
+
+    collection = provider.load_collection("collection")
+    assert [record["text"] for record in collection.records] == ["a", "b", "c", "d"]
+
+    results = provider.search("collection", [[0.0, 0.0, 0.0, 1.0]], limit=1)
+    assert results[0][0].text == "d"
+
+
+def test_reload_after_another_worker_appends(tmp_path):
+    provider = make_provider(tmp_path)
+    append_text(provider, "a", 0)
+    provider.load_collection("collection")
+
+    other_worker = NumpyDBProvider(db_client=str(tmp_path), default_vector_size=EMBEDDING_SIZE,
+                                   distance_method="cosine", initial_capacity=16)
+    append_text(other_worker, "b", 1)
+
+    searches = [threading.Thread(target=provider.load_collection, args=("collection",)) for _ in range(4)]
+    for search in searches:
+        search.start()
+    for search in searches:
+        search.join()
+
+    collection = provider.load_collection("collection")
+    assert [record["text"] for record in collection.records] == ["a", "b"]